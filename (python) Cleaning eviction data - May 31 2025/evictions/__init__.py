@@ -0,0 +1,57 @@
+# Cleaning helpers for the raw eviction court export
+#
+# Names are loaded from their submodule on first use, so `import evictions` (and `python -m evictions --help`)
+# doesn't pay for pandas and pyarrow until something actually needs them.
+import importlib     # loads a submodule on first attribute access
+
+# Public name → submodule that defines it
+_EXPORTS = {
+    "ANALYTICS_TABLES": "analytics",
+    "COLUMNS": "parser",
+    "DateCache": "dates",
+    "EntityIndex": "entities",
+    "EvictionAnalytics": "analytics",
+    "EvictionSummary": "summary",
+    "INGEST_MODES": "ingest",
+    "Metrics": "metrics",
+    "PARSERS": "pipeline",
+    "PENDING_DATES": "dates",
+    "add_entity_ids": "entities",
+    "clean_chunks_parallel": "parallel",
+    "clean_export": "job",
+    "clean_incremental": "incremental",
+    "clean_lazy": "lazy",
+    "clean_parallel": "parallel",
+    "clean_records": "pipeline",
+    "clean_stepwise": "stepwise",
+    "clean_to_dataset": "streaming",
+    "clean_to_parquet": "streaming",
+    "cleaning_counts": "metrics",
+    "compact_frame": "schema",
+    "export_evictions": "dataset",
+    "extract_dates": "dates",
+    "iter_raw_records": "ingest",
+    "normalize_names": "entities",
+    "parse_dates": "dates",
+    "parse_record": "parser",
+    "parse_records": "parser",
+    "read_dataset": "dataset",
+    "read_raw_records": "ingest",
+    "refresh_analytics": "analytics",
+    "sentinel_year_rules": "dates",
+    "write_dataset": "dataset",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
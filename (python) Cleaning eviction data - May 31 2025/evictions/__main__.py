@@ -0,0 +1,112 @@
+# Command-line entry point:  python -m evictions INPUT OUTPUT [options]
+#
+# Only argparse is imported up front; pandas and the cleaner load after the arguments are parsed,
+# so --help returns straight away.
+import argparse     # command-line options
+import os           # path of the repository root
+import sys          # import path the root is added to
+
+# The repository root, which holds the metrics recorder shared with the geocoding project (pipeline_metrics/)
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    cli = argparse.ArgumentParser(
+        prog="python -m evictions",
+        description="Clean the raw eviction court export into Parquet.",
+    )
+    cli.add_argument("input", help="raw export (CSV)")
+    cli.add_argument("output", help="Parquet file, or dataset folder with --partitioned / --incremental")
+    cli.add_argument("--ingest", default="lines", help="how the raw export is read: lines or csv")
+    cli.add_argument("--parser", default="single_pass",
+                     help="how records are parsed: single_pass, stepwise or lazy (one Polars query plan)")
+    cli.add_argument("--pending-dates", default="keep",
+                     help="1753 (pending) execution dates: keep, or missing to leave them blank")
+    cli.add_argument("--entities",
+                     help="entity table (Parquet): add plaintiff / defendant entity ids, reusing and growing it")
+    cli.add_argument("--analytics",
+                     help="DuckDB file of summary tables, refreshed from OUTPUT (see python -m evictions.analytics)")
+    cli.add_argument("--chunksize", type=int, help="stream the file through in chunks of this many lines")
+    cli.add_argument("--workers", type=int, default=1, help="worker processes that clean records")
+    cli.add_argument("--encoding", default="utf-8")
+    cli.add_argument("--compact", action="store_true", help="compact output schema (see evictions/schema.py)")
+    cli.add_argument("--drop-raw-record", action="store_true", help="leave raw_record out of the output")
+    cli.add_argument("--partitioned", action="store_true", help="one filing_year=YYYY folder per year")
+    cli.add_argument("--incremental", action="store_true",
+                     help="update the dataset folder OUTPUT in place, re-parsing only new or changed records")
+    cli.add_argument("--metrics", help="save per-stage metrics here (.json, or OpenMetrics text otherwise)")
+    cli.add_argument("--profile", help="profile every stage: cprofile or sampling")
+    cli.add_argument("--profile-dir", default="profiles", help="where profiles are saved")
+    cli.add_argument("--quiet", action="store_true", help="don't print the quality checks and metrics")
+    return cli
+
+
+def main(argv=None) -> None:
+    cli = build_parser()
+    args = cli.parse_args(argv)
+
+    if REPO not in sys.path:
+        sys.path.append(REPO)
+    from .dates import PENDING_DATES, sentinel_year_rules
+    from .incremental import clean_incremental
+    from .ingest import INGEST_MODES
+    from .job import clean_export
+    from .metrics import PROFILERS, Metrics
+    from .pipeline import PARSERS
+
+    if args.ingest not in INGEST_MODES:
+        cli.error(f"--ingest must be one of {', '.join(INGEST_MODES)}")
+    if args.parser not in PARSERS:
+        cli.error(f"--parser must be one of {', '.join(PARSERS)}")
+    if args.pending_dates not in PENDING_DATES:
+        cli.error(f"--pending-dates must be one of {', '.join(PENDING_DATES)}")
+    if args.profile and args.profile not in PROFILERS:
+        cli.error(f"--profile must be one of {', '.join(PROFILERS)}")
+
+    hooks = [PROFILERS[args.profile](args.profile_dir)] if args.profile else []
+    metrics = Metrics("evictions", hooks=hooks)
+    date_rules = sentinel_year_rules(args.pending_dates)
+
+    if args.incremental:
+        delta = clean_incremental(
+            args.input,
+            args.output,
+            mode=args.ingest,
+            parser=args.parser,
+            encoding=args.encoding,
+            workers=args.workers,
+            date_rules=date_rules,
+            entities=args.entities,
+            analytics=args.analytics,
+            metrics=metrics,
+        )
+        if not args.quiet:
+            print(delta["change"].value_counts())
+    else:
+        summary = clean_export(
+            args.input,
+            args.output,
+            ingest=args.ingest,
+            parser=args.parser,
+            chunksize=args.chunksize,
+            workers=args.workers,
+            compact=args.compact,
+            drop_raw_record=args.drop_raw_record,
+            partitioned=args.partitioned,
+            encoding=args.encoding,
+            date_rules=date_rules,
+            entities=args.entities,
+            analytics=args.analytics,
+            metrics=metrics,
+        )
+        if not args.quiet:
+            summary.report()
+
+    if not args.quiet:
+        metrics.report()
+    if args.metrics:
+        metrics.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
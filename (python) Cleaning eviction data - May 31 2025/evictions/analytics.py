@@ -0,0 +1,273 @@
+# Materialized analytics over the cleaned output: small DuckDB summary tables dashboards read instead of the Parquet
+#
+# Every Parquet file of the output (evictions.parquet, or each part file of a partitioned dataset) is summarized on
+# its own into partial tables tagged with the file's path. A refresh re-reads only the files that are new or whose
+# size / modification time changed since the last one (an incremental run rewrites only the years it touched) and
+# drops the parts of files that are gone; the served tables are then re-added up from the partials, which hold a
+# few thousand rows at most. The cleaned output itself is registered as the view "evictions" for ad-hoc queries.
+import argparse      # command-line options
+import os            # file sizes / modification times of the output's Parquet files
+import sys           # import path the repository root is added to (command line)
+
+import duckdb        # embedded analytical database, one file on disk
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .dataset import list_partitions, part_files
+from .entities import ENTITY_COLUMNS
+from .patterns import PENDING_YEAR
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS _sources (
+    source   VARCHAR PRIMARY KEY,   -- Parquet file of the cleaned output
+    size     BIGINT NOT NULL,       -- its size and modification time (ns) when it was summarized
+    modified BIGINT NOT NULL,
+    cases    BIGINT NOT NULL        -- rows it held
+);
+CREATE TABLE IF NOT EXISTS _monthly_parts (
+    source VARCHAR, filing_month DATE, case_status VARCHAR, case_type VARCHAR, cases BIGINT, executed BIGINT
+);
+CREATE TABLE IF NOT EXISTS _latency_parts (
+    source VARCHAR, filing_month DATE, case_type VARCHAR, days BIGINT, cases BIGINT
+);
+CREATE TABLE IF NOT EXISTS _plaintiff_parts (
+    source VARCHAR, plaintiff_entity_id BIGINT, plaintiff VARCHAR, cases BIGINT
+);
+"""
+
+# Partial summaries of the files in $files (one scan, tagged with each row's file). Filing month is the first day
+# of the month, missing without a filing date; "executed" counts rows with a real execution date (the 1753
+# "pending" marker, kept by --pending-dates keep, is not one). Latency is whole days from filing to execution, for
+# rows with both dates in that order (which leaves the pending marker out too). Plaintiffs are counted per spelling
+# and, when entity resolution ran, per entity ({plaintiff_entity_id} is that column, or NULL without it)
+_PARTS = {
+    "_monthly_parts": f"""
+        SELECT filename, date_trunc('month', filing_date)::DATE, case_status::VARCHAR, case_type::VARCHAR,
+               count(*), count(*) FILTER (WHERE year(execution_date) <> {PENDING_YEAR})
+        FROM read_parquet($files, filename = true, union_by_name = true)
+        GROUP BY ALL
+    """,
+    "_latency_parts": """
+        SELECT filename, date_trunc('month', filing_date)::DATE, case_type::VARCHAR,
+               date_diff('day', filing_date::DATE, execution_date::DATE) AS days, count(*)
+        FROM read_parquet($files, filename = true, union_by_name = true)
+        WHERE execution_date >= filing_date
+        GROUP BY ALL
+    """,
+    "_plaintiff_parts": """
+        SELECT filename, {plaintiff_entity_id}::BIGINT, plaintiff::VARCHAR, count(*)
+        FROM read_parquet($files, filename = true, union_by_name = true)
+        GROUP BY ALL
+    """,
+}
+
+# The served tables, re-added up from the partials after every refresh
+ANALYTICS_TABLES = {
+    # Cases and executions per filing month, status and type
+    "monthly_counts": """
+        SELECT filing_month, case_status, case_type, sum(cases)::BIGINT AS cases, sum(executed)::BIGINT AS executed
+        FROM _monthly_parts GROUP BY ALL ORDER BY ALL
+    """,
+    # Share of each status's cases that have a (real) execution date
+    "status_rates": """
+        SELECT case_status, sum(cases)::BIGINT AS cases, sum(executed)::BIGINT AS executed,
+               sum(executed) / sum(cases) AS execution_rate
+        FROM _monthly_parts GROUP BY ALL ORDER BY cases DESC, case_status
+    """,
+    # Cases per plaintiff: per entity when entity resolution ran (named by its most used spelling), otherwise per
+    # spelling as in the cleaned table
+    "plaintiff_counts": """
+        WITH spellings AS (
+            SELECT plaintiff_entity_id, plaintiff, sum(cases) AS cases FROM _plaintiff_parts GROUP BY ALL
+        )
+        SELECT plaintiff_entity_id, first(plaintiff ORDER BY cases DESC, plaintiff) AS plaintiff,
+               sum(cases)::BIGINT AS cases
+        FROM spellings
+        GROUP BY plaintiff_entity_id, CASE WHEN plaintiff_entity_id IS NULL THEN plaintiff END
+        ORDER BY cases DESC, plaintiff
+    """,
+    # Filing → execution latency: cases per whole number of days, by filing month and type
+    "latency_histogram": """
+        SELECT filing_month, case_type, days, sum(cases)::BIGINT AS cases FROM _latency_parts GROUP BY ALL ORDER BY ALL
+    """,
+    # Its distribution per filing month: mean, and nearest-rank percentiles (the smallest latency reached by at
+    # least that share of the month's cases)
+    "latency_summary": """
+        WITH days AS (
+            SELECT filing_month, days, sum(cases) AS cases FROM _latency_parts GROUP BY ALL
+        ), ranked AS (
+            SELECT *, sum(cases) OVER (PARTITION BY filing_month ORDER BY days) AS running,
+                      sum(cases) OVER (PARTITION BY filing_month) AS total
+            FROM days
+        )
+        SELECT filing_month, any_value(total)::BIGINT AS cases, sum(days * cases) / any_value(total) AS mean_days,
+               min(days) AS min_days,
+               min(days) FILTER (WHERE running >= 0.25 * total) AS p25_days,
+               min(days) FILTER (WHERE running >= 0.50 * total) AS median_days,
+               min(days) FILTER (WHERE running >= 0.75 * total) AS p75_days,
+               min(days) FILTER (WHERE running >= 0.90 * total) AS p90_days,
+               max(days) AS max_days
+        FROM ranked GROUP BY filing_month ORDER BY filing_month
+    """,
+}
+
+
+def source_files(output) -> list:
+    """Parquet files of the cleaned output at *output*: the file itself, or every part file of a dataset folder."""
+    if os.path.isdir(output):
+        return [path for key in list_partitions(output) for path in part_files(output, key)]
+    return [output] if os.path.exists(output) else []
+
+
+class EvictionAnalytics:
+    """
+    Summary tables of the cleaned output, kept in the DuckDB file at *path*.
+
+    ``refresh`` brings them up to date with an output file or dataset folder,
+    re-reading only the Parquet files that changed; ``table`` serves one of
+    ``ANALYTICS_TABLES``, ``top_plaintiffs`` the largest filers and ``query``
+    any SQL over them and the ``evictions`` view of the output itself.
+    """
+
+    def __init__(self, path=":memory:", read_only: bool = False):
+        self.path = path
+        self.connection = duckdb.connect(str(path), read_only=read_only)
+        if not read_only:
+            self.connection.execute(_SCHEMA)
+
+    def refresh(self, output) -> dict:
+        """
+        Summarize the new or changed Parquet files of *output*, forget the
+        removed ones and rebuild the served tables. Returns counts of files
+        refreshed / unchanged / removed and of rows summarized / re-read.
+        """
+        files = [os.path.abspath(path) for path in source_files(output)]
+        known = {source: (size, modified) for source, size, modified in
+                 self.connection.execute("SELECT source, size, modified FROM _sources").fetchall()}
+        stats = {path: os.stat(path) for path in files}
+        changed = [path for path in files if known.get(path) != (stats[path].st_size, stats[path].st_mtime_ns)]
+        stale = [source for source in known if source not in stats or source in changed]
+
+        with self.connection.cursor() as cursor:
+            cursor.execute("BEGIN TRANSACTION")
+            for table in ["_sources"] + list(_PARTS):
+                cursor.execute(f"DELETE FROM {table} WHERE list_contains($stale, source)", {"stale": stale})
+            if changed:
+                columns = {row[0] for row in cursor.execute(
+                    "DESCRIBE SELECT * FROM read_parquet($files, union_by_name = true)", {"files": changed},
+                ).fetchall()}
+                entity = ENTITY_COLUMNS["plaintiff"]
+                for table, select in _PARTS.items():
+                    select = select.replace("{plaintiff_entity_id}", entity if entity in columns else "NULL")
+                    cursor.execute(f"INSERT INTO {table} {select}", {"files": changed})
+                cases = dict(cursor.execute(
+                    "SELECT source, sum(cases) FROM _monthly_parts WHERE list_contains($files, source) GROUP BY ALL",
+                    {"files": changed},
+                ).fetchall())
+                cursor.executemany(
+                    "INSERT INTO _sources VALUES (?, ?, ?, ?)",
+                    [(path, stats[path].st_size, stats[path].st_mtime_ns, cases.get(path, 0)) for path in changed],
+                )
+            for name, select in ANALYTICS_TABLES.items():
+                cursor.execute(f"CREATE OR REPLACE TABLE {name} AS {select}")
+            if files:
+                cursor.execute(
+                    "CREATE OR REPLACE VIEW evictions AS "
+                    f"SELECT * FROM read_parquet({_sql_list(files)}, union_by_name = true)"
+                )
+            else:
+                cursor.execute("DROP VIEW IF EXISTS evictions")
+            cursor.execute("COMMIT")
+
+        rows = self.connection.execute(
+            "SELECT coalesce(sum(cases), 0), coalesce(sum(cases) FILTER (WHERE list_contains($files, source)), 0) "
+            "FROM _sources", {"files": changed},
+        ).fetchone()
+        return {
+            "files_refreshed": len(changed),
+            "files_unchanged": len(files) - len(changed),
+            "files_removed": len(set(known) - set(stats)),
+            "rows_summarized": int(rows[0]),
+            "rows_rescanned": int(rows[1]),
+        }
+
+    def table(self, name: str) -> pd.DataFrame:
+        """One of the ``ANALYTICS_TABLES``."""
+        if name not in ANALYTICS_TABLES:
+            raise ValueError(f"Unknown table {name!r}; expected one of {tuple(ANALYTICS_TABLES)}")
+        return self.connection.execute(f"SELECT * FROM {name}").df()
+
+    def top_plaintiffs(self, n: int = 10) -> pd.DataFrame:
+        """The *n* plaintiffs (entities, when resolved) with the most cases."""
+        return self.connection.execute("SELECT * FROM plaintiff_counts LIMIT ?", [n]).df()
+
+    def query(self, sql: str, params=None) -> pd.DataFrame:
+        """Result of any SQL over the summary tables (and the ``evictions`` view)."""
+        return self.connection.execute(sql, params).df()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def _sql_list(paths) -> str:
+    """SQL list literal of *paths* (a view can't keep query parameters)."""
+    return "[" + ", ".join("'" + path.replace("'", "''") + "'" for path in paths) + "]"
+
+
+def refresh_analytics(path, output, metrics=None) -> dict:
+    """Refresh the summary tables in the DuckDB file at *path* from *output*, recorded as the "analytics" stage."""
+    from .metrics import maybe_stage
+    with maybe_stage(metrics, "analytics") as stage:
+        analytics = EvictionAnalytics(path)
+        try:
+            counts = analytics.refresh(output)
+        finally:
+            analytics.close()
+        stage.rows_out += counts["rows_summarized"]
+        stage.add_counts({"rows_rescanned": counts["rows_rescanned"]})
+    return counts
+
+
+def main(argv=None) -> None:
+    cli = argparse.ArgumentParser(
+        prog="python -m evictions.analytics",
+        description="Serve the summary tables of the cleaned evictions output.",
+    )
+    cli.add_argument("database", help="DuckDB file holding the summary tables")
+    cli.add_argument("--refresh", metavar="OUTPUT", help="first bring them up to date with this Parquet file / folder")
+    cli.add_argument("--table", help=f"print one table: {', '.join(ANALYTICS_TABLES)}")
+    cli.add_argument("--top-plaintiffs", type=int, metavar="N", help="print the N plaintiffs with the most cases")
+    cli.add_argument("--sql", help="print the result of a query over the tables and the evictions view")
+    cli.add_argument("--csv", help="save what is printed to this CSV file instead")
+    args = cli.parse_args(argv)
+    if args.table is not None and args.table not in ANALYTICS_TABLES:
+        cli.error(f"--table must be one of {', '.join(ANALYTICS_TABLES)}")
+    if not args.refresh and not os.path.exists(args.database):
+        cli.error(f"{args.database} doesn't exist yet; build it with --refresh OUTPUT")
+
+    if args.refresh:
+        # The shared metrics recorder (pipeline_metrics/) sits at the repository root, above the project folder
+        repo = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        if repo not in sys.path:
+            sys.path.append(repo)
+        print(refresh_analytics(args.database, args.refresh))
+    analytics = EvictionAnalytics(args.database, read_only=True)
+    try:
+        if args.table:
+            result = analytics.table(args.table)
+        elif args.top_plaintiffs:
+            result = analytics.top_plaintiffs(args.top_plaintiffs)
+        elif args.sql:
+            result = analytics.query(args.sql)
+        else:
+            return
+    finally:
+        analytics.close()
+
+    if args.csv:
+        result.to_csv(args.csv, index=False)
+    else:
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Cleaned evictions stored as a directory of Parquet files, one folder per filing year (Hive-style partitions)
+import glob          # part files inside a partition folder
+import os            # paths, directory listing and atomic file replacement
+import shutil        # removal of partitions that no longer hold any rows
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+import pyarrow.parquet as pq  # Parquet reader / writer
+from pandas.api.types import union_categoricals  # categoricals of several part files as one
+
+from .schema import to_arrow
+
+PARTITION_COLUMN = "filing_year"
+
+# Hive's name for the partition of rows whose key is missing (no filing date); pyarrow reads it back as null
+MISSING_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Parquet settings for files that dashboards re-read constantly: rows sorted by filing_date (see
+# write_partition) so each row group and page covers a narrow date range, min/max statistics plus a
+# page index so readers can skip what a date filter rules out, and zstd-compressed pages
+PARQUET_OPTIONS = {
+    "compression": "zstd",
+    "write_statistics": True,
+    "write_page_index": True,
+}
+ROW_GROUP_SIZE = 128_000
+
+
+def partition_keys(evictions: pd.DataFrame) -> pd.Series:
+    """Partition of every row: its filing year as text, or ``MISSING_PARTITION``."""
+    years = pd.to_datetime(evictions["filing_date"]).dt.year
+    return years.astype("Int64").astype(str).where(years.notna(), MISSING_PARTITION)
+
+
+def partition_path(root, key: str) -> str:
+    """Directory holding one partition of the dataset at *root*."""
+    return os.path.join(root, f"{PARTITION_COLUMN}={key}")
+
+
+def part_files(root, key: str) -> list[str]:
+    """Parquet files making up one partition, in the order they were written."""
+    return sorted(glob.glob(os.path.join(partition_path(root, key), "part-*.parquet")))
+
+
+def list_partitions(root) -> list[str]:
+    """Keys of the partitions currently present under *root*."""
+    if not os.path.isdir(root):
+        return []
+    prefix = f"{PARTITION_COLUMN}="
+    return sorted(name[len(prefix):] for name in os.listdir(root) if name.startswith(prefix))
+
+
+def write_part(root, key: str, evictions: pd.DataFrame, part: int = 0,
+               compact: bool = False, drop_raw_record: bool = False) -> str:
+    """
+    Write *evictions* as part file number *part* of one partition, sorted by
+    filing_date, through a temporary file so readers never see half a file.
+    """
+    directory = partition_path(root, key)
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f"part-{part:05d}.parquet")
+
+    rows = evictions.sort_values(["filing_date", "primary_key"], kind="stable")
+    table = to_arrow(rows, compact=compact, drop_raw_record=drop_raw_record)
+    pq.write_table(table, target + ".tmp", row_group_size=ROW_GROUP_SIZE, **PARQUET_OPTIONS)
+    os.replace(target + ".tmp", target)
+    return target
+
+
+def write_partition(root, key: str, evictions: pd.DataFrame,
+                    compact: bool = False, drop_raw_record: bool = False) -> None:
+    """Replace one partition with *evictions* as a single part file."""
+    target = write_part(root, key, evictions, compact=compact, drop_raw_record=drop_raw_record)
+    for path in part_files(root, key):
+        if path != target:
+            os.remove(path)
+
+
+def _concat(frames: list) -> pd.DataFrame:
+    """
+    *frames* stacked, with categorical columns kept categorical: part files
+    written chunk by chunk each have their own categories (none at all where
+    a column is entirely missing), so those columns are unioned on their own
+    rather than left to ``pd.concat``, which would turn them into object
+    columns. Empty frames are left out.
+    """
+    columns = frames[0].columns
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    categorical = [col for col, dtype in frames[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+
+    evictions = pd.concat([frame.drop(columns=categorical) for frame in frames] if categorical else frames,
+                          ignore_index=True)
+    for col in categorical:  # in column order, so each goes back where it was
+        values = union_categoricals([frame[col] for frame in frames], sort_categories=True)
+        evictions.insert(columns.get_loc(col), col, values)
+    return evictions
+
+
+def read_partition(root, key: str) -> pd.DataFrame:
+    """Rows of one partition, as written."""
+    return _concat([pd.read_parquet(path) for path in part_files(root, key)])
+
+
+def drop_partition(root, key: str) -> None:
+    """Delete one partition directory."""
+    shutil.rmtree(partition_path(root, key), ignore_errors=True)
+
+
+def write_dataset(root, evictions: pd.DataFrame, compact: bool = False, drop_raw_record: bool = False) -> None:
+    """Write the whole cleaned table under *root*, one partition per filing year, replacing what was there."""
+    keys = partition_keys(evictions)
+    for key in set(list_partitions(root)) - set(keys):
+        drop_partition(root, key)
+    for key, rows in evictions.groupby(keys, sort=True):
+        write_partition(root, key, rows, compact=compact, drop_raw_record=drop_raw_record)
+
+
+def read_dataset(root) -> pd.DataFrame:
+    """Every partition under *root*, stitched back into ``primary_key`` order."""
+    parts = [read_partition(root, key) for key in list_partitions(root)]
+    if not parts:
+        raise FileNotFoundError(f"No {PARTITION_COLUMN} partitions under {root!r}")
+    evictions = _concat(parts)
+    return evictions.sort_values("primary_key", kind="stable", ignore_index=True)
+
+
+def export_evictions(evictions: pd.DataFrame, path, compact: bool = False,
+                     drop_raw_record: bool = False, partitioned: bool = False) -> None:
+    """
+    Write the cleaned table to *path*: a filing-year partitioned folder when
+    *partitioned*, otherwise a single Parquet file (exactly ``to_parquet``'s
+    output unless the compact layout or dropping raw_record is asked for).
+    """
+    if partitioned:
+        write_dataset(path, evictions, compact=compact, drop_raw_record=drop_raw_record)
+    elif compact or drop_raw_record:
+        table = to_arrow(evictions, compact=compact, drop_raw_record=drop_raw_record)
+        pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE, **PARQUET_OPTIONS)
+    else:
+        evictions.to_parquet(path)
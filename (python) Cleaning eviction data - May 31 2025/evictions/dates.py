@@ -0,0 +1,125 @@
+# Date extraction and parsing for the cleaned evictions table
+#
+# A multi-million-row export holds only a few thousand distinct dates, so each distinct date string is parsed
+# once and remembered; every row then just looks its string up. Year repairs (the 2102 typo, the 1753 "pending"
+# marker) are rules applied to those distinct strings, never row by row.
+import re            # regular-expression engine for finding and replacing text patterns
+
+import numpy as np   # datetime64 arrays and the NaT placeholder
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .patterns import EXECUTION_YEAR_TYPO, PENDING_YEAR
+
+# The first and second YYYY-MM-DD date in a record, as two columns (what findall(...)[0] / [1] return)
+two_dates_regex = re.compile(r"(?s)(?P<first>\d{4}-\d{2}-\d{2})(?:.*?(?P<second>\d{4}-\d{2}-\d{2}))?")
+
+# Columns that hold dates, and the format they are written in
+DATE_COLUMNS = ["filing_date", "execution_date"]
+DATE_FORMAT = "%Y-%m-%d"
+
+# What to do with execution dates in PENDING_YEAR: keep them as written, or leave the date missing
+PENDING_DATES = ("keep", "missing")
+
+# A cache holding more distinct dates than this is emptied and refilled (real exports stay far below it)
+MAX_CACHED_DATES = 100_000
+
+_NAT = np.datetime64("NaT", "ns")
+
+
+def sentinel_year_rules(pending: str = "keep") -> dict:
+    """
+    Year rules for every date column: ``{column: ((year written, real year), ...)}``.
+
+    A real year of ``None`` leaves the date missing. The 2102 typo is always
+    repaired to 2021; *pending* says whether PENDING_YEAR execution dates are
+    kept (the summary reports them as "pending") or made missing.
+    """
+    if pending not in PENDING_DATES:
+        raise ValueError(f"Unknown pending {pending!r}; expected one of {PENDING_DATES}")
+
+    execution_rules = [EXECUTION_YEAR_TYPO]
+    if pending == "missing":
+        execution_rules.append((PENDING_YEAR, None))
+    return {"execution_date": tuple(execution_rules)}
+
+
+# Rules used when none are given
+DATE_RULES = sentinel_year_rules()
+
+
+def extract_dates(text: pd.Series) -> pd.DataFrame:
+    """
+    ``first`` and ``second`` YYYY-MM-DD date of every row of *text* (missing
+    where there are fewer), without building a list of matches per row.
+    """
+    return text.str.extract(two_dates_regex)
+
+
+def _apply_year_rules(dates: pd.Series, rules) -> pd.Series:
+    """*dates* (distinct YYYY-MM-DD strings) with every rule's year swapped in, or missing for ``None``."""
+    years = dates.str[:4]
+    for year, real_year in rules:
+        written_in = years == year
+        dates = dates.mask(written_in, None if real_year is None else real_year + dates.str[4:])
+    return dates
+
+
+class DateCache:
+    """
+    Datetime for every distinct date string seen so far, with one set of year
+    rules already applied. Lives for the whole process, so the chunks of a
+    streamed export only parse the dates they are first to contain.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+        self.parsed = pd.Series(dtype="datetime64[ns]")   # indexed by date string
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, distinct: pd.Index) -> np.ndarray:
+        """Datetimes for *distinct* strings, parsing the ones not cached yet."""
+        new = distinct.difference(self.parsed.index)
+        if len(self.parsed) + len(new) > MAX_CACHED_DATES:
+            self.parsed = self.parsed.iloc[:0]
+            new = distinct
+
+        if len(new):
+            text = _apply_year_rules(pd.Series(new, index=new, dtype=object), self.rules)
+            parsed = pd.to_datetime(text, errors="coerce", format=DATE_FORMAT).astype("datetime64[ns]")
+            self.parsed = pd.concat([self.parsed, parsed]) if len(self.parsed) else parsed
+
+        self.hits += len(distinct) - len(new)
+        self.misses += len(new)
+        return self.parsed.reindex(distinct).to_numpy()
+
+    def parse(self, text: pd.Series) -> pd.Series:
+        """*text* (YYYY-MM-DD strings or missing) as datetimes; bad strings become NaT."""
+        codes, distinct = pd.factorize(text)   # one code per row, -1 for missing
+        parsed = np.append(self._lookup(pd.Index(distinct, dtype=object)), _NAT)
+        return pd.Series(parsed[codes], index=text.index, name=text.name)
+
+
+# One cache per set of rules, shared by every call in this process
+_caches = {}
+
+
+def date_cache(rules=()) -> DateCache:
+    """The process-wide ``DateCache`` for *rules*."""
+    rules = tuple(rules)
+    if rules not in _caches:
+        _caches[rules] = DateCache(rules)
+    return _caches[rules]
+
+
+def parse_dates(text: pd.Series, rules=()) -> pd.Series:
+    """*text* parsed through the cache for *rules* (one column's entry of ``sentinel_year_rules``)."""
+    return date_cache(rules).parse(text)
+
+
+def convert_dates(evictions: pd.DataFrame, date_rules=None) -> pd.DataFrame:
+    """Turn every ``DATE_COLUMNS`` column of *evictions* from text into datetimes, applying *date_rules*."""
+    date_rules = DATE_RULES if date_rules is None else date_rules
+    for col in DATE_COLUMNS:
+        evictions[col] = parse_dates(evictions[col], date_rules.get(col, ()))
+    return evictions
@@ -0,0 +1,233 @@
+# Landlord / tenant entity resolution: normalize plaintiff and defendant names and group the spellings of one
+# entity ("4 Bogard Street LLC", "4 BOGARD ST LLC", "4 Bogrd St LLC") under one entity_id
+#
+# Only organisations are matched loosely: a person's name (and every defendant, nearly all of them tenants) joins an
+# entity only when it normalizes to exactly the same spelling, since "MARIA GARCIA" and "MARIO GARCIA" are two people.
+# Organisation names are compared only inside blocks (names sharing an informative token, give or take one letter),
+# never all against all, so the work grows with the number of distinct names rather than its square. The table of known names and their ids is saved
+# between runs: a name seen before keeps its id, and new names are matched against everything already known.
+import difflib       # similarity ratio of two candidate names
+import os            # atomic replacement of the saved entity table
+import re            # regular-expression engine for finding and replacing text patterns
+from collections import defaultdict  # the blocking index
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .patterns import UNKNOWN
+
+# Columns added to the cleaned table: the entity behind each side of the case (<NA> for "Unknown")
+ENTITY_COLUMNS = {"plaintiff": "plaintiff_entity_id", "defendant": "defendant_entity_id"}
+
+# Words written many ways in the export, mapped to one spelling
+ABBREVIATIONS = {
+    "STREET": "ST", "AVENUE": "AVE", "ROAD": "RD", "BOULEVARD": "BLVD", "DRIVE": "DR", "PLACE": "PL",
+    "COURT": "CT", "LANE": "LN", "TERRACE": "TER", "PARKWAY": "PKWY", "HEIGHTS": "HTS", "SQUARE": "SQ",
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "COMPANY": "CO", "CORPORATION": "CORP", "INCORPORATED": "INC", "LIMITED": "LTD",
+    "ASSOCIATES": "ASSOC", "ASSOCIATION": "ASSN", "APARTMENTS": "APTS", "APARTMENT": "APT",
+    "MANAGEMENT": "MGMT", "PROPERTIES": "PROPS", "PROPERTY": "PROP", "HOUSING": "HSG",
+    "AUTHORITY": "AUTH", "DEVELOPMENT": "DEV", "PARTNERSHIP": "PTSHP", "PARTNERS": "PTNRS",
+}
+
+# Legal forms and filler words: kept in the normalized name, but never used as blocking keys, and a name that
+# differs from another only by these (e.g. a missing "LLC") is the same entity
+LEGAL_FORMS = {"LLC", "INC", "CORP", "CO", "LTD", "LP", "LLP", "PC", "PLLC", "TRUST", "THE", "AND", "OF"}
+
+# Spelled-out legal forms and punctuation, handled before the word-by-word abbreviations
+_legal_phrase_regex = re.compile(r"\bLIMITED LIABILITY (?:COMPANY|CO)\b|\bL L C\b")
+_non_word_regex = re.compile(r"[^A-Z0-9 ]+")
+_spaces_regex = re.compile(r"\s+")
+_abbreviation_regex = re.compile(r"\b(" + "|".join(ABBREVIATIONS) + r")\b")
+
+# Two organisation names are the same entity when their similarity ratio reaches this (and their numbers agree)
+MATCH_THRESHOLD = 0.88
+
+# Words that make a name an organisation's (besides the legal forms, the abbreviated street / company words and any
+# number): names without any are people's, and only match names spelled exactly the same once normalized
+ORGANISATION_WORDS = {
+    "REALTY", "HOLDINGS", "GROUP", "INVESTMENTS", "INVESTMENT", "RENTALS", "RENTAL", "HOMES", "ESTATES", "VENTURES",
+    "CAPITAL", "FUND", "BANK", "CHURCH", "CITY", "COUNTY", "PARISH", "STATE", "TRUSTEES", "ENTERPRISES", "SERVICES",
+}
+_organisation_words = LEGAL_FORMS | ORGANISATION_WORDS | set(ABBREVIATIONS.values())
+
+# Sides matched loosely (organisations among them); the other sides only ever match exactly
+FUZZY_SIDES = {"plaintiff"}
+
+# Blocks larger than this (tokens like "REALTY" or "JOHN") are too common to say anything and are not searched
+MAX_BLOCK_SIZE = 200
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """
+    Canonical spelling of every name: upper case, no punctuation, single
+    spaces, common words abbreviated and "L.L.C." / "Limited Liability
+    Company" written LLC. "Unknown" and empty names become missing. Each
+    distinct name is normalized once.
+    """
+    codes, distinct = pd.factorize(names)
+    text = pd.Series(distinct, dtype=object).str.upper()
+    text = (
+        text.str.replace("&", " AND ", regex=False)
+            .str.replace(".", "", regex=False)      # "L.L.C." → "LLC", "ST." → "ST"
+            .str.replace(_non_word_regex, " ", regex=True)
+            .str.replace(_spaces_regex, " ", regex=True)
+            .str.strip()
+            .str.replace(_legal_phrase_regex, "LLC", regex=True)
+            .str.replace(_abbreviation_regex, lambda m: ABBREVIATIONS[m.group(1)], regex=True)
+    )
+    text = text.mask(text.isin(["", UNKNOWN.upper()]))
+    return pd.Series(text.to_numpy()[codes], index=names.index, dtype=object).where(codes >= 0)
+
+
+def _is_organisation(name: str) -> bool:
+    """Whether normalized *name* is an organisation's (has a legal form, company or street word, or a number)."""
+    return any(token in _organisation_words or token.isdigit() for token in name.split())
+
+
+def _core(name: str) -> str:
+    """*name* without its legal-form and filler words."""
+    return " ".join(token for token in name.split() if token not in LEGAL_FORMS)
+
+
+def _numbers(name: str) -> frozenset:
+    """The numbers in *name* (house numbers must agree for two landlords to be the same)."""
+    return frozenset(token for token in name.split() if token.isdigit())
+
+
+def _block_keys(name: str) -> set:
+    """
+    Blocks *name* is filed under and searched in: each informative token and,
+    for tokens of four letters or more, the token with any one letter deleted
+    — so "BOGARD", "BOGRAD" and "BOGRD" meet in the block "BOGRD".
+    """
+    keys = set()
+    for token in name.split():
+        if token in LEGAL_FORMS or len(token) < 2 or token.isdigit():
+            continue
+        keys.add(token)
+        if len(token) >= 4:
+            keys.update(token[:i] + token[i + 1:] for i in range(len(token)))
+    return keys
+
+
+class EntityIndex:
+    """
+    Known normalized names and the entity each belongs to, with the blocking
+    index used to match new names against them.
+
+    Ids are assigned once and never change, so an index loaded from a
+    previous run (``load``) gives every name seen before the same id again.
+    Only organisation names are filed in the blocking index: people's names
+    are never matched loosely, nor matched against.
+    """
+
+    def __init__(self, table: pd.DataFrame = None):
+        self.entity_of = {}                 # normalized name → entity_id
+        self.entity_names = {}              # entity_id → canonical (first seen, most frequent) name
+        self.by_core = {}                   # name without legal forms → entity_id
+        self.blocks = defaultdict(list)     # block key → names filed under it
+        self.next_id = 1
+        if table is not None:
+            for name, entity_id, entity_name in table[["name", "entity_id", "entity_name"]].itertuples(index=False):
+                self._add(name, int(entity_id), entity_name)
+
+    def __len__(self) -> int:
+        return len(self.entity_of)
+
+    def _add(self, name: str, entity_id: int, entity_name: str = None) -> int:
+        """File *name* under *entity_id*; a new entity is named *entity_name*, or *name* itself."""
+        self.entity_of[name] = entity_id
+        self.next_id = max(self.next_id, entity_id + 1)
+        self.entity_names.setdefault(entity_id, entity_name or name)
+        if not _is_organisation(name):
+            return entity_id
+        if _core(name):
+            self.by_core.setdefault(_core(name), entity_id)
+        for key in _block_keys(name):
+            self.blocks[key].append(name)
+        return entity_id
+
+    def _best_match(self, name: str):
+        """Entity of the most similar known name, if one is similar enough."""
+        candidates = {
+            candidate
+            for key in _block_keys(name)
+            if len(self.blocks.get(key, ())) <= MAX_BLOCK_SIZE
+            for candidate in self.blocks.get(key, ())
+        }
+
+        numbers = _numbers(name)
+        best, best_score = None, MATCH_THRESHOLD
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(name)
+        for candidate in sorted(candidates):      # sorted, so ties go the same way on every run
+            if _numbers(candidate) != numbers:
+                continue
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return None if best is None else self.entity_of[best]
+
+    def resolve_name(self, name: str, fuzzy: bool = True) -> int:
+        """
+        entity_id of one normalized *name*, matching or creating its entity
+        (and remembering it). Without *fuzzy*, and for people's names, only
+        the exact same normalized spelling matches.
+        """
+        entity_id = self.entity_of.get(name)
+        if entity_id is not None:
+            return entity_id
+
+        if fuzzy and _is_organisation(name):
+            entity_id = self.by_core.get(_core(name) or None)
+            if entity_id is None:
+                entity_id = self._best_match(name)
+        if entity_id is None:
+            entity_id = self.next_id
+        return self._add(name, entity_id)
+
+    def resolve(self, names: pd.Series, fuzzy: bool = True) -> pd.Series:
+        """
+        entity_id of every raw name in *names* (<NA> for "Unknown"). New
+        distinct names are resolved most frequent first, so the commonest
+        spelling of an entity becomes its canonical name; *fuzzy* as in
+        ``resolve_name``.
+        """
+        normalized = normalize_names(names)
+        counts = normalized.value_counts()
+        new = [(-count, name) for name, count in counts.items() if name not in self.entity_of]
+        for _, name in sorted(new):
+            self.resolve_name(name, fuzzy)
+        return normalized.map(self.entity_of).astype("Int64")
+
+    def table(self) -> pd.DataFrame:
+        """Every known normalized name with its entity_id and the entity's canonical name."""
+        return pd.DataFrame({
+            "name": pd.Series(list(self.entity_of), dtype=object),
+            "entity_id": pd.Series(list(self.entity_of.values()), dtype="int64"),
+            "entity_name": pd.Series([self.entity_names[i] for i in self.entity_of.values()], dtype=object),
+        })
+
+    @classmethod
+    def load(cls, path) -> "EntityIndex":
+        """The index saved at *path*, or an empty one if nothing has been saved there yet."""
+        return cls(pd.read_parquet(path)) if os.path.exists(path) else cls()
+
+    def save(self, path) -> None:
+        """Save the entity table to *path* (Parquet), through a temporary file."""
+        self.table().to_parquet(str(path) + ".tmp", index=False)
+        os.replace(str(path) + ".tmp", path)
+
+
+def add_entity_ids(evictions: pd.DataFrame, index: EntityIndex) -> pd.DataFrame:
+    """
+    Add ``plaintiff_entity_id`` / ``defendant_entity_id`` to *evictions*,
+    resolved through *index* (loosely only for the ``FUZZY_SIDES``).
+    """
+    for side, col in ENTITY_COLUMNS.items():
+        evictions[col] = index.resolve(evictions[side], fuzzy=side in FUZZY_SIDES)
+    return evictions
+
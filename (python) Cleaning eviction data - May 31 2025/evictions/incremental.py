@@ -0,0 +1,210 @@
+# Incremental re-cleaning: fingerprint every raw_record and parse only the records that are new or changed
+import os            # paths inside the dataset directory
+
+import numpy as np   # primary keys of new records
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .dataset import (
+    drop_partition,
+    list_partitions,
+    partition_keys,
+    read_partition,
+    write_partition,
+)
+from .entities import ENTITY_COLUMNS, EntityIndex, add_entity_ids
+from .ingest import read_raw_records
+from .metrics import cleaning_counts, entity_counts, maybe_stage
+from .parallel import clean_parallel
+from .parser import COLUMNS, parse_records
+
+# Bookkeeping files kept next to the partitions; the leading underscore keeps Parquet readers from
+# mistaking them for data
+MANIFEST_FILE = "_manifest.parquet"
+DELTA_FILE = "_delta.csv"
+
+# One row per record of the last run: its key, what it looked like and which case and partition it belongs to
+MANIFEST_COLUMNS = ["primary_key", "record_hash", "case_id", "partition"]
+
+
+def fingerprint(raw_records: pd.Series) -> np.ndarray:
+    """64-bit content hash of every raw_record (stable across runs and machines)."""
+    return pd.util.hash_pandas_object(raw_records, index=False).to_numpy()
+
+
+def load_manifest(root) -> pd.DataFrame:
+    """The manifest of the previous run under *root*, or an empty one before the first run."""
+    path = os.path.join(root, MANIFEST_FILE)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    return pd.DataFrame({
+        "primary_key": pd.Series(dtype="int64"),
+        "record_hash": pd.Series(dtype="uint64"),
+        "case_id": pd.Series(dtype=object),
+        "partition": pd.Series(dtype=object),
+    })
+
+
+def match_records(previous: pd.DataFrame, record_hash: np.ndarray) -> pd.DataFrame:
+    """
+    primary_key, record_hash, case_id and partition of every current record,
+    in export order: a record whose fingerprint the *previous* manifest lists
+    gets its row back (the n-th copy of a repeated record that manifest's
+    n-th, by primary_key); the others get missing case_id / partition and
+    keys numbered on from the previous run's highest.
+    """
+    current = pd.DataFrame({"record_hash": record_hash})
+    current["copy"] = current.groupby("record_hash").cumcount()
+    seen = previous.sort_values("primary_key")
+    seen = seen.assign(copy=seen.groupby("record_hash").cumcount())
+    current = current.merge(seen, on=["record_hash", "copy"], how="left").drop(columns="copy")
+
+    fresh = current["primary_key"].isna().to_numpy()
+    first = int(previous["primary_key"].max()) + 1 if len(previous) else 1
+    current.loc[fresh, "primary_key"] = np.arange(first, first + fresh.sum())
+    current = current.astype({"primary_key": "int64", "case_id": object, "partition": object})
+    return current[MANIFEST_COLUMNS]
+
+
+def delta_report(previous: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+    """
+    case_ids that were inserted, updated or removed between two manifests.
+
+    A case_id is "updated" when it appears in both runs but the set of raw
+    records carrying it differs.
+    """
+    old_ids = set(previous["case_id"].dropna())
+    new_ids = set(current["case_id"].dropna())
+
+    pairs = (
+        previous[["case_id", "record_hash"]].drop_duplicates()
+            .merge(current[["case_id", "record_hash"]].drop_duplicates(), how="outer", indicator=True)
+    )
+    changed_ids = set(pairs.loc[pairs["_merge"] != "both", "case_id"].dropna())
+
+    delta = pd.DataFrame(
+        [(case_id, "inserted") for case_id in new_ids - old_ids]
+        + [(case_id, "updated") for case_id in changed_ids & old_ids & new_ids]
+        + [(case_id, "removed") for case_id in old_ids - new_ids],
+        columns=["case_id", "change"],
+    )
+    return delta.sort_values(["change", "case_id"], ignore_index=True)
+
+
+def clean_incremental(
+    input_path,
+    root,
+    mode: str = "lines",
+    parser: str = "single_pass",
+    encoding: str = "utf-8",
+    workers: int = 1,
+    date_rules=None,
+    entities=None,
+    analytics=None,
+    metrics=None,
+) -> pd.DataFrame:
+    """
+    Bring the partitioned dataset at *root* up to date with the export at *input_path*.
+
+    Every raw_record is fingerprinted; records whose fingerprint was seen in
+    the previous run keep their ``primary_key`` and parsed fields, and only
+    new or changed records are parsed, numbered on from the previous run's
+    highest key (``match_records``). Only partitions (filing years) that
+    gained or lost records are rewritten, so a record inserted anywhere in
+    the export touches its own partition only. The first run numbers records
+    by position; later runs read back (``read_dataset``) as a full re-clean
+    of the export would, apart from the keys of records added or changed
+    since — and the row order those keys give. Returns the delta report of
+    inserted, updated and removed case_ids, which is also written to
+    ``_delta.csv``.
+    *date_rules* (see dates.py) only reach the records that are parsed, so
+    after changing them rebuild the dataset from scratch (``clean_export``).
+    *entities* (path of the saved entity table, see entities.py) adds entity
+    ids to the parsed records — unchanged records keep the ids they were
+    written with — and needs the same rebuild when it is switched on or off.
+    *analytics* (path of a DuckDB file, see analytics.py) has its summary
+    tables refreshed afterwards, re-reading only the partitions rewritten.
+    *metrics* (a ``Metrics``) records the ingest / fingerprint / clean / write
+    stages; ``clean`` only counts the records that were actually parsed.
+    """
+    os.makedirs(root, exist_ok=True)
+    previous = load_manifest(root)
+
+    # -- fingerprint the current export; records seen before keep their key, case_id and partition ---
+    with maybe_stage(metrics, "ingest") as stage:
+        raw_data = read_raw_records(input_path, mode=mode, encoding=encoding)
+        stage.rows_out += len(raw_data)
+    with maybe_stage(metrics, "fingerprint", len(raw_data)) as stage:
+        current = match_records(previous, fingerprint(raw_data["raw_record"]))
+        stage.rows_out += len(current)
+
+    # -- the rest are parsed --
+    fresh = current["partition"].isna().to_numpy()
+
+    with maybe_stage(metrics, "clean", int(fresh.sum())) as stage:
+        if fresh.any():
+            parsed = clean_parallel(raw_data[fresh], workers=workers, parser=parser, date_rules=date_rules)
+        else:
+            parsed = parse_records(raw_data["raw_record"].iloc[:0])  # empty table with the cleaned columns
+        stage.rows_out += len(parsed)
+    if metrics is not None:
+        metrics["clean"].add_counts(cleaning_counts(parsed))
+
+    columns = COLUMNS
+    if entities is not None:
+        columns = COLUMNS + list(ENTITY_COLUMNS.values())
+        with maybe_stage(metrics, "entities", len(parsed)) as stage:
+            index = EntityIndex.load(entities) if len(parsed) else EntityIndex()  # nothing new: skip loading
+            add_entity_ids(parsed, index)
+            if len(parsed):
+                index.save(entities)
+            stage.rows_out += len(parsed)
+            stage.add_counts(entity_counts(parsed))
+
+    parsed["primary_key"] = current.loc[fresh, "primary_key"].to_numpy()
+    parsed["record_hash"] = current.loc[fresh, "record_hash"].to_numpy()
+    current.loc[fresh, "case_id"] = parsed["case_id"].to_numpy()
+    current.loc[fresh, "partition"] = partition_keys(parsed).to_numpy()
+    parsed["partition"] = current.loc[fresh, "partition"].to_numpy()
+
+    # -- a partition is dirty when its (primary_key, record_hash) rows differ ----
+    keys = ["primary_key", "record_hash", "partition"]
+    rows = previous[keys].merge(current[keys], how="outer", indicator=True)
+    dirty = set(rows.loc[rows["_merge"] != "both", "partition"])
+
+    with maybe_stage(metrics, "write") as stage:
+        for key in sorted(dirty):
+            members = current[current["partition"] == key]
+            if members.empty:
+                drop_partition(root, key)
+                continue
+
+            pieces = [parsed[parsed["partition"] == key]]
+
+            # Unchanged records: take their fields from last run's file, where they have the same primary_key
+            reused = members[~fresh[members.index]]
+            if len(reused) and key in list_partitions(root):
+                old = read_partition(root, key)
+                pieces.append(old[old["primary_key"].isin(reused["primary_key"])])
+            if sum(len(piece) for piece in pieces) != len(members):
+                raise RuntimeError(
+                    f"Partition {key!r} under {root!r} no longer matches its manifest; "
+                    "delete the dataset directory and rebuild it"
+                )
+
+            evictions = (
+                pd.concat(pieces, ignore_index=True)
+                  .sort_values("primary_key", ignore_index=True)
+                  [columns]
+            )
+            write_partition(root, key, evictions)
+            stage.rows_out += len(evictions)
+
+    # -- bookkeeping for the next run ---------------------------------------------
+    delta = delta_report(previous, current)
+    current[MANIFEST_COLUMNS].to_parquet(os.path.join(root, MANIFEST_FILE), index=False)
+    delta.to_csv(os.path.join(root, DELTA_FILE), index=False)
+
+    if analytics is not None:
+        from .analytics import refresh_analytics  # DuckDB is only imported when summary tables are kept
+        refresh_analytics(analytics, root, metrics)
+    return delta
@@ -0,0 +1,167 @@
+# Read the raw court export into a one-column frame (raw_record) with whitespace collapsed
+import csv          # C-implemented CSV tokenizer, used only for lines that contain quote characters
+import re           # regular-expression engine for finding and replacing text patterns
+from itertools import islice  # takes a bounded block of lines from an open file
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+# Ways of reading the export (see iter_raw_records)
+INGEST_MODES = ("lines", "csv")
+
+# Cell values pandas.read_csv treats as missing by default; the "csv" mode drops these cells before joining
+NA_TOKENS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+_NA_SET = frozenset(NA_TOKENS)
+
+# A whole comma-delimited field that is one of the NA tokens (longest first so alternation can't stop short)
+_na_field_regex = (
+    r"(?<![^,])(?:"
+    + "|".join(re.escape(t) for t in sorted(_NA_SET - {""}, key=len, reverse=True))
+    + r")(?![^,])"
+)
+
+# A whole field made only of whitespace; read_csv keeps it, so it still adds a separator when joined
+_blank_field_regex = r"(?<![^,])\s+(?![^,])"
+
+# Placeholder for a blank field; not whitespace, so it survives collapsing and is removed afterwards
+_BLANK_MARK = "\x00"
+
+
+# Creates a helper named squeeze that trims a string and turns any run of tabs, new-lines, or multiple spaces into a single space
+def squeeze(text: str) -> str:
+    return re.sub(r"\s+", " ", str(text).strip())
+
+
+def _join_fields(fields: list[str]) -> str:
+    """Join the non-missing cells of one parsed row, the way the "csv" mode does."""
+    return " ".join(squeeze(f) for f in fields if f not in _NA_SET)
+
+
+def collapse_lines(lines: pd.Series) -> pd.Series:
+    """
+    Turn physical CSV lines into raw_record text without splitting them into columns.
+
+    Equivalent to parsing each line with ``read_csv``, dropping missing cells,
+    squeezing every remaining cell and joining them with one space. Ordinary
+    lines are handled with whole-column regex replacements; only lines that
+    contain a quote character are tokenized with the ``csv`` module.
+    """
+    quoted = lines.str.contains('"', regex=False)
+
+    records = (
+        lines
+            .str.replace(_na_field_regex, "", regex=True)           # missing cells contribute nothing
+            .str.replace(_blank_field_regex, _BLANK_MARK, regex=True)  # blank cells still add a separator
+            .str.replace(",", " ", regex=False)                      # cell boundaries become spaces
+            .str.replace(r"\s+", " ", regex=True)                    # squeeze
+            .str.strip()
+            .str.replace(_BLANK_MARK, "", regex=False)
+    )
+
+    if quoted.any():
+        records[quoted] = [_join_fields(fields) for fields in csv.reader(lines[quoted])]
+
+    return records
+
+
+def iter_raw_lines(path, chunksize=None, encoding: str = "utf-8"):
+    """
+    Yield ``raw_record`` frames built from up to *chunksize* physical lines each
+    (the "lines" mode); ``None`` reads the whole file as one frame.
+
+    Matches ``read_raw_csv`` except that every cell is kept as the text it was
+    written as: read_csv would render a numeric overflow column through float
+    (``12`` → ``12.0`` next to a missing cell). Quoted cells spanning several
+    physical lines are not supported.
+    """
+    header_seen = False
+    with open(path, encoding=encoding) as f:
+        while True:
+            block = f.readlines() if chunksize is None else list(islice(f, chunksize))
+            if not block:
+                break
+
+            lines = pd.Series(block, dtype=object).str.removesuffix("\n")
+
+            # read_csv skips blank lines; the first remaining line is the header
+            lines = lines[lines.str.strip(" \t") != ""]
+            if not header_seen and len(lines):
+                lines = lines.iloc[1:]
+                header_seen = True
+
+            if len(lines):
+                yield pd.DataFrame({"raw_record": collapse_lines(lines).to_numpy()})
+            if chunksize is None:
+                break
+
+
+def read_raw_lines(path, encoding: str = "utf-8") -> pd.DataFrame:
+    """Read *path* line by line straight into ``raw_record`` (the "lines" mode)."""
+    chunks = list(iter_raw_lines(path, encoding=encoding))
+    if not chunks:
+        return pd.DataFrame({"raw_record": pd.Series(dtype=object)})
+    return chunks[0]
+
+
+def _rejoin_cells(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """Glue each row of a read_csv frame back into a single raw_record column."""
+    # For each row in raw_data:
+    #   1. Remove empty cells,
+    #   2. Clean every remaining cell with squeeze,
+    #   3. Join the pieces with one space,
+    # then write that joined text back into the first column
+    raw_data.iloc[:, 0] = (
+        raw_data
+            .apply(lambda r: " ".join(r.dropna().map(squeeze)), axis=1)
+    )
+
+    # Deletes any extra columns whose names start with “Unnamed” (common placeholders from CSV import)
+    raw_data = raw_data.loc[:, ~raw_data.columns.str.match(r"^Unnamed")]
+
+    # Rename the sole remaining column for clarity
+    raw_data.columns = ["raw_record"]
+    return raw_data
+
+
+def read_raw_csv(path, encoding: str = "utf-8") -> pd.DataFrame:
+    """Read *path* with ``read_csv`` and glue each row's cells back together (the "csv" mode)."""
+    # Load properties raw data
+    return _rejoin_cells(pd.read_csv(path, encoding=encoding))
+
+
+def iter_raw_records(path, mode: str = "lines", chunksize=None, encoding: str = "utf-8"):
+    """
+    Yield the raw export as ``raw_record`` frames of bounded size.
+
+    In "lines" mode *chunksize* counts physical lines, in "csv" mode rows;
+    ``None`` yields the whole file at once. Note that read_csv infers cell
+    types per chunk in "csv" mode.
+    """
+    if mode == "lines":
+        yield from iter_raw_lines(path, chunksize=chunksize, encoding=encoding)
+    elif mode == "csv":
+        if chunksize is None:
+            yield read_raw_csv(path, encoding=encoding)
+        else:
+            with pd.read_csv(path, encoding=encoding, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    yield _rejoin_cells(chunk).reset_index(drop=True)
+    else:
+        raise ValueError(f"Unknown ingestion mode {mode!r}; expected one of {INGEST_MODES}")
+
+
+def read_raw_records(path, mode: str = "lines", encoding: str = "utf-8") -> pd.DataFrame:
+    """
+    Load the raw export as a one-column ``raw_record`` frame.
+
+    *mode* is ``"lines"`` (read physical lines and collapse them with column-wide
+    regexes) or ``"csv"`` (split into columns with read_csv, then re-join row by row).
+    """
+    if mode == "lines":
+        return read_raw_lines(path, encoding=encoding)
+    if mode == "csv":
+        return read_raw_csv(path, encoding=encoding)
+    raise ValueError(f"Unknown ingestion mode {mode!r}; expected one of {INGEST_MODES}")
@@ -0,0 +1,103 @@
+# The whole cleaning job as one call: raw export in, cleaned Parquet (file or partitioned folder) out
+from .dataset import export_evictions
+from .entities import EntityIndex, add_entity_ids
+from .ingest import read_raw_records
+from .metrics import cleaning_counts, entity_counts, maybe_stage
+from .parallel import clean_parallel
+from .schema import compact_frame
+from .streaming import clean_to_dataset, clean_to_parquet
+from .summary import EvictionSummary
+
+
+def clean_export(
+    input_path,
+    output_path,
+    ingest: str = "lines",
+    parser: str = "single_pass",
+    chunksize=None,
+    workers: int = 1,
+    compact: bool = False,
+    drop_raw_record: bool = False,
+    partitioned: bool = False,
+    encoding: str = "utf-8",
+    date_rules=None,
+    entities=None,
+    analytics=None,
+    metrics=None,
+) -> EvictionSummary:
+    """
+    Clean the raw export at *input_path* and write it to *output_path*.
+
+    With *chunksize* ``None`` the whole file is loaded, cleaned and exported at
+    once; otherwise it is streamed through in chunks of that many lines (see
+    streaming.py). *partitioned* writes a filing-year partitioned folder
+    instead of a single file. Paths are used as given — nothing depends on the
+    working directory, so several jobs can run side by side in one process.
+    *date_rules* are the year repairs applied to the dates (see dates.py).
+    *entities* is the path of the saved entity table (see entities.py): when
+    given, plaintiff / defendant entity ids are added and the table, grown by
+    this run's new names, is saved back. *analytics* is the path of a DuckDB
+    file of summary tables (see analytics.py), refreshed from the output once
+    it is written.
+    Returns the quality checks; *metrics* (a ``Metrics``) records each stage.
+    """
+    if chunksize is not None:
+        write_chunks = clean_to_dataset if partitioned else clean_to_parquet
+        summary = write_chunks(
+            input_path,
+            output_path,
+            chunksize=chunksize,
+            mode=ingest,
+            parser=parser,
+            encoding=encoding,
+            workers=workers,
+            compact=compact,
+            drop_raw_record=drop_raw_record,
+            date_rules=date_rules,
+            entities=entities,
+            metrics=metrics,
+        )
+        if analytics is not None:
+            from .analytics import refresh_analytics  # DuckDB is only imported when summary tables are kept
+            refresh_analytics(analytics, output_path, metrics)
+        return summary
+
+    with maybe_stage(metrics, "ingest") as stage:
+        raw_data = read_raw_records(input_path, mode=ingest, encoding=encoding)
+        stage.rows_out += len(raw_data)
+
+    with maybe_stage(metrics, "clean", len(raw_data)) as stage:
+        evictions = clean_parallel(raw_data, workers=workers, parser=parser, date_rules=date_rules)
+        stage.rows_out += len(evictions)
+    if metrics is not None:
+        metrics["clean"].add_counts(cleaning_counts(evictions))
+
+    # Group the spellings of each landlord / tenant under one entity id, reusing the ids of earlier runs
+    if entities is not None:
+        with maybe_stage(metrics, "entities", len(evictions)) as stage:
+            index = EntityIndex.load(entities)
+            add_entity_ids(evictions, index)
+            index.save(entities)
+            stage.rows_out += len(evictions)
+            stage.add_counts(entity_counts(evictions))
+
+    with maybe_stage(metrics, "summary", len(evictions)):
+        summary = EvictionSummary().update(evictions)
+
+    # Swap to the compact in-memory types once the checks are done
+    if compact:
+        with maybe_stage(metrics, "compact", len(evictions)) as stage:
+            evictions = compact_frame(evictions, drop_raw_record=drop_raw_record)
+            stage.rows_out += len(evictions)
+
+    with maybe_stage(metrics, "write", len(evictions)) as stage:
+        export_evictions(evictions, output_path, compact=compact,
+                         drop_raw_record=drop_raw_record, partitioned=partitioned)
+        stage.rows_out += len(evictions)
+
+    # Bring the dashboards' summary tables up to date with what was just written
+    if analytics is not None:
+        from .analytics import refresh_analytics
+        refresh_analytics(analytics, output_path, metrics)
+
+    return summary
@@ -0,0 +1,206 @@
+# Lazy query-engine backend: the cleaning rules of stepwise.py written as one Polars LazyFrame plan
+#
+# Every column is an expression over raw_record, so Polars optimizes the whole plan at once, runs it on all cores
+# and materializes only the finished columns (no raw_data.copy(), no reassigned raw_record, no per-row lists).
+# The patterns are the shared ones in patterns.py: Polars' regex engine is Unicode-aware like Python's and picks
+# the same leftmost-first match. It has no backreferences, so the rules that look for a row's own case_id /
+# case_number are written differently (see _fallback_defendant and _address); the result is the same table,
+# column for column, as parse_records and clean_stepwise.
+import numpy as np   # missing-value marker used by pandas string extraction
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+import polars as pl  # lazy, multi-threaded columnar query engine
+
+from .dates import convert_dates, two_dates_regex
+from .parser import COLUMNS, FALLBACK_ROWS
+from .patterns import (
+    CASE_TYPE_NOISE,
+    NO_ADDRESS,
+    NULL_TAIL,
+    STATUS_UNAVAILABLE,
+    STATUS_UNAVAILABLE_CODE,
+    UNKNOWN,
+    case_id_regex,
+    case_number_regex,
+    case_regex,
+    fallback_tail_regex,
+    first_token_regex,
+    first_token_strip_regex,
+    multi_space_regex,
+    standalone_number_regex,
+    status_code_regex,
+    status_prefix_regex,
+    timestamp_regex,
+    vs_split_regex,
+    vs_token_regex,
+)
+
+# Case-insensitive patterns carry their flag inline
+_vs_split = "(?i)" + vs_split_regex.pattern
+_vs_token = "(?i)" + vs_token_regex.pattern
+
+# case_id is the record's first token, so its first occurrence is at the very start: the fallback defendant is the
+# tail pattern tried right after it (a later occurrence can only match when this one does)
+_fallback = r"^\S+" + fallback_tail_regex.pattern
+
+# Wraps the standalone 5-digit numbers after the second date while the address is looked up (records hold no NULs)
+_MARK = "\x00"
+
+# Text columns whose missing values are NaN in the pandas paths (case_type also has <NA>, see clean_lazy)
+_MISSING_AS_NAN = ["case_id", "case_number", "case_type", "case_name"]
+
+# Set on rows whose case_type was CASE_TYPE_NOISE; dropped before the table is returned
+_NOISE = "_case_type_noise"
+
+# Set on rows whose defendant came from the fallback search; counted into attrs[FALLBACK_ROWS] and dropped
+_FALLBACK = "_fallback_defendant"
+
+
+def _or_unknown(text: pl.Expr, label: str = UNKNOWN) -> pl.Expr:
+    """*text* with empty and missing values replaced by *label*."""
+    return pl.when(text == "").then(pl.lit(label)).otherwise(text).fill_null(label)
+
+
+def _bytes_slice(text: pl.Expr, offset: pl.Expr, length: pl.Expr = None) -> pl.Expr:
+    """Slice of *text* by byte *offset* / *length* (what ``str.find`` returns), cut on character boundaries."""
+    return text.cast(pl.Binary).bin.slice(offset, length).cast(pl.String)
+
+
+def _parties(case_name: pl.Expr) -> tuple:
+    """Plaintiff / defendant around the first VS, with the "Unknown" clean-up already applied."""
+    sides = case_name.str.extract_groups(_vs_split)
+    plaintiff = (
+        pl.when(case_name.is_null()).then(pl.lit(UNKNOWN))
+          .when(sides.struct.field("plaintiff").is_null()).then(case_name.str.strip_chars(' "'))
+          .otherwise(_or_unknown(sides.struct.field("plaintiff").str.strip_chars(' "')))
+    )
+    defendant = _or_unknown(sides.struct.field("defendant").str.strip_chars(' "'))
+
+    unknown_side = (plaintiff == UNKNOWN) | (defendant == UNKNOWN)
+    plaintiff, defendant = (
+        pl.when(unknown_side)
+          .then(_or_unknown(side.str.replace_all(_vs_token, "").str.strip_chars(' "')))
+          .otherwise(side)
+        for side in (plaintiff, defendant)
+    )
+    return plaintiff, defendant
+
+
+def _fallback_defendant(raw_record: pl.Expr) -> pl.Expr:
+    """Text between the record's case_id and its last number, tidied, or "Unknown"."""
+    name = (
+        raw_record.str.extract(_fallback, 1)
+                  .str.strip_chars(' "')
+                  .str.replace_all(multi_space_regex.pattern, " ")  # collapse double spaces
+                  .str.replace_all(_vs_token, "")                   # remove stray VS tokens
+                  .str.strip_chars()
+    )
+    return _or_unknown(name)
+
+
+def _address(record: pl.Expr, second_date: pl.Expr, case_number: pl.Expr) -> pl.Expr:
+    """
+    Text between the second ISO date and the next standalone case_number, or
+    "No address listed": the first occurrence of the date's text is found
+    literally; in what follows every standalone 5-digit number is wrapped in
+    ``_MARK`` so the case_number's first standalone occurrence is a literal
+    search too (a pattern per row would be compiled once per row).
+    """
+    after_date = record.str.find(second_date, literal=True) + second_date.str.len_bytes()
+    trailing = _bytes_slice(record, after_date)
+    marked = trailing.str.replace_all(standalone_number_regex.pattern, f"{_MARK}${{0}}{_MARK}")
+    end = marked.str.find(_MARK + case_number + _MARK, literal=True)
+    address = pl.when(end.is_not_null()).then(_bytes_slice(marked, 0, end).str.replace_all(_MARK, "", literal=True))
+    address = (
+        address.str.strip_chars(' "')
+               .str.replace_all("\t", " ", literal=True)         # tabs → single space
+               .str.replace_all(multi_space_regex.pattern, " ")  # ≥2 spaces → 1
+    )
+    return _or_unknown(address, NO_ADDRESS)
+
+
+def _plan(raw_records: pl.LazyFrame, start: int) -> pl.LazyFrame:
+    """The cleaning rules over a LazyFrame with a ``raw_record`` column, as one plan (dates and code still text)."""
+    raw_record = pl.col("raw_record")
+
+    # -- identifiers (the fourth space-separated token is the case type, unless it is a stray first name) -------
+    token = raw_record.str.split(" ").list.get(3, null_on_oob=True)
+    case_type = pl.when(token == CASE_TYPE_NOISE).then(None).otherwise(token)
+
+    # -- case name, minus a leading copy of case_type ------------------------------------------------------------
+    case_name = raw_record.str.extract(case_regex.pattern, 1).str.strip_chars(' "')
+    prefixed = case_name.str.extract(first_token_regex.pattern, 1).fill_null("") == case_type.fill_null("")
+    case_name = (
+        pl.when(prefixed)
+          .then(case_name.str.replace(first_token_strip_regex.pattern, "").str.strip_chars_start(' "'))
+          .otherwise(case_name)
+    )
+    cleaned = raw_records.with_columns(
+        case_id=raw_record.str.extract(case_id_regex.pattern, 1),
+        case_number=raw_record.str.extract(case_number_regex.pattern, 1),
+        case_type=case_type,
+        case_name=case_name,
+        **{_NOISE: (token == CASE_TYPE_NOISE).fill_null(False)},
+    )
+
+    # -- parties, and everything read from the record with the time stamps removed -------------------------------
+    plaintiff, defendant = _parties(pl.col("case_name"))
+    record = (
+        raw_record.str.replace_all(timestamp_regex.pattern, "")
+                  .str.replace_all(multi_space_regex.pattern, " ")
+                  .str.strip_chars()
+    )
+    cleaned = cleaned.with_columns(
+        plaintiff=plaintiff,
+        defendant=pl.when(defendant == UNKNOWN).then(_fallback_defendant(raw_record)).otherwise(defendant),
+        record=record,
+        **{_FALLBACK: defendant == UNKNOWN},
+    )
+
+    record = pl.col("record")
+    dates = record.str.extract_groups(two_dates_regex.pattern)
+    null_tail = record.str.ends_with(NULL_TAIL)
+    case_status = _or_unknown(record.str.replace_all(status_prefix_regex.pattern, "").str.strip_chars(' "'))
+    cleaned = cleaned.with_columns(
+        filing_date=dates.struct.field("first"),
+        execution_date=dates.struct.field("second"),
+        address=_address(record, dates.struct.field("second"), pl.col("case_number")),
+        case_status_code=(
+            pl.when(null_tail).then(pl.lit(str(STATUS_UNAVAILABLE_CODE)))
+              .otherwise(record.str.extract(status_code_regex.pattern, 1).fill_null(UNKNOWN))
+        ),
+        case_status=pl.when(null_tail).then(pl.lit(STATUS_UNAVAILABLE)).otherwise(case_status),
+    )
+
+    # A "Status unavailable" row has no execution date
+    return cleaned.with_columns(
+        primary_key=pl.int_range(start, start + pl.len(), dtype=pl.Int64),
+        raw_record=record,
+        execution_date=pl.when(pl.col("case_status") == STATUS_UNAVAILABLE).then(None).otherwise("execution_date"),
+    ).select(COLUMNS + [_NOISE, _FALLBACK])
+
+
+def clean_lazy(raw_data: pd.DataFrame, start: int = 1, date_rules=None) -> pd.DataFrame:
+    """
+    Clean a one-column ``raw_record`` frame with the lazy Polars plan.
+
+    Produces the same columns, values and dtypes as ``parse_records``;
+    ``primary_key`` numbering begins at *start*. *date_rules* are the year
+    repairs (``sentinel_year_rules``; the default fixes the 2102 typo),
+    applied when the dates are converted, through the shared date cache.
+    """
+    raw_records = pl.from_pandas(raw_data[["raw_record"]].astype({"raw_record": object}))
+    evictions = _plan(raw_records.lazy(), start).collect().to_pandas()
+
+    # Missing text is NaN as in the pandas paths; a case_type dropped as noise is <NA>, as clean_stepwise leaves it
+    for col in _MISSING_AS_NAN:
+        evictions[col] = evictions[col].where(evictions[col].notna(), np.nan)
+    evictions.loc[evictions.pop(_NOISE).to_numpy(), "case_type"] = pd.NA
+    fallback = int(evictions.pop(_FALLBACK).sum())
+
+    # Convert both date columns from text to true datetime objects, each distinct date parsed once; bad strings become NaT
+    convert_dates(evictions, date_rules)
+
+    # Coerce numeric (by pandas, which reads every digit Python does and raises on a leftover "Unknown" the same way)
+    evictions["case_status_code"] = evictions["case_status_code"].astype("int64")
+    evictions.attrs[FALLBACK_ROWS] = fallback
+    return evictions
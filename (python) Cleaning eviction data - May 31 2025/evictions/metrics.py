@@ -0,0 +1,52 @@
+# Per-stage instrumentation of the cleaner: the recorder shared with the geocoding project (pipeline_metrics/ at
+# the repository root — timings, memory, rows, match rates, JSON / OpenMetrics output, profiler hooks) and the
+# cleaner's own match rates. The root has to be on sys.path; the script, the CLIs, the tests and the benchmarks
+# put it there
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+from pipeline_metrics import (  # the recorder both projects share
+    PROFILERS,
+    Metrics,
+    StageMetrics,
+    cprofile_hook,
+    maybe_stage,
+    sampling_hook,
+)
+
+from .parser import FALLBACK_ROWS
+from .patterns import NO_ADDRESS, STATUS_UNAVAILABLE, UNKNOWN
+
+
+# -- match rates of the cleaner -------------------------------------------------------
+
+def cleaning_counts(evictions: pd.DataFrame) -> dict:
+    """
+    How many cleaned rows took each notable path through the parser: case_regex
+    found a case name, the defendant came from the ``fallback_defendant`` search
+    (and whether that found nothing), the address or a date is missing, the
+    case type is missing or noise, and the status is unavailable.
+
+    The fallback count is the one the parser left in ``evictions.attrs``
+    while it split the case names, so it is only reported for a table
+    straight from ``clean_records`` / ``clean_parallel``.
+    """
+    counts = {
+        "case_regex_matched": int(evictions["case_name"].notna().sum()),
+        # A defendant is only ever "Unknown" when the fallback ran and found nothing either
+        "fallback_defendant_unknown": int((evictions["defendant"] == UNKNOWN).sum()),
+        "address_missing": int((evictions["address"] == NO_ADDRESS).sum()),
+        "filing_date_missing": int(evictions["filing_date"].isna().sum()),
+        "execution_date_missing": int(evictions["execution_date"].isna().sum()),
+        "case_type_missing": int(evictions["case_type"].isna().sum()),
+        "status_unavailable": int((evictions["case_status"] == STATUS_UNAVAILABLE).sum()),
+    }
+    if FALLBACK_ROWS in evictions.attrs:
+        counts["fallback_defendant"] = evictions.attrs[FALLBACK_ROWS]
+    return counts
+
+
+def entity_counts(evictions: pd.DataFrame) -> dict:
+    """How many cleaned rows have a plaintiff / defendant entity (the rest are "Unknown")."""
+    return {
+        "plaintiff_entity_resolved": int(evictions["plaintiff_entity_id"].notna().sum()),
+        "defendant_entity_resolved": int(evictions["defendant_entity_id"].notna().sum()),
+    }
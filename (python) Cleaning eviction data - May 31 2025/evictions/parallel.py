@@ -0,0 +1,90 @@
+# Multi-core cleaning: shard records across a process pool and stitch the results back in order
+import multiprocessing  # "spawn" start method for the worker processes
+import os            # CPU count for the default worker count
+from collections import deque  # bounded queue of in-flight chunks
+from concurrent.futures import ProcessPoolExecutor  # pool of worker processes
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .parser import FALLBACK_ROWS
+from .pipeline import clean_records
+
+# Workers start as fresh interpreters instead of forks of this one: a forked copy of a process that has already
+# started Polars' thread pool (parser="lazy") can hang on a lock some pool thread held at the fork
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def default_workers() -> int:
+    """Number of worker processes used when none is given: one per CPU."""
+    return os.cpu_count() or 1
+
+
+def clean_parallel(
+    raw_data: pd.DataFrame,
+    workers=None,
+    parser: str = "single_pass",
+    shard_size=None,
+    start: int = 1,
+    date_rules=None,
+) -> pd.DataFrame:
+    """
+    Clean *raw_data* on *workers* processes and return the same table as ``clean_records``.
+
+    Records are cut into contiguous shards (by default four per worker, so a
+    slow shard doesn't leave the other cores idle); each shard's ``primary_key``
+    numbering starts at its offset in *raw_data*, and shards are concatenated
+    in their original order, so the result — and any Parquet file written from
+    it — is identical to the serial path. Workers are spawned, so a script
+    must call this from under ``if __name__ == "__main__":``.
+    """
+    workers = workers or default_workers()
+    if workers <= 1 or len(raw_data) < 2:
+        return clean_records(raw_data, parser=parser, start=start, date_rules=date_rules)
+
+    shard_size = shard_size or -(-len(raw_data) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_CONTEXT) as pool:
+        futures = [
+            pool.submit(
+                clean_records,
+                raw_data.iloc[offset:offset + shard_size],
+                parser=parser,
+                start=start + offset,
+                date_rules=date_rules,
+            )
+            for offset in range(0, len(raw_data), shard_size)
+        ]
+        shards = [future.result() for future in futures]
+
+    evictions = pd.concat(shards, ignore_index=True)
+    evictions.attrs[FALLBACK_ROWS] = sum(shard.attrs[FALLBACK_ROWS] for shard in shards)
+    return evictions
+
+
+def clean_chunks_parallel(chunks, workers=None, parser: str = "single_pass", start: int = 1, date_rules=None):
+    """
+    Clean an iterator of ``raw_record`` frames on a process pool, yielding results in input order.
+
+    At most two chunks per worker are in flight at once, so memory stays
+    bounded by the chunk size however long the input is. ``primary_key``
+    numbering continues across chunks from *start*. Workers are spawned, as
+    in ``clean_parallel``.
+    """
+    workers = workers or default_workers()
+    next_key = start
+
+    if workers <= 1:
+        for raw_data in chunks:
+            yield clean_records(raw_data, parser=parser, start=next_key, date_rules=date_rules)
+            next_key += len(raw_data)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_CONTEXT) as pool:
+        pending = deque()
+        for raw_data in chunks:
+            pending.append(pool.submit(clean_records, raw_data, parser=parser, start=next_key, date_rules=date_rules))
+            next_key += len(raw_data)
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,223 @@
+# Single-pass record parser: every field of a raw_record is pulled out in one visit to the string,
+# instead of one full-column scan per field (see stepwise.py for the original column-by-column rules)
+import numpy as np   # missing-value marker used by pandas string extraction
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .dates import convert_dates
+from .patterns import (
+    CASE_TYPE_NOISE,
+    NO_ADDRESS,
+    NULL_TAIL,
+    STATUS_UNAVAILABLE,
+    STATUS_UNAVAILABLE_CODE,
+    UNKNOWN,
+    case_id_regex,
+    case_number_regex,
+    case_regex,
+    date_pattern_regex,
+    fallback_tail_regex,
+    first_token_regex,
+    first_token_strip_regex,
+    multi_space_regex,
+    standalone_number_regex,
+    status_code_regex,
+    status_prefix_regex,
+    timestamp_regex,
+    vs_split_regex,
+    vs_token_regex,
+)
+
+# Columns of the cleaned evictions table, in output order
+COLUMNS = [
+    "primary_key",
+    "raw_record",
+    "case_id",
+    "case_number",
+    "case_type",
+    "case_name",
+    "plaintiff",
+    "defendant",
+    "filing_date",
+    "execution_date",
+    "address",
+    "case_status_code",
+    "case_status",
+]
+
+# Fields returned by parse_record (everything except the primary key), in output order
+FIELDS = COLUMNS[1:]
+
+# Key of DataFrame.attrs where every parser leaves how many rows took the fallback defendant search
+# (metrics.cleaning_counts reads it instead of splitting the case names a second time)
+FALLBACK_ROWS = "fallback_defendant_rows"
+
+
+def _clean_side(text: str) -> str:
+    """Strip stray VS tokens and quotes from a plaintiff/defendant that sits next to an "Unknown"."""
+    text = vs_token_regex.sub("", text).strip(' "')
+    return text if text else UNKNOWN
+
+
+def _split_parties(case_name) -> tuple[str, str]:
+    """Plaintiff / defendant around the first VS, with the "Unknown" clean-up already applied."""
+    if case_name is np.nan:
+        return UNKNOWN, UNKNOWN
+
+    m = vs_split_regex.match(case_name)
+    if m:
+        plaintiff = m.group("plaintiff").strip(' "') or UNKNOWN
+        defendant = m.group("defendant").strip(' "') or UNKNOWN
+    else:
+        plaintiff, defendant = case_name.strip(' "'), UNKNOWN
+
+    if plaintiff == UNKNOWN or defendant == UNKNOWN:
+        plaintiff, defendant = _clean_side(plaintiff), _clean_side(defendant)
+    return plaintiff, defendant
+
+
+def _fallback_defendant(raw_record: str, case_id) -> str:
+    """
+    Text between an occurrence of case_id and the last number in the record.
+
+    Equivalent to searching for ``re.escape(case_id) + fallback_tail_regex``,
+    but tries the shared compiled tail at each occurrence of case_id instead
+    of compiling a new pattern for every row.
+    """
+    if case_id is np.nan:
+        return UNKNOWN
+
+    start = raw_record.find(case_id)
+    while start != -1:
+        m = fallback_tail_regex.match(raw_record, start + len(case_id))
+        if m:
+            name = m.group("name").strip(' "')
+            name = multi_space_regex.sub(" ", name)       # collapse double spaces
+            name = vs_token_regex.sub("", name).strip()   # remove stray VS tokens
+            return name if name else UNKNOWN
+        start = raw_record.find(case_id, start + 1)
+    return UNKNOWN
+
+
+def _address(record: str, second_date, case_number) -> str:
+    """Text between the second ISO date and the next standalone case_number."""
+    if second_date is np.nan or case_number is np.nan:
+        return NO_ADDRESS
+
+    start_of_slice = record.find(second_date) + len(second_date)
+    trailing_text = record[start_of_slice:]
+
+    for m in standalone_number_regex.finditer(trailing_text):
+        if m.group() == case_number:
+            address = trailing_text[:m.start()].strip(' "').replace("\t", " ")
+            address = multi_space_regex.sub(" ", address)
+            return address if address else NO_ADDRESS
+    return NO_ADDRESS
+
+
+def parse_record(raw_record: str) -> tuple:
+    """
+    Return every cleaned field of one raw_record, in ``FIELDS`` order.
+
+    Dates are returned as ``YYYY-MM-DD`` text (or NaN), as written;
+    ``parse_records`` repairs their years and converts them to datetimes in
+    bulk (see dates.py).
+    """
+    return _parse_record(raw_record)[:-1]
+
+
+def _parse_record(raw_record: str) -> tuple:
+    """``parse_record``'s fields followed by whether the defendant came from the fallback search."""
+    # -- identifiers -------------------------------------------------------------
+    m = case_id_regex.match(raw_record)
+    case_id = m.group(1) if m else np.nan
+
+    m = case_number_regex.match(raw_record)
+    case_number = m.group(1) if m else np.nan
+
+    tokens = raw_record.split(" ", 4)
+    case_type = tokens[3] if len(tokens) > 3 else np.nan
+    if case_type == CASE_TYPE_NOISE:
+        case_type = pd.NA
+
+    # -- case name, minus a leading copy of case_type ----------------------------
+    m = case_regex.search(raw_record)
+    if m:
+        case_name = m.group(1).strip(' "')
+        first = first_token_regex.match(case_name)
+        first = first.group(1) if first else ""
+        if first == (case_type if isinstance(case_type, str) else ""):
+            case_name = first_token_strip_regex.sub("", case_name, count=1).lstrip(' "')
+    else:
+        case_name = np.nan
+
+    # -- parties -----------------------------------------------------------------
+    plaintiff, defendant = _split_parties(case_name)
+    fallback = defendant == UNKNOWN
+    if fallback:
+        defendant = _fallback_defendant(raw_record, case_id)
+
+    # -- everything below reads the record with the time stamps removed ----------
+    record = timestamp_regex.sub("", raw_record)
+    record = multi_space_regex.sub(" ", record).strip()
+
+    # First and second date, searched for one after the other (no list of every match)
+    m = date_pattern_regex.search(record)
+    filing_date = m.group() if m else np.nan
+    m = date_pattern_regex.search(record, m.end()) if m else None
+    execution_date = m.group() if m else np.nan
+
+    address = _address(record, execution_date, case_number)
+
+    m = status_code_regex.search(record)
+    case_status_code = m.group(1) if m else UNKNOWN
+    case_status = status_prefix_regex.sub("", record).strip(' "') or UNKNOWN
+
+    if record.endswith(NULL_TAIL):
+        case_status_code = STATUS_UNAVAILABLE_CODE
+        case_status = STATUS_UNAVAILABLE
+
+    if case_status == STATUS_UNAVAILABLE:
+        execution_date = np.nan
+
+    return (
+        record,
+        case_id,
+        case_number,
+        case_type,
+        case_name,
+        plaintiff,
+        defendant,
+        filing_date,
+        execution_date,
+        address,
+        case_status_code,
+        case_status,
+        fallback,
+    )
+
+
+def parse_records(raw_records: pd.Series, start: int = 1, date_rules=None) -> pd.DataFrame:
+    """
+    Parse a Series of raw_record strings into the cleaned evictions table.
+
+    Produces the same columns, values and dtypes as ``clean_stepwise``;
+    ``primary_key`` numbering begins at *start*. *date_rules* are the year
+    repairs (``sentinel_year_rules``; the default fixes the 2102 typo).
+    """
+    parsed = [_parse_record(r) for r in raw_records]
+    columns = list(zip(*parsed)) if parsed else [()] * (len(FIELDS) + 1)
+    fallback = columns.pop()
+
+    evictions = pd.DataFrame(
+        {name: pd.Series(values, dtype=object) for name, values in zip(FIELDS, columns)}
+    )
+    evictions.insert(0, "primary_key", np.arange(start, start + len(evictions), dtype="int64"))
+
+    # Convert both date columns from text to true datetime objects, each distinct date parsed once; bad strings become NaT
+    convert_dates(evictions, date_rules)
+
+    # Coerce numeric
+    evictions["case_status_code"] = evictions["case_status_code"].astype("int64")
+
+    evictions.attrs[FALLBACK_ROWS] = sum(fallback)
+    return evictions
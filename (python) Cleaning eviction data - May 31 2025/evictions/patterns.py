@@ -0,0 +1,61 @@
+# Regular expressions and placeholder values shared by every cleaning path
+import re  # regular-expression engine for finding and replacing text patterns
+
+# Identify any date in either 2021-07-20 or 07/20/2021 format and store the pattern
+date_regex = r"(?:\d{4}-\d{2}-\d{2}|\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"
+
+# Build a pattern that captures every character between the word “CV” and the first date
+# Example slice:  “CV  WERJ 4 Bogard Street LLC VS Franklin Signorelli  2021-07-20”
+case_regex = re.compile(r"\bCV\b\s+(.+?)\s+" + date_regex)
+
+# First chunk of text (up to the first space) = case_id; 5-digit number right after it = case_number
+case_id_regex = re.compile(r"^(\S+)")
+case_number_regex = re.compile(r"^\S+\s+(\d{5})")
+
+# The very first word or code that appears at the start of a case_name
+first_token_regex = re.compile(r"^\s*([A-Za-z0-9]+)")
+first_token_strip_regex = re.compile(r"^\s*[A-Za-z0-9]+\s*")
+
+# Capture plaintiff / defendant around the first “VS” (or “VS.”)
+#    – case-insensitive, period after VS is optional
+vs_split_regex = re.compile(
+    r"^(?P<plaintiff>.*?)\s+VS\.?\s+(?P<defendant>.*)$",
+    flags=re.I,
+)
+
+# Matches stray “VS” or “VS.” tokens (case-insensitive)
+vs_token_regex = re.compile(r"\bVS\.?\b", flags=re.I)
+
+# Everything after a case_id up to the last number in the record (the fallback defendant);
+# prefixing this with re.escape(case_id) gives the per-row pattern used by fallback_defendant
+fallback_tail_regex = re.compile(r"\s+(?P<name>.*?)\s+\d+\b[^\d]*?$")
+
+# The unnecessary time stamp “00:00:00.000” that follows many placeholder dates
+timestamp_regex = re.compile(r"\s*00:00:00\.000")
+multi_space_regex = re.compile(r"\s{2,}")
+
+# Dates written as YYYY-MM-DD
+date_pattern_regex = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Standalone 5-digit numbers (candidates for the case_number that closes the address)
+standalone_number_regex = re.compile(r"\b\d{5}\b")
+
+# Last standalone number in a record (case_status_code) and the text after it (case_status)
+status_code_regex = re.compile(r"(\d+)\D*$")
+status_prefix_regex = re.compile(r".*?\d+\s*")
+
+# Placeholder values written into the cleaned columns
+UNKNOWN = "Unknown"
+NO_ADDRESS = "No address listed"
+STATUS_UNAVAILABLE = "Status unavailable"
+STATUS_UNAVAILABLE_CODE = 99999
+NULL_TAIL = "NULL NULL"
+
+# Fourth token that is a stray first name rather than a case type
+CASE_TYPE_NOISE = "Kathryn"
+
+# Execution dates wrongly coded as 2102 are really 2021
+EXECUTION_YEAR_TYPO = ("2102", "2021")
+
+# Year the source system writes for eviction executions that are only pending (no real date yet)
+PENDING_YEAR = "1753"
@@ -0,0 +1,32 @@
+# One entry point over the interchangeable cleaning paths
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .parser import parse_records
+from .stepwise import clean_stepwise
+
+# Cleaning paths that produce the same evictions table
+PARSERS = ("single_pass", "stepwise", "lazy")
+
+
+def clean_records(
+    raw_data: pd.DataFrame,
+    parser: str = "single_pass",
+    start: int = 1,
+    date_rules=None,
+) -> pd.DataFrame:
+    """
+    Clean a one-column ``raw_record`` frame into the evictions table.
+
+    *parser* picks the path ("single_pass", "stepwise" or "lazy", which needs
+    Polars); ``primary_key``
+    numbering begins at *start* so chunks of one export can be cleaned separately.
+    *date_rules* are the year repairs applied to the dates (see dates.py).
+    """
+    if parser == "single_pass":
+        return parse_records(raw_data["raw_record"], start=start, date_rules=date_rules)
+    if parser == "stepwise":
+        return clean_stepwise(raw_data, start=start, date_rules=date_rules)
+    if parser == "lazy":
+        from .lazy import clean_lazy  # Polars is only imported when this path is picked
+        return clean_lazy(raw_data, start=start, date_rules=date_rules)
+    raise ValueError(f"Unknown parser {parser!r}; expected one of {PARSERS}")
@@ -0,0 +1,107 @@
+# Arrow schemas of the cleaned evictions table, shared by every Parquet writer
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+import pyarrow as pa  # columnar memory format used by pandas' Parquet writer
+
+# Same types pandas' to_parquet infers for the in-memory DataFrame, fixed up front so every
+# chunk written to the same file agrees even when a chunk has a column that is entirely missing
+ARROW_SCHEMA = pa.schema([
+    ("primary_key", pa.int64()),
+    ("raw_record", pa.string()),
+    ("case_id", pa.string()),
+    ("case_number", pa.string()),
+    ("case_type", pa.string()),
+    ("case_name", pa.string()),
+    ("plaintiff", pa.string()),
+    ("defendant", pa.string()),
+    ("filing_date", pa.timestamp("ns")),
+    ("execution_date", pa.timestamp("ns")),
+    ("address", pa.string()),
+    ("case_status_code", pa.int64()),
+    ("case_status", pa.string()),
+])
+
+# Low-cardinality text columns stored as categoricals in memory and dictionary-encoded in Arrow
+CATEGORICAL_COLUMNS = ["case_type", "plaintiff", "case_status"]
+
+# Compact layout for dashboards: dictionary-encoded low-cardinality text, int32 numbers, date32 dates.
+# case_number becomes a number, so its leading zeros are dropped (format with zfill(5) to restore them)
+COMPACT_SCHEMA = pa.schema([
+    ("primary_key", pa.int64()),
+    ("raw_record", pa.string()),
+    ("case_id", pa.string()),
+    ("case_number", pa.int32()),
+    ("case_type", pa.dictionary(pa.int32(), pa.string())),
+    ("case_name", pa.string()),
+    ("plaintiff", pa.dictionary(pa.int32(), pa.string())),
+    ("defendant", pa.string()),
+    ("filing_date", pa.date32()),
+    ("execution_date", pa.date32()),
+    ("address", pa.string()),
+    ("case_status_code", pa.int32()),
+    ("case_status", pa.dictionary(pa.int32(), pa.string())),
+])
+
+# Entity ids added by entity resolution (see entities.py), appended after the cleaned columns when asked for
+ENTITY_FIELDS = [
+    ("plaintiff_entity_id", pa.int64()),
+    ("defendant_entity_id", pa.int64()),
+]
+COMPACT_ENTITY_FIELDS = [(name, pa.int32()) for name, _ in ENTITY_FIELDS]
+
+
+def compact_frame(evictions: pd.DataFrame, drop_raw_record: bool = False) -> pd.DataFrame:
+    """
+    The cleaned table with compact in-memory types.
+
+    Text becomes Arrow-backed strings, ``CATEGORICAL_COLUMNS`` become
+    categoricals, ``case_number`` / ``case_status_code`` become 32-bit integers
+    and the dates become date32. *drop_raw_record* leaves out the (largest)
+    ``raw_record`` column.
+    """
+    compact = evictions.drop(columns="raw_record", errors="ignore") if drop_raw_record else evictions.copy()
+
+    for col in compact.columns:
+        if col in CATEGORICAL_COLUMNS:
+            compact[col] = compact[col].astype("category")
+        elif col in COMPACT_SCHEMA.names and COMPACT_SCHEMA.field(col).type == pa.string():
+            compact[col] = compact[col].astype("string[pyarrow]")
+        elif col in dict(COMPACT_ENTITY_FIELDS):
+            compact[col] = compact[col].astype("Int32")
+
+    compact["case_number"] = pd.to_numeric(compact["case_number"]).astype("Int32")
+    compact["case_status_code"] = compact["case_status_code"].astype("int32")
+    for col in ["filing_date", "execution_date"]:
+        compact[col] = compact[col].astype("date32[pyarrow]")
+
+    return compact
+
+
+def is_compact(evictions: pd.DataFrame) -> bool:
+    """Whether *evictions* already has the types ``compact_frame`` gives it (its dates are date32)."""
+    return evictions["filing_date"].dtype == "date32[pyarrow]"
+
+
+def output_schema(compact: bool = False, drop_raw_record: bool = False, entities: bool = False) -> pa.Schema:
+    """Schema of the Parquet output for the chosen layout; *entities* adds the entity id columns."""
+    schema = COMPACT_SCHEMA if compact else ARROW_SCHEMA
+    if drop_raw_record:
+        schema = schema.remove(schema.get_field_index("raw_record"))
+    if entities:
+        for name, type_ in COMPACT_ENTITY_FIELDS if compact else ENTITY_FIELDS:
+            schema = schema.append(pa.field(name, type_))
+    return schema
+
+
+def to_arrow(evictions: pd.DataFrame, compact: bool = False, drop_raw_record: bool = False) -> pa.Table:
+    """
+    Convert a cleaned evictions DataFrame into a Table with the chosen output
+    schema (including the entity id columns when *evictions* has them).
+    A frame ``compact_frame`` already converted is not converted again.
+    """
+    if compact and not is_compact(evictions):
+        evictions = compact_frame(evictions, drop_raw_record=drop_raw_record)
+    elif drop_raw_record:
+        evictions = evictions.drop(columns="raw_record", errors="ignore")
+    entities = ENTITY_FIELDS[0][0] in evictions.columns
+    schema = output_schema(compact=compact, drop_raw_record=drop_raw_record, entities=entities)
+    return pa.Table.from_pandas(evictions, schema=schema, preserve_index=False)
@@ -0,0 +1,244 @@
+# Original column-by-column cleaning rules, kept as the reference the single-pass parser is checked against
+# (the three row-wise helpers below document the rules and are the oracle tests/test_vectorized.py checks the
+# whole-column versions in vectorized.py against; clean_stepwise runs the whole-column versions)
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+import re           # regular-expression engine for finding and replacing text patterns
+from typing import Union  # offers type hints that can express “this value may be one of several types”
+
+from .dates import DATE_RULES, extract_dates, parse_dates
+from .parser import FALLBACK_ROWS
+from .patterns import (
+    case_regex,
+    date_pattern_regex,
+    vs_split_regex,
+    vs_token_regex,
+)
+from .vectorized import extract_addresses, fallback_defendants, split_parties
+
+
+# Create a helper that returns plaintiff / defendant while covering edge-cases: no VS, VS at the start, or VS at the end
+def split_with_fallback(case_name: str) -> tuple[str, str]:
+    """
+    Return (plaintiff, defendant). Handles lines with:
+      • no VS separator,
+      • VS at the start (missing plaintiff),
+      • VS at the end (missing defendant).
+    """
+    if pd.isna(case_name):
+        return "Unknown", "Unknown"
+
+    # try normal split first
+    m = vs_split_regex.match(case_name)
+    if m:
+        left  = m.group("plaintiff").strip(' "')
+        right = m.group("defendant").strip(' "')
+        left  = left  if left  else "Unknown"
+        right = right if right else "Unknown"
+        return left, right
+
+    # no VS found – treat entire string as plaintiff
+    return case_name.strip(' "'), "Unknown"
+
+
+# Define a second fallback that tries to fetch a defendant name buried later in the raw_record
+def fallback_defendant(raw_record: str, case_id: str) -> str:
+    """
+    Capture text between:
+      • the second occurrence of case_id, and
+      • the last number in the string.
+    Returns 'Unknown' if the pattern isn't found.
+    """
+    # pattern: <case_id>   <captured text>   <final number> <end of string>
+    pattern = rf"{re.escape(case_id)}\s+(?P<name>.*?)\s+\d+\b[^\d]*?$"
+    m = re.search(pattern, raw_record)
+    if not m:
+        return "Unknown"
+
+    name = m.group("name").strip(' "')
+    name = re.sub(r"\s{2,}", " ", name)  # collapse double spaces
+    name = re.sub(r"\bVS\.?\b", "", name, flags=re.I).strip()  # remove stray VS tokens
+    return name if name else "Unknown"
+
+
+# Define a helper that grabs the address found between
+#   1) the second date in the line, and
+#   2) the next appearance of the 5-digit case_number
+def extract_address_from_record(
+    raw_record: str,
+    case_number: str,
+) -> Union[str, pd.NA]:
+    """
+    Pull the address that sits between:
+      • the SECOND ISO-formatted date in *raw_record*, and
+      • the next occurrence of the 5-digit *case_number*.
+    Returns <NA> if either boundary is missing.
+    """
+    # -- find all ISO dates in the row -----------------------------------------
+    date_tokens = date_pattern_regex.findall(raw_record)
+    if len(date_tokens) < 2:
+        return pd.NA                      # no second date found → cannot parse
+    second_date = date_tokens[1]
+
+    # -- slice the string *after* the second date ------------------------------
+    start_of_slice = raw_record.find(second_date) + len(second_date)
+    trailing_text = raw_record[start_of_slice:]
+
+    # -- locate the case number that *follows* the second date -----------------
+    case_num_regex = re.compile(rf"\b{re.escape(case_number)}\b")
+    case_match = case_num_regex.search(trailing_text)
+    if not case_match:
+        return pd.NA                      # case number not found after date
+
+    # -- everything between the two anchors = address --------------------------
+    end_of_slice = start_of_slice + case_match.start()
+    address_raw = raw_record[start_of_slice:end_of_slice]
+
+    # -- tidy-up: trim quotes / blanks and collapse double spaces --------------
+    address_clean = (
+        address_raw.strip(' "')
+                   .replace("\t", " ")        # tabs → single space
+    )
+    address_clean = re.sub(r"\s{2,}", " ", address_clean)  # ≥2 spaces → 1
+
+    return address_clean if address_clean else pd.NA
+
+
+def clean_stepwise(raw_data: pd.DataFrame, start: int = 1, date_rules=None) -> pd.DataFrame:
+    """
+    Run the original column-by-column rules over a one-column *raw_data*
+    frame (``raw_record``) and return the cleaned evictions table, with
+    ``primary_key`` numbering beginning at *start* and the year repairs in
+    *date_rules* (``sentinel_year_rules``; the default fixes the 2102 typo).
+    """
+    date_rules = DATE_RULES if date_rules is None else date_rules
+
+    # Make a working copy of raw data
+    evictions = raw_data.copy()
+
+    # Reset the DataFrame index and add a sequential “primary_key” column starting at *start*
+    evictions = evictions.reset_index(drop=True)
+    evictions.insert(0, "primary_key", evictions.index + start)
+
+    # Pull the first chunk of text (up to the first space) from each raw_record and store it as case_id
+    evictions["case_id"] = evictions["raw_record"].str.extract(r"^(\S+)")
+
+    # Pull the 5-digit number that appears right after the first space and store it as case_number
+    evictions["case_number"] = evictions["raw_record"].str.extract(r"^\S+\s+(\d{5})")
+
+    # Pull the fourth whitespace-delimited token from raw_record and store it in case_type
+    evictions["case_type"] = evictions["raw_record"].str.split(" ").str[3]
+
+    # Replace "Kathryn" entries in case_type with a missing value (pd.NA)
+    evictions.loc[evictions["case_type"].eq("Kathryn"), "case_type"] = pd.NA
+
+    # Pull the captured text (case name) from raw_record, then trim extra spaces and quotes
+    evictions["case_name"] = (
+        evictions["raw_record"]
+            .str.extract(case_regex)[0]      # grab group 1
+            .str.strip(' "')
+    )
+
+    # Take the very first word or code that appears at the start of each case_name
+    first_token_regex = evictions["case_name"].str.extract(r"^\s*([A-Za-z0-9]+)", expand=False)
+
+    # Create a True/False mask showing rows where that first word matches the case_type column
+    prefix_mask = (
+        first_token_regex.fillna("")          # make NaN / <NA> harmless
+        == evictions["case_type"].fillna("") # neutralise missing values
+    )
+
+    # For rows flagged by the mask, remove the duplicate first word from case_name
+    evictions.loc[prefix_mask, "case_name"] = (
+        evictions.loc[prefix_mask, "case_name"]
+          .str.replace(r"^\s*[A-Za-z0-9]+\s*", "", regex=True)
+          .str.lstrip(' "')                # trim leading quote / blank
+    )
+
+    # Split every case_name so each row gets a plaintiff and defendant column (split_with_fallback, whole column at once)
+    parties = split_parties(evictions["case_name"])
+    evictions["plaintiff"] = parties["plaintiff"]
+    evictions["defendant"] = parties["defendant"]
+
+    # Identify rows where either plaintiff or defendant is still flagged as "Unknown"
+    mask_unknown_side = (
+        (evictions["plaintiff"]  == "Unknown") |
+        (evictions["defendant"] == "Unknown")
+    )
+
+    # In those rows, remove leftover “VS” tokens from the plaintiff text
+    evictions.loc[mask_unknown_side, "plaintiff"] = (
+        evictions.loc[mask_unknown_side, "plaintiff"]
+            .str.replace(vs_token_regex, "", regex=True)
+            .str.strip(' "')
+            .replace("", "Unknown")             # put label back if empty
+    )
+
+    # Do the same cleanup for the defendant text
+    evictions.loc[mask_unknown_side, "defendant"] = (
+        evictions.loc[mask_unknown_side, "defendant"]
+            .str.replace(vs_token_regex, "", regex=True)
+            .str.strip(' "')
+            .replace("", "Unknown")
+    )
+
+    # Apply the second fallback only to rows where defendant is still "Unknown"
+    mask_defendant_unknown = evictions["defendant"] == "Unknown"
+
+    evictions.loc[mask_defendant_unknown, "defendant"] = fallback_defendants(
+        evictions.loc[mask_defendant_unknown, "raw_record"],
+        evictions.loc[mask_defendant_unknown, "case_id"],
+    )
+
+    # Many rows contain the unnecessary time stamp “00:00:00.000” right after a placeholder date; remove that text from raw_record
+    evictions["raw_record"] = (
+        evictions["raw_record"]
+            .str.replace(r"\s*00:00:00\.000", "", regex=True)  # delete the time stamp and any leading space
+            .str.replace(r"\s{2,}", " ", regex=True)           # collapse any double spaces created by the deletion
+            .str.strip()                                       # tidy any spaces left at the ends
+    )
+
+    # Find the first and second date in YYYY-MM-DD format, as two columns (no list of matches per row)
+    dates_isolated = extract_dates(evictions["raw_record"])
+
+    # The first date is the filing date and the second the execution date (either may be missing); each distinct
+    # date string is converted to a true datetime once, with the year rules applied (2102 typo → 2021, and the
+    # 1753 "pending" marker if configured); bad strings become NaT
+    evictions["filing_date"]    = parse_dates(dates_isolated["first"], date_rules.get("filing_date", ()))
+    evictions["execution_date"] = parse_dates(dates_isolated["second"], date_rules.get("execution_date", ()))
+
+    # Create a new column called address (extract_address_from_record, whole column at once);
+    # any missing address already reads “No address listed”
+    evictions["address"] = extract_addresses(evictions["raw_record"], evictions["case_number"])
+
+    # Grab the last standalone number in each raw_record and call it case_status_code; if none is found, mark as "Unknown"
+    evictions["case_status_code"] = (
+        evictions["raw_record"]
+          .str.extract(r"(\d+)\D*$", expand=False)       # returns NaN if no match
+          .fillna("Unknown")
+    )
+
+    # Keep everything that comes after that final number and call it case_status; trim spaces/quotes and label blanks as "Unknown"
+    evictions["case_status"] = (
+        evictions["raw_record"]
+          .str.replace(r".*?\d+\s*", "", regex=True)     # keep tail only
+          .str.strip(' "')                               # tidy quotes / blanks
+          .replace("", "Unknown")                        # empty → Unknown
+    )
+
+    # Find rows whose text ends with the literal words "NULL NULL" (a sign that status information is missing)
+    null_tail_mask = evictions["raw_record"].str.strip().str.endswith("NULL NULL")
+
+    # For those rows, set a placeholder code of 99999 and the text "Status unavailable"
+    evictions.loc[null_tail_mask, "case_status_code"] = 99999
+    evictions.loc[null_tail_mask, "case_status"]      = "Status unavailable"
+
+    # In rows where case_status is “Status unavailable”, set execution_date to blank to avoid excel errors
+    evictions.loc[evictions["case_status"] == "Status unavailable", "execution_date"] = pd.NaT
+
+    # Coerce numeric
+    evictions["case_status_code"] = evictions["case_status_code"].astype("int64")
+
+    # Leave the number of rows that needed the second fallback for the cleaning metrics
+    evictions.attrs[FALLBACK_ROWS] = int(mask_defendant_unknown.sum())
+
+    return evictions
@@ -0,0 +1,134 @@
+# Bounded-memory cleaning: read, clean and append one Parquet row group per chunk of the raw export
+import pyarrow.parquet as pq  # incremental Parquet writer
+
+from .dataset import PARQUET_OPTIONS, drop_partition, list_partitions, partition_keys, write_part
+from .entities import EntityIndex, add_entity_ids
+from .ingest import iter_raw_records
+from .metrics import cleaning_counts, entity_counts, maybe_stage
+from .parallel import clean_chunks_parallel
+from .schema import output_schema, to_arrow
+from .summary import EvictionSummary
+
+
+def clean_to_parquet(
+    input_path,
+    output_path,
+    chunksize: int = 250_000,
+    mode: str = "lines",
+    parser: str = "single_pass",
+    encoding: str = "utf-8",
+    workers: int = 1,
+    compact: bool = False,
+    drop_raw_record: bool = False,
+    date_rules=None,
+    entities=None,
+    metrics=None,
+) -> EvictionSummary:
+    """
+    Stream *input_path* through the cleaner into *output_path*, one chunk at a time.
+
+    Each chunk of *chunksize* lines is cleaned and appended as its own Parquet
+    row group, so peak memory depends on the chunk size rather than the file
+    size. ``primary_key`` keeps counting across chunks, and the quality checks
+    are accumulated in the returned ``EvictionSummary``. With *workers* > 1
+    chunks are cleaned on a process pool and written in input order, so the
+    file is identical to the single-process one. *compact* / *drop_raw_record*
+    pick the compact output schema (see schema.py) and *date_rules* the year
+    repairs (see dates.py). With *entities* (path of the saved entity table,
+    see entities.py) every chunk gets plaintiff / defendant entity ids,
+    resolved here in the main process, and the grown table is saved back
+    at the end. Pass a ``Metrics`` as *metrics* to have the
+    ingest / clean / summary / write stages measured chunk by chunk, with the
+    cleaner's match rates.
+    """
+    summary = EvictionSummary()
+    index = EntityIndex.load(entities) if entities is not None else None
+    options = PARQUET_OPTIONS if compact else {}
+    chunks = _cleaned_chunks(input_path, chunksize, mode, parser, encoding, workers, date_rules, index, metrics)
+
+    # The file is opened with the first chunk's schema, which carries the pandas metadata that lets read_parquet
+    # restore the in-memory types (Arrow-backed strings, nullable integers) exactly as a whole-file export does
+    writer = None
+    try:
+        for evictions in chunks:
+            with maybe_stage(metrics, "summary", len(evictions)):
+                summary.update(evictions)
+            with maybe_stage(metrics, "write", len(evictions)) as stage:
+                table = to_arrow(evictions, compact=compact, drop_raw_record=drop_raw_record)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema, **options)
+                writer.write_table(table)
+                stage.rows_out += len(evictions)
+        if writer is None:
+            schema = output_schema(compact=compact, drop_raw_record=drop_raw_record, entities=index is not None)
+            writer = pq.ParquetWriter(output_path, schema, **options)  # empty export: the columns, no rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if index is not None:
+        index.save(entities)
+    return summary
+
+
+def clean_to_dataset(
+    input_path,
+    root,
+    chunksize: int = 250_000,
+    mode: str = "lines",
+    parser: str = "single_pass",
+    encoding: str = "utf-8",
+    workers: int = 1,
+    compact: bool = False,
+    drop_raw_record: bool = False,
+    date_rules=None,
+    entities=None,
+    metrics=None,
+) -> EvictionSummary:
+    """
+    Same as ``clean_to_parquet``, but written under *root* partitioned by filing year.
+
+    Every chunk adds one part file to each filing-year folder it has rows for;
+    whatever was under *root* before is replaced.
+    """
+    for key in list_partitions(root):
+        drop_partition(root, key)
+
+    summary = EvictionSummary()
+    index = EntityIndex.load(entities) if entities is not None else None
+    chunks = _cleaned_chunks(input_path, chunksize, mode, parser, encoding, workers, date_rules, index, metrics)
+
+    for part, evictions in enumerate(chunks):
+        with maybe_stage(metrics, "summary", len(evictions)):
+            summary.update(evictions)
+        with maybe_stage(metrics, "write", len(evictions)) as stage:
+            for key, rows in evictions.groupby(partition_keys(evictions), sort=True):
+                write_part(root, key, rows, part=part, compact=compact, drop_raw_record=drop_raw_record)
+            stage.rows_out += len(evictions)
+
+    if index is not None:
+        index.save(entities)
+    return summary
+
+
+def _cleaned_chunks(input_path, chunksize, mode, parser, encoding, workers, date_rules, index, metrics):
+    """
+    Cleaned chunks of the export, with entity ids from *index* when it is
+    given, and reading, cleaning and resolution timed when *metrics* is given.
+    """
+    chunks = iter_raw_records(input_path, mode=mode, chunksize=chunksize, encoding=encoding)
+    if metrics is None:
+        for evictions in clean_chunks_parallel(chunks, workers=workers, parser=parser, date_rules=date_rules):
+            yield evictions if index is None else add_entity_ids(evictions, index)
+        return
+
+    cleaned = clean_chunks_parallel(metrics.timed("ingest", chunks), workers, parser, date_rules=date_rules)
+    for evictions in metrics.timed("clean", cleaned):
+        metrics["clean"].rows_in += len(evictions)
+        metrics["clean"].add_counts(cleaning_counts(evictions))
+        if index is not None:
+            with metrics.stage("entities", rows_in=len(evictions)) as stage:
+                add_entity_ids(evictions, index)
+                stage.rows_out += len(evictions)
+                stage.add_counts(entity_counts(evictions))
+        yield evictions
@@ -0,0 +1,141 @@
+# Quality checks on the cleaned evictions table, built from running aggregates so they work chunk by chunk
+from collections import Counter  # running tallies that can be topped up one chunk at a time
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+
+class EvictionSummary:
+    """
+    Running version of the cleaner's checks: row count, case_id / case_number
+    length checksums, case_type tallies, the unique filing / execution dates
+    and, when the table has entity ids (see entities.py), cases per plaintiff
+    entity.
+
+    Call ``update`` once per cleaned chunk (or once with the whole table), then
+    ``report`` to print the same checks the cleaner has always shown.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.case_id_lengths = Counter()
+        self.case_number_lengths = Counter()
+        self.case_types = Counter()
+        self.filing_dates = set()
+        self.execution_dates = set()
+        self.filing_non_null = 0
+        self.execution_non_null = 0
+        self.execution_outlier_years = Counter()
+        self.filer_cases = Counter()
+        self.filer_names = {}
+
+    def update(self, evictions: pd.DataFrame) -> "EvictionSummary":
+        """Fold one cleaned chunk into the running totals."""
+        self.rows += len(evictions)
+
+        # Count how many characters long each case_id / case_number is
+        self.case_id_lengths.update(_tally(evictions["case_id"].str.len().dropna().astype(int)))
+        self.case_number_lengths.update(_tally(evictions["case_number"].str.len().dropna().astype(int)))
+
+        # Count every distinct case_type value, including missing ones (kept under None)
+        self.case_types.update(_tally(evictions["case_type"]))
+
+        # Non-missing counts and the set of distinct dates (a few thousand at most)
+        filing = evictions["filing_date"].dropna()
+        execution = evictions["execution_date"].dropna()
+        self.filing_non_null += len(filing)
+        self.execution_non_null += len(execution)
+        self.filing_dates.update(filing.drop_duplicates())
+        self.execution_dates.update(execution.drop_duplicates())
+
+        # Execution dates before 2019 (1753 indicates “pending” in the source system)
+        outliers = execution[execution.dt.year < 2019]
+        self.execution_outlier_years.update(_tally(outliers.dt.year))
+
+        # Cases per plaintiff entity, named by the first spelling seen
+        if "plaintiff_entity_id" in evictions.columns:
+            filers = evictions[["plaintiff_entity_id", "plaintiff"]].dropna()
+            self.filer_cases.update(_tally(filers["plaintiff_entity_id"]))
+            for entity_id, name in filers.drop_duplicates("plaintiff_entity_id").itertuples(index=False):
+                self.filer_names.setdefault(entity_id, name)
+        return self
+
+    def case_count_checksum(self, col: str) -> pd.Series:
+        """Length distribution of ``case_id`` or ``case_number`` values."""
+        counts = self.case_id_lengths if col == "case_id" else self.case_number_lengths
+        return _as_series(counts, col)
+
+    def case_type_counts(self) -> pd.Series:
+        """Tally of every distinct case_type value, missing ones shown as <NA>."""
+        return _as_series(self.case_types, "case_type")
+
+    def unique_filing(self) -> pd.DataFrame:
+        """Table of all unique filing dates, in order."""
+        return pd.DataFrame({"filing_date": sorted(self.filing_dates)})
+
+    def unique_execution(self) -> pd.DataFrame:
+        """Table of all unique execution dates, in order."""
+        return pd.DataFrame({"execution_date": sorted(self.execution_dates)})
+
+    def top_filers(self, n: int = 10) -> pd.DataFrame:
+        """The *n* plaintiff entities with the most cases (empty without entity ids)."""
+        top = self.filer_cases.most_common(n)
+        return pd.DataFrame({
+            "plaintiff_entity_id": pd.Series([entity_id for entity_id, _ in top], dtype="int64"),
+            "plaintiff": pd.Series([self.filer_names[entity_id] for entity_id, _ in top], dtype=object),
+            "cases": pd.Series([cases for _, cases in top], dtype="int64"),
+        })
+
+    def date_summary(self, col: str) -> str:
+        """How many unique dates exist in *col* and their min / max."""
+        dates = self.filing_dates if col == "filing_date" else self.execution_dates
+        if not dates:
+            return f"{col}: 0 unique dates"
+        return (f"{col}: {len(dates):,} unique dates "
+                f"— min {min(dates).date()}, max {max(dates).date()}")
+
+    def report(self) -> None:
+        """Print the cleaner's quality checks."""
+        # Display the total number of rows and the length distribution of case_id / case_number values
+        for col in ["case_id", "case_number"]:
+            print("Row count of evictions = " + str(self.rows))
+            print(self.case_count_checksum(col))
+
+        # Display every distinct case_type value, including missing ones
+        print("Distinct values for case_type (token #3):")
+        print(self.case_type_counts())
+
+        # Quick check on data quality
+        print(f"filing_date: {self.filing_non_null:,} non-null of {self.rows:,}")
+        print(f"execution_date: {self.execution_non_null:,} non-null of {self.rows:,}")
+        print(self.date_summary("filing_date"))
+        print(self.date_summary("execution_date"))
+
+        # 1753 is defined for eviction executions that are only pending
+        print("Execution dates before 2019, by year:")
+        print(_as_series(self.execution_outlier_years, "execution_year"))
+
+        # Landlords filing the most cases, every spelling of a name counted together
+        if self.filer_cases:
+            print("Top filers (plaintiff entities with the most cases):")
+            print(self.top_filers())
+
+
+def _tally(values: pd.Series) -> dict:
+    """value_counts of *values* as a plain dict, with every kind of missing value keyed as None."""
+    return {
+        (None if pd.isna(value) else value): count
+        for value, count in values.value_counts(dropna=False).items()
+    }
+
+
+def _as_series(counts: Counter, name: str) -> pd.Series:
+    """A Counter as a sorted ``count`` Series (missing last, shown as <NA>), the shape value_counts returns."""
+    keys = sorted(k for k in counts if k is not None)
+    if None in counts:
+        keys.append(None)
+    return pd.Series(
+        [counts[k] for k in keys],
+        index=pd.Index([pd.NA if k is None else k for k in keys], name=name),
+        dtype="int64",
+        name="count",
+    )
@@ -0,0 +1,85 @@
+# Whole-column versions of the row-wise helpers in stepwise.py (split_with_fallback, fallback_defendant,
+# extract_address_from_record), with the same edge-case behaviour but no per-row Python calls
+#
+# The per-row helpers build a pattern from each row's own case_id / case_number. Here that value is glued in
+# front of the record with a newline ("<case_id>\n<record>") and a backreference (\1) stands in for it, so one
+# compiled pattern serves every row and pandas can run it down the whole column.
+import re           # regular-expression engine for finding and replacing text patterns
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .patterns import (
+    NO_ADDRESS,
+    UNKNOWN,
+    multi_space_regex,
+    vs_split_regex,
+    vs_token_regex,
+)
+
+# <case_id>\n ... the first occurrence of case_id that is followed by <name> and a final number
+# (the lazy prefix tries occurrences left to right, exactly as re.search tries start positions)
+fallback_regex = re.compile(r"^([^\n]+)\n(?s:.*?)\1\s+(?P<name>.*?)\s+\d+\b[^\d]*?$")
+
+# The second ISO date in a record (what findall(...)[1] returns)
+second_date_regex = re.compile(r"(?s)^.*?\d{4}-\d{2}-\d{2}.*?(?P<date>\d{4}-\d{2}-\d{2})")
+
+# <date>\n ... everything after the first occurrence of that date's text (what str.find locates)
+after_date_regex = re.compile(r"(?s)^([^\n]+)\n.*?\1(?P<trailing>.*)")
+
+# <case_number>\n ... the text before the first standalone occurrence of case_number
+address_regex = re.compile(r"(?s)^([^\n]+)\n(?P<address>.*?)\b\1\b")
+
+
+def _prefixed(keys: pd.Series, text: pd.Series) -> pd.Series:
+    """``<key>\\n<text>`` for every row; missing when either side is missing."""
+    return keys + "\n" + text
+
+
+def split_parties(case_name: pd.Series) -> pd.DataFrame:
+    """
+    Plaintiff / defendant for every case_name, as ``split_with_fallback`` returns them:
+    missing names give "Unknown" on both sides, names without VS are all plaintiff,
+    and an empty side around VS becomes "Unknown".
+    """
+    sides = case_name.str.extract(vs_split_regex)
+    plaintiff = sides["plaintiff"].str.strip(' "').replace("", UNKNOWN)
+    defendant = sides["defendant"].str.strip(' "').replace("", UNKNOWN)
+
+    no_vs = case_name.notna() & sides["plaintiff"].isna()
+    plaintiff = plaintiff.mask(no_vs, case_name.str.strip(' "')).fillna(UNKNOWN)
+    defendant = defendant.fillna(UNKNOWN)
+
+    return pd.DataFrame({"plaintiff": plaintiff, "defendant": defendant}, index=case_name.index)
+
+
+def fallback_defendants(raw_record: pd.Series, case_id: pd.Series) -> pd.Series:
+    """
+    ``fallback_defendant`` for every row: the text between an occurrence of case_id
+    and the last number in the record, tidied, or "Unknown" if there is none.
+    """
+    name = _prefixed(case_id, raw_record).str.extract(fallback_regex)["name"]
+    name = (
+        name.str.strip(' "')
+            .str.replace(multi_space_regex, " ", regex=True)  # collapse double spaces
+            .str.replace(vs_token_regex, "", regex=True)      # remove stray VS tokens
+            .str.strip()
+    )
+    return name.replace("", UNKNOWN).fillna(UNKNOWN)
+
+
+def extract_addresses(raw_record: pd.Series, case_number: pd.Series) -> pd.Series:
+    """
+    ``extract_address_from_record`` for every row, with missing addresses already
+    labelled "No address listed": the text between the second ISO date and the
+    next standalone case_number.
+    """
+    second_date = raw_record.str.extract(second_date_regex)["date"]
+    trailing = _prefixed(second_date, raw_record).str.extract(after_date_regex)["trailing"]
+    address = _prefixed(case_number, trailing).str.extract(address_regex)["address"]
+
+    address = (
+        address.str.strip(' "')
+               .str.replace("\t", " ", regex=False)              # tabs → single space
+               .str.replace(multi_space_regex, " ", regex=True)  # ≥2 spaces → 1
+    )
+    return address.replace("", NO_ADDRESS).fillna(NO_ADDRESS)
@@ -0,0 +1,68 @@
+# Shared fixtures: a small synthetic court export covering the cleaner's edge cases
+import os
+import sys
+
+import pytest
+
+# The tests import the evictions package from the project folder, and the shared metrics recorder from the repository
+# root, wherever pytest is started
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [PROJECT, os.path.dirname(PROJECT)]
+
+# One raw line per case, tab-separated like the real export; comments say which rule each one exercises
+RAW_LINES = [
+    # time stamps after both dates, two filing years apart from the rest
+    "2021CV5566009041\t17611\tCV\tWERJ Main St Holdings VS All Occupants\t2021-08-01 00:00:00.000 "
+    "2021-09-01 00:00:00.000\t12 Main St Apt 3\t17611\t2021CV5566009041\tAll Occupants 8\tExecuted",
+    # execution year typed as 2102
+    "2021CV1095872739\t04009\tCV\tLT Acme Realty Inc. VS Jane Roe\t2020-03-15\t2102-08-18\t45 Elm Unit 2\t04009"
+    "\t2021CV1095872739\tJane Roe 4\tPending",
+    # stray first name as the case type, no ISO dates, no VS
+    "2021CV1429497919\t72935\tCV\tKathryn 4 Bogard Street LLC Tenant, Bob\t07/20/2021\t9 Oak Rd"
+    "\t2021CV1429497919 Dismissed",
+    # nothing after VS, status missing ("NULL NULL"), doubled spaces
+    "2021CV8465578576\t92148\tCV\tWERJ  Main  St  Holdings  VS  \t07/20/2021\t12  Main  St  Apt  3"
+    "\t2021CV8465578576  NULL  NULL",
+    # execution only pending (1753)
+    "2020CV0000000001\t11111\tCV\tCVEV O'Neil Mgmt VS John Smith\t2020-05-02\t1753-01-01\t9 Oak Rd\t11111"
+    "\t2020CV0000000001\tJohn Smith 3\tPending",
+    # VS at the start (no plaintiff)
+    "2022CV0000000002\t22222\tCV\tVS Tenant A\t2022-01-10\t2022-02-11\t1 A St\t22222\t2022CV0000000002"
+    "\tTenant A 5\tDismissed",
+    # the same date twice, lower-case "vs."
+    "2021CV0000000003\t33333\tCV\tLT Main St Holdings vs. Bob Jones\t2021-04-04\t2021-04-04\t7 B Ave\t33333"
+    "\t2021CV0000000003\tBob Jones 6\tExecuted",
+    # case number inside a longer number before its standalone occurrence
+    "2021CV0000000004\t44444\tCV\tWERJ Acme Realty Inc. VS Ann Lee\t2021-06-01\t2021-07-01\t444445 C Rd\t44444"
+    "\t2021CV0000000004\tAnn Lee 2\tPending",
+    # accents
+    "2022CV0000000005\t55555\tCV\tLT Açaí Holdings VS José Núñez\t2022-03-03\t2022-05-05\tRua São Bento 9\t55555"
+    "\t2022CV0000000005\tJosé Núñez 1\tExecuted",
+    # no VS, case number never repeated (no address)
+    "2020CV0000000006\t66666\tCV\tWERJ Lone Plaintiff LLC\t2020-09-09\t2020-10-10\t3 D St\t2020CV0000000006"
+    "\tSomebody 7\tDismissed",
+    # an earlier filing of the same landlord, spelled differently
+    "2020CV0000000007\t77777\tCV\tLT MAIN ST. HOLDINGS VS Maria Garcia\t2020-11-11\t2021-01-05\t5 E St\t77777"
+    "\t2020CV0000000007\tMaria Garcia 9\tExecuted",
+    "2020CV0000000008\t88888\tCV\tLT Main St Holdings VS Mario Garcia\t2020-12-12\t2021-02-06\t6 F St\t88888"
+    "\t2020CV0000000008\tMario Garcia 9\tPending",
+]
+
+
+def write_export(path, lines=RAW_LINES) -> str:
+    """Write *lines* as a raw export (with the title line the real one starts with) and return its path."""
+    with open(path, "w", encoding="utf-8") as export:
+        export.write("Case Data,,,,\n")
+        export.writelines(line + "\n" for line in lines)
+    return str(path)
+
+
+@pytest.fixture
+def export_path(tmp_path):
+    return write_export(tmp_path / "export.csv")
+
+
+@pytest.fixture
+def raw_data(export_path):
+    from evictions.ingest import read_raw_records
+    return read_raw_records(export_path)
@@ -0,0 +1,59 @@
+# The DuckDB summary tables against the same numbers computed from the cleaned output with pandas
+import pandas as pd
+
+from evictions.analytics import EvictionAnalytics, refresh_analytics
+from evictions.job import clean_export
+
+
+def test_pending_execution_dates_are_not_executions(tmp_path, export_path):
+    output = tmp_path / "evictions.parquet"
+    clean_export(export_path, output)
+    evictions = pd.read_parquet(output)
+    executed = evictions["execution_date"].notna() & (evictions["execution_date"].dt.year != 1753)
+    assert (evictions["execution_date"].dt.year == 1753).any()
+
+    refresh_analytics(tmp_path / "analytics.duckdb", output)
+    analytics = EvictionAnalytics(tmp_path / "analytics.duckdb", read_only=True)
+    try:
+        status_rates = analytics.table("status_rates").set_index("case_status")
+        monthly = analytics.table("monthly_counts")
+    finally:
+        analytics.close()
+    expected = executed.groupby(evictions["case_status"].astype(str)).sum()
+    assert status_rates["executed"].to_dict() == expected[status_rates.index].to_dict()
+    assert monthly["executed"].sum() == executed.sum()
+
+
+def test_plaintiff_counts_group_entities(tmp_path, export_path):
+    output = tmp_path / "evictions.parquet"
+    clean_export(export_path, output, entities=tmp_path / "entities.parquet")
+    evictions = pd.read_parquet(output)
+
+    refresh_analytics(tmp_path / "analytics.duckdb", output)
+    analytics = EvictionAnalytics(tmp_path / "analytics.duckdb", read_only=True)
+    try:
+        counts = analytics.table("plaintiff_counts")
+    finally:
+        analytics.close()
+    expected = evictions.groupby("plaintiff_entity_id").size()
+    by_entity = counts.dropna(subset=["plaintiff_entity_id"]).set_index("plaintiff_entity_id")["cases"]
+    assert by_entity.to_dict() == expected.to_dict()
+    # "Main St Holdings" and "MAIN ST. HOLDINGS" are one landlord, named by its most used spelling
+    assert counts.iloc[0]["plaintiff"] == "Main St Holdings"
+    assert counts.iloc[0]["cases"] == evictions["plaintiff"].str.upper().str.startswith("MAIN ST").sum()
+
+
+def test_plaintiff_counts_per_spelling_without_entities(tmp_path, export_path):
+    output = tmp_path / "evictions.parquet"
+    clean_export(export_path, output)
+    evictions = pd.read_parquet(output)
+
+    refresh_analytics(tmp_path / "analytics.duckdb", output)
+    analytics = EvictionAnalytics(tmp_path / "analytics.duckdb", read_only=True)
+    try:
+        counts = analytics.table("plaintiff_counts")
+    finally:
+        analytics.close()
+    assert counts["plaintiff_entity_id"].isna().all()
+    assert counts.set_index("plaintiff")["cases"].to_dict() == evictions.groupby("plaintiff").size().to_dict()
+
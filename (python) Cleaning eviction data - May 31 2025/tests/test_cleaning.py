@@ -0,0 +1,101 @@
+# The interchangeable cleaning paths (parsers, ingest modes, chunked / parallel runs) give the same table, edge cases included
+import pandas as pd
+import pytest
+
+from evictions.dates import PENDING_YEAR, sentinel_year_rules
+from evictions.ingest import iter_raw_records, read_raw_records
+from evictions.parallel import clean_chunks_parallel, clean_parallel
+from evictions.patterns import NO_ADDRESS, STATUS_UNAVAILABLE, UNKNOWN
+from evictions.pipeline import PARSERS, clean_records
+from evictions.schema import to_arrow
+from evictions.streaming import clean_to_parquet
+from evictions.summary import EvictionSummary
+
+
+@pytest.fixture
+def cleaned(raw_data):
+    return clean_records(raw_data)
+
+
+@pytest.mark.parametrize("parser", [parser for parser in PARSERS if parser != "single_pass"])
+def test_parsers_agree(raw_data, cleaned, parser):
+    if parser == "lazy":
+        pytest.importorskip("polars")
+    evictions = clean_records(raw_data, parser=parser)
+    pd.testing.assert_frame_equal(evictions, cleaned)
+    assert evictions.attrs == cleaned.attrs  # the fallback count the metrics read
+
+
+def test_ingest_modes_agree(export_path, raw_data):
+    pd.testing.assert_frame_equal(read_raw_records(export_path, mode="csv"), raw_data)
+
+
+def test_ingest_chunks_add_up(export_path, raw_data):
+    chunks = list(iter_raw_records(export_path, chunksize=5))
+    assert len(chunks) > 1 and all(len(chunk) <= 5 for chunk in chunks)
+    assert pd.concat(chunks, ignore_index=True)["raw_record"].tolist() == raw_data["raw_record"].tolist()
+
+
+def test_streamed_file_matches_whole_table(tmp_path, export_path, cleaned):
+    summary = clean_to_parquet(export_path, tmp_path / "evictions.parquet", chunksize=4)
+    streamed = pd.read_parquet(tmp_path / "evictions.parquet")
+    pd.testing.assert_frame_equal(streamed, to_arrow(cleaned).to_pandas())
+    assert summary.rows == len(cleaned)
+
+
+def test_streaming_workers_write_the_same_file(tmp_path, export_path):
+    clean_to_parquet(export_path, tmp_path / "serial.parquet", chunksize=4)
+    summary = clean_to_parquet(export_path, tmp_path / "parallel.parquet", chunksize=4, workers=2)
+    serial = pd.read_parquet(tmp_path / "serial.parquet")
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "parallel.parquet"), serial)
+    assert summary.rows == len(serial)
+
+
+@pytest.mark.parametrize("parser", ["single_pass", "lazy"])
+def test_parallel_matches_serial(raw_data, cleaned, parser):
+    if parser == "lazy":
+        pytest.importorskip("polars")
+        clean_records(raw_data, parser=parser)  # Polars' thread pool is running before the workers start
+    evictions = clean_parallel(raw_data, workers=3, shard_size=4, parser=parser)
+    pd.testing.assert_frame_equal(evictions, cleaned)
+    assert evictions.attrs == cleaned.attrs
+
+
+def test_parallel_chunks_keep_order_and_keys(raw_data, cleaned):
+    chunks = [raw_data.iloc[start:start + 4] for start in range(0, len(raw_data), 4)]
+    parts = list(clean_chunks_parallel(iter(chunks), workers=2))
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), cleaned)
+
+
+def test_edge_cases(cleaned):
+    rows = cleaned.set_index("case_id")
+    assert rows.loc["2021CV1095872739", "execution_date"] == pd.Timestamp("2021-08-18")  # 2102 typo
+    assert rows.loc["2021CV8465578576", "defendant"] == UNKNOWN                           # nothing after VS
+    assert rows.loc["2021CV8465578576", "case_status"] == STATUS_UNAVAILABLE              # NULL NULL
+    assert rows.loc["2021CV1429497919", "case_type"] is pd.NA                             # stray first name
+    assert rows.loc["2020CV0000000006", "address"] == NO_ADDRESS                          # number never repeated
+    assert rows.loc["2021CV0000000004", "address"] == "444445 C Rd"                       # inside a longer number
+    assert rows.loc["2022CV0000000005", "defendant"] == "José Núñez"                      # accents kept
+    assert rows.loc["2021CV0000000003", "filing_date"] == rows.loc["2021CV0000000003", "execution_date"]
+    assert cleaned["primary_key"].tolist() == list(range(1, len(cleaned) + 1))
+
+
+def test_pending_dates(raw_data):
+    kept = clean_records(raw_data).set_index("case_id")["execution_date"]
+    missing = clean_records(raw_data, date_rules=sentinel_year_rules("missing")).set_index("case_id")["execution_date"]
+    pending = kept.dt.year == int(PENDING_YEAR)
+    assert pending.sum() == 1
+    assert missing[pending].isna().all()
+    pd.testing.assert_series_equal(missing[~pending], kept[~pending])
+
+    summary = EvictionSummary().update(clean_records(raw_data))
+    assert summary.execution_outlier_years == {int(PENDING_YEAR): 1}
+
+
+def test_unknown_options(raw_data, export_path):
+    with pytest.raises(ValueError, match="parser"):
+        clean_records(raw_data, parser="fast")
+    with pytest.raises(ValueError, match="ingestion mode"):
+        read_raw_records(export_path, mode="xlsx")
+    with pytest.raises(ValueError, match="pending"):
+        sentinel_year_rules("drop")
@@ -0,0 +1,26 @@
+# python -m evictions writes what clean_export writes, saves the stage metrics, and rejects unknown options
+import json
+
+import pandas as pd
+import pytest
+
+from evictions.__main__ import main
+from evictions.job import clean_export
+
+
+def test_cli_matches_clean_export(tmp_path, export_path):
+    clean_export(export_path, tmp_path / "job.parquet", compact=True)
+    main([export_path, str(tmp_path / "cli.parquet"), "--compact", "--quiet", "--metrics", str(tmp_path / "m.json")])
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "cli.parquet"), pd.read_parquet(tmp_path / "job.parquet"))
+
+    with open(tmp_path / "m.json") as saved:
+        stages = {stage["stage"]: stage for stage in json.load(saved)["stages"]}
+    assert {"ingest", "clean", "summary", "compact", "write"} <= set(stages)
+    assert stages["clean"]["rows_out"] == len(pd.read_parquet(tmp_path / "job.parquet"))
+    assert all(stage["peak_rss_growth_mb"] >= 0 for stage in stages.values())
+
+
+@pytest.mark.parametrize("option", [["--parser", "fast"], ["--ingest", "xlsx"], ["--profile", "perf"]])
+def test_cli_rejects_unknown_options(tmp_path, export_path, option):
+    with pytest.raises(SystemExit):
+        main([export_path, str(tmp_path / "out.parquet"), *option])
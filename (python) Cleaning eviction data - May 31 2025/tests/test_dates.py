@@ -0,0 +1,44 @@
+# The date cache: parses each distinct string once, with the year repairs applied, and stays bounded
+import pandas as pd
+
+from evictions import dates
+from evictions.dates import DateCache, extract_dates, sentinel_year_rules
+
+TEXT = pd.Series(["2021-08-01", "2102-08-18", None, "1753-01-01", "2021-08-01", "2021-13-40", "2021-08-01"])
+
+
+def test_parses_like_to_datetime():
+    parsed = DateCache().parse(TEXT)
+    expected = pd.to_datetime(TEXT, errors="coerce", format="%Y-%m-%d")
+    pd.testing.assert_series_equal(parsed, expected.astype("datetime64[ns]"))
+
+
+def test_year_rules():
+    keep = DateCache(sentinel_year_rules("keep")["execution_date"]).parse(TEXT)
+    missing = DateCache(sentinel_year_rules("missing")["execution_date"]).parse(TEXT)
+    assert keep[1] == pd.Timestamp("2021-08-18") and keep[3] == pd.Timestamp("1753-01-01")
+    assert missing[1] == pd.Timestamp("2021-08-18") and pd.isna(missing[3])
+
+
+def test_each_distinct_string_parsed_once():
+    cache = DateCache()
+    cache.parse(TEXT)
+    assert (cache.hits, cache.misses) == (0, 4)
+    again = cache.parse(TEXT.iloc[::-1])
+    assert (cache.hits, cache.misses) == (4, 4)
+    pd.testing.assert_series_equal(again, cache.parse(TEXT).iloc[::-1])
+
+
+def test_full_cache_is_refilled(monkeypatch):
+    monkeypatch.setattr(dates, "MAX_CACHED_DATES", 3)
+    cache = DateCache()
+    first = cache.parse(pd.Series(["2021-01-01", "2021-01-02"]))
+    second = cache.parse(pd.Series(["2021-01-03", "2021-01-04"]))
+    assert len(cache.parsed) == 2
+    assert first.tolist() == [pd.Timestamp("2021-01-01"), pd.Timestamp("2021-01-02")]
+    assert second.tolist() == [pd.Timestamp("2021-01-03"), pd.Timestamp("2021-01-04")]
+
+
+def test_extract_dates():
+    found = extract_dates(pd.Series(["x 2021-01-01 y 2021-02-02 z 2021-03-03", "only 2020-05-05", "none"]))
+    assert found.fillna("-").values.tolist() == [["2021-01-01", "2021-02-02"], ["2020-05-05", "-"], ["-", "-"]]
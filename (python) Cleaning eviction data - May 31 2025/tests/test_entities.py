@@ -0,0 +1,50 @@
+# Entity resolution: landlord spellings merge, people with similar names don't
+import pandas as pd
+
+from evictions.entities import EntityIndex, add_entity_ids, normalize_names
+
+
+def _ids(names, fuzzy=True) -> list:
+    return EntityIndex().resolve(pd.Series(names, dtype=object), fuzzy=fuzzy).tolist()
+
+
+def test_normalize_names():
+    names = pd.Series(["4 Bogard Street, L.L.C.", "Smith  & Co", "Unknown", "", None], dtype=object)
+    assert normalize_names(names).tolist()[:2] == ["4 BOGARD ST LLC", "SMITH AND CO"]
+    assert normalize_names(names)[2:].isna().all()
+
+
+def test_organisation_spellings_merge():
+    ids = _ids(["4 Bogard Street LLC", "4 BOGARD ST LLC", "4 Bogrd St LLC", "4 Bogard St", "5 Bogard St LLC"])
+    assert ids[:4] == [ids[0]] * 4
+    assert ids[4] != ids[0]  # house numbers must agree
+
+
+def test_people_only_match_exactly():
+    ids = _ids(["MARIA GARCIA", "MARIO GARCIA", "JOHN SMITH", "JOHN SMYTH", "John  Smith", "Maria Garcia."])
+    assert len(set(ids[:4])) == 4
+    assert ids[4] == ids[2] and ids[5] == ids[0]
+
+
+def test_defendants_only_match_exactly():
+    ids = _ids(["Acme Realty Inc", "Acme Realty Inc.", "Acme Realty"], fuzzy=False)
+    assert ids[1] == ids[0] and ids[2] != ids[0]
+
+
+def test_add_entity_ids(raw_data):
+    from evictions.pipeline import clean_records
+    evictions = add_entity_ids(clean_records(raw_data), EntityIndex())
+    by_name = dict(zip(evictions["defendant"], evictions["defendant_entity_id"]))
+    assert by_name["Maria Garcia"] != by_name["Mario Garcia"]
+    landlords = evictions.loc[evictions["plaintiff"].str.upper().str.startswith("MAIN ST"), "plaintiff_entity_id"]
+    assert landlords.nunique() == 1 and len(landlords) == 5
+
+
+def test_saved_ids_are_kept(tmp_path):
+    index = EntityIndex()
+    first = index.resolve(pd.Series(["Main St Holdings", "Jane Roe"]))
+    index.save(tmp_path / "entities.parquet")
+    loaded = EntityIndex.load(tmp_path / "entities.parquet")
+    again = loaded.resolve(pd.Series(["Jane Roe", "MAIN ST. HOLDINGS", "Jane Doe"]))
+    assert again.tolist()[:2] == [first[1], first[0]]
+    assert again[2] not in set(first)
@@ -0,0 +1,90 @@
+# Incremental runs read back as a full re-clean, keep the primary_key of every record they saw before, rewrite only
+# the partitions that changed, and refuse a dataset that no longer matches its manifest
+import os
+
+import pandas as pd
+import pytest
+from conftest import RAW_LINES, write_export
+
+from evictions.dataset import list_partitions, part_files, read_dataset
+from evictions.incremental import DELTA_FILE, clean_incremental
+from evictions.job import clean_export
+
+
+def _full_clean(tmp_path, export_path) -> pd.DataFrame:
+    clean_export(export_path, tmp_path / "full", partitioned=True)
+    return read_dataset(tmp_path / "full")
+
+
+def _by_record(evictions: pd.DataFrame) -> pd.DataFrame:
+    """*evictions* without its keys, in raw_record order: what a full re-clean must match after records changed."""
+    return evictions.drop(columns="primary_key").sort_values("raw_record", kind="stable", ignore_index=True)
+
+
+def _modified_times(root) -> dict:
+    return {key: os.stat(part_files(root, key)[0]).st_mtime_ns for key in list_partitions(root)}
+
+
+def test_first_run_matches_full_clean(tmp_path, export_path):
+    delta = clean_incremental(export_path, tmp_path / "dataset")
+    pd.testing.assert_frame_equal(read_dataset(tmp_path / "dataset"), _full_clean(tmp_path, export_path))
+    assert (delta["change"] == "inserted").all() and len(delta) == len(RAW_LINES)
+    assert os.path.exists(tmp_path / "dataset" / DELTA_FILE)
+
+
+def test_changes_rewrite_only_their_partitions(tmp_path):
+    root = tmp_path / "dataset"
+    clean_incremental(write_export(tmp_path / "before.csv"), root)
+    before = _modified_times(root)
+
+    # The 2022 case's status changes, the last 2020 case goes, a 2022 case is added at the end
+    lines = [line.replace("José Núñez 1\tExecuted", "José Núñez 1\tDismissed") for line in RAW_LINES[:-1]]
+    lines.append(RAW_LINES[5].replace("2022CV0000000002", "2022CV0000000009"))
+    after_path = write_export(tmp_path / "after.csv", lines)
+    delta = clean_incremental(after_path, root)
+
+    dataset = read_dataset(root)
+    pd.testing.assert_frame_equal(_by_record(dataset), _by_record(_full_clean(tmp_path, after_path)))
+    assert dataset["primary_key"].max() == len(RAW_LINES) + 2  # the changed and the added record, numbered on
+    assert dict(zip(delta["case_id"], delta["change"])) == {
+        "2022CV0000000009": "inserted", "2022CV0000000005": "updated", "2020CV0000000008": "removed",
+    }
+    after = _modified_times(root)
+    assert {key for key in after if after[key] != before.get(key)} == {"2020", "2022"}
+
+
+def test_insertion_keeps_later_keys(tmp_path):
+    root = tmp_path / "dataset"
+    clean_incremental(write_export(tmp_path / "before.csv"), root)
+    before = read_dataset(root)
+    times = _modified_times(root)
+
+    # A 2022 case inserted at the top of the export, ahead of every other record
+    lines = [RAW_LINES[5].replace("2022CV0000000002", "2022CV0000000009")] + RAW_LINES
+    clean_incremental(write_export(tmp_path / "after.csv", lines), root)
+
+    after = read_dataset(root)
+    pd.testing.assert_frame_equal(after.iloc[:-1], before)
+    assert after["primary_key"].iloc[-1] == len(RAW_LINES) + 1
+    assert {key for key, mtime in _modified_times(root).items() if mtime != times.get(key)} == {"2022"}
+
+
+def test_unchanged_export_writes_nothing(tmp_path, export_path):
+    root = tmp_path / "dataset"
+    clean_incremental(export_path, root)
+    before = _modified_times(root)
+    assert clean_incremental(export_path, root).empty
+    assert _modified_times(root) == before
+
+
+def test_dataset_out_of_step_with_manifest(tmp_path, export_path):
+    root = tmp_path / "dataset"
+    clean_incremental(export_path, root)
+    partition = "2021"
+    path = part_files(root, partition)[0]
+    pd.read_parquet(path).iloc[:1].to_parquet(path)  # lose rows the manifest still lists
+
+    # A new 2021 case makes the partition dirty, so its old rows have to be reused
+    lines = RAW_LINES + [RAW_LINES[0].replace("2021CV5566009041", "2021CV0000000010")]
+    with pytest.raises(RuntimeError, match="no longer matches its manifest"):
+        clean_incremental(write_export(tmp_path / "after.csv", lines), root)
@@ -0,0 +1,52 @@
+# Every output layout reads back as the same table, whether written at once or chunk by chunk
+import itertools
+
+import pandas as pd
+import pytest
+from conftest import write_export
+
+from evictions.dataset import read_dataset
+from evictions.job import clean_export
+
+LAYOUTS = list(itertools.product([False, True], repeat=4))  # compact, partitioned, chunked, drop_raw_record
+
+
+def _read_back(path, partitioned: bool) -> pd.DataFrame:
+    """
+    The output at *path*, with the categories of every (unordered) categorical
+    sorted: a file written chunk by chunk lists them in order of first
+    appearance across its row groups, a whole-file export in sorted order.
+    """
+    evictions = read_dataset(path) if partitioned else pd.read_parquet(path)
+    for col, dtype in evictions.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            evictions[col] = evictions[col].cat.reorder_categories(sorted(dtype.categories))
+    return evictions
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")  # partitions stitched without pandas' all-NA concat warning
+@pytest.mark.parametrize("compact,partitioned,chunked,drop_raw_record", LAYOUTS)
+def test_layouts_read_back_alike(tmp_path, export_path, compact, partitioned, chunked, drop_raw_record):
+    reference = tmp_path / "reference.parquet"
+    clean_export(export_path, reference, compact=compact, drop_raw_record=drop_raw_record)
+    output = tmp_path / ("dataset" if partitioned else "evictions.parquet")
+    clean_export(
+        export_path, output, compact=compact, partitioned=partitioned, drop_raw_record=drop_raw_record,
+        chunksize=4 if chunked else None,
+    )
+
+    expected = _read_back(reference, partitioned=False)
+    pd.testing.assert_frame_equal(_read_back(output, partitioned), expected)
+    assert ("raw_record" in expected.columns) != drop_raw_record
+    if compact:
+        assert isinstance(expected["case_type"].dtype, pd.CategoricalDtype)
+        assert expected["case_number"].dtype == "Int32"
+
+
+def test_empty_export(tmp_path):
+    export = write_export(tmp_path / "empty.csv", lines=[])
+    clean_export(export, tmp_path / "whole.parquet")
+    clean_export(export, tmp_path / "chunked.parquet", chunksize=4)
+    whole = pd.read_parquet(tmp_path / "whole.parquet")
+    assert whole.empty
+    assert list(pd.read_parquet(tmp_path / "chunked.parquet").columns) == list(whole.columns)
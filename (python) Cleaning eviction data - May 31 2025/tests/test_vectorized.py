@@ -0,0 +1,63 @@
+# The whole-column helpers in vectorized.py against the row-wise rules they replace (stepwise.py)
+import pandas as pd
+import pytest
+
+from evictions.patterns import NO_ADDRESS
+from evictions.stepwise import extract_address_from_record, fallback_defendant, split_with_fallback
+from evictions.vectorized import extract_addresses, fallback_defendants, split_parties
+
+CASE_NAMES = [
+    "Main St Holdings VS All Occupants",   # plain split
+    "Main St Holdings vs. Jane Roe",       # lower case, period
+    "Lone Plaintiff LLC",                  # no VS
+    "VS Tenant A",                         # VS at the start
+    "Acme Realty Inc. VS",                 # VS at the end
+    '"Quoted LLC" VS "Bob"',               # quotes around both sides
+    "A VS B VS C",                         # only the first VS splits
+    "Versus Corp VSX Tenant",              # VS inside words does not split
+    None,                                  # no case name
+]
+
+# (raw_record, case_id, case_number)
+RECORDS = [
+    # two dates, standalone case number after the second
+    ("C1 17611 CV WERJ X VS Y 2021-08-01 2021-09-01 12 Main St 17611 C1 Y 8 Executed", "C1", "17611"),
+    # fewer than two dates
+    ("C2 04009 CV LT X VS Y 2021-08-01 12 Main St 04009 C2 Y 4 Pending", "C2", "04009"),
+    ("C3 04009 CV LT X VS Y 07/20/2021 9 Oak Rd C3 Dismissed", "C3", "04009"),
+    # the same date twice: the address starts after its first occurrence
+    ("C4 33333 CV LT X VS Y 2021-04-04 2021-04-04 7 B Ave 33333 C4 Y 6 Executed", "C4", "33333"),
+    # case number missing after the second date, and inside a longer number first
+    ("C5 55555 CV LT X VS Y 2021-01-01 2021-02-02 1 Rd C5 Y 1 Pending", "C5", "55555"),
+    ("C6 44444 CV LT X VS Y 2021-06-01 2021-07-01 444445 C Rd 44444 C6 Y 2 Pending", "C6", "44444"),
+    # tabs and doubled spaces inside the address, quotes around it
+    ('C7 12345 CV LT X VS Y 2021-06-01 2021-07-01 "1\tA  St" 12345 C7 Y 2 Pending', "C7", "12345"),
+    # case_id repeated, name with a stray VS, no trailing number
+    ("C8 12345 CV X VS C8 Ann  VS Lee 9 done", "C8", "12345"),
+    ("C9 12345 CV no number at the end C9 nothing", "C9", "12345"),
+]
+
+
+def test_split_parties_matches_split_with_fallback():
+    names = pd.Series(CASE_NAMES, dtype=object)
+    parties = split_parties(names)
+    expected = [split_with_fallback(name if name is not None else pd.NA) for name in CASE_NAMES]
+    assert list(zip(parties["plaintiff"], parties["defendant"])) == expected
+
+
+@pytest.mark.parametrize("record,case_id,case_number", RECORDS)
+def test_fallback_defendants_matches_fallback_defendant(record, case_id, case_number):
+    found = fallback_defendants(pd.Series([record]), pd.Series([case_id]))
+    assert found.iloc[0] == fallback_defendant(record, case_id)
+
+
+@pytest.mark.parametrize("record,case_id,case_number", RECORDS)
+def test_extract_addresses_matches_extract_address_from_record(record, case_id, case_number):
+    found = extract_addresses(pd.Series([record]), pd.Series([case_number])).iloc[0]
+    expected = extract_address_from_record(record, case_number)
+    assert found == (NO_ADDRESS if expected is pd.NA else expected)
+
+
+def test_extract_addresses_without_case_number():
+    found = extract_addresses(pd.Series([RECORDS[0][0]]), pd.Series([None], dtype=object))
+    assert found.tolist() == [NO_ADDRESS]
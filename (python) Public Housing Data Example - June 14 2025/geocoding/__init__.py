@@ -0,0 +1,65 @@
+# Geocoding and flagging helpers for the Lisbon public housing addresses
+#
+# Names are loaded from their submodule on first use, so `import geocoding` (and `python -m geocoding --help`)
+# doesn't import GeoPandas or googlemaps until a step that needs them runs.
+import importlib     # loads a submodule on first attribute access
+
+# Public name → submodule that defines it
+_EXPORTS = {
+    "CONFIDENCE_COLUMN": "geocoder",
+    "CheckpointedOutput": "checkpoint",
+    "DRIVERS": "flagging",
+    "GEOCODE_COLUMNS": "geocoder",
+    "GRID_SIZES": "aggregates",
+    "GeocodeCache": "cache",
+    "GeocodingClient": "client",
+    "GeocodingError": "providers",
+    "GoogleMapsProvider": "providers",
+    "HttpProvider": "providers",
+    "IN_RANGE_FORMATS": "flagging",
+    "LocalGeocoder": "local",
+    "MissingApiKeyError": "providers",
+    "Metrics": "metrics",
+    "OUTPUT_FILES": "flagging",
+    "PARISH_COLUMNS": "flagging",
+    "SpatialAggregates": "aggregates",
+    "TokenBucket": "client",
+    "TransientGeocodingError": "providers",
+    "canonical_addresses": "local",
+    "cell_polygons": "aggregates",
+    "export_outputs": "flagging",
+    "flag_addresses": "flagging",
+    "flag_within": "flagging",
+    "flagging_counts": "metrics",
+    "geocode_addresses": "geocoder",
+    "geocode_file": "geocoder",
+    "geocoded_points": "flagging",
+    "geocoding_counts": "metrics",
+    "grid_layers": "aggregates",
+    "hex_cells": "aggregates",
+    "in_range_points": "flagging",
+    "load_boundary": "flagging",
+    "load_parishes": "flagging",
+    "make_provider": "geocoder",
+    "normalize_addresses": "cache",
+    "parish_of": "flagging",
+    "read_geocoded": "flagging",
+    "result_fields": "geocoder",
+    "square_cells": "aggregates",
+    "within_boundary": "flagging",
+    "write_output": "flagging",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
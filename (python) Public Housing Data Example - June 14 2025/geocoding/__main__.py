@@ -0,0 +1,147 @@
+# Command-line entry point:
+#   python -m geocoding geocode ADDRESSES.csv GEOCODED.csv [--api-key KEY] [--cache geocode_cache.sqlite]
+#                               [--local data_geocoded.csv [--offline]]
+#   python -m geocoding flag GEOCODED.csv --boundary lisbon_boundary.shp --output-dir Outputs
+#                            [--formats xlsx kml shp parquet fgb] [--parishes parish_tm06_apr_19_2025.gpkg]
+#                            [--aggregates Outputs/aggregates]
+#
+# Only argparse is imported up front; pandas, GeoPandas and googlemaps load after the arguments are parsed,
+# and only for the step being run.
+import argparse     # command-line options
+import os           # API key from the environment, path of the repository root
+import sys          # import path the root is added to
+
+# The repository root, which holds the metrics recorder shared with the eviction cleaner (pipeline_metrics/)
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FORMATS = ("xlsx", "kml", "shp", "parquet", "fgb")      # keys of geocoding.flagging.OUTPUT_FILES
+
+
+def days(value):
+    """*value* days in seconds (None stays None: no limit)."""
+    return None if value is None else value * 86_400
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # Options every step takes
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--metrics", help="save per-stage metrics here (.json, or OpenMetrics text otherwise)")
+    common.add_argument("--profile", help="profile every stage: cprofile or sampling")
+    common.add_argument("--profile-dir", default="profiles", help="where profiles are saved")
+    common.add_argument("--quiet", action="store_true", help="don't print the results and metrics")
+
+    cli = argparse.ArgumentParser(
+        prog="python -m geocoding",
+        description="Geocode the public housing addresses and flag those inside Lisbon.",
+    )
+    steps = cli.add_subparsers(dest="step", required=True)
+
+    geocode = steps.add_parser("geocode", parents=[common], help="geocode raw addresses with the Google Maps API")
+    geocode.add_argument("input", help="CSV with primary_key, address, neighborhood")
+    geocode.add_argument("output", help="CSV to write with the geocoded columns added")
+    geocode.add_argument("--api-key", default=os.environ.get("GOOGLE_MAPS_API_KEY"),
+                         help="Google Maps API key (default: $GOOGLE_MAPS_API_KEY)")
+    geocode.add_argument("--qps", type=float, default=50, help="requests per second (the API quota)")
+    geocode.add_argument("--max-in-flight", type=int, default=16, help="requests waiting on the network at once")
+    geocode.add_argument("--retries", type=int, default=4, help="retries of a request that failed transiently")
+    geocode.add_argument("--base-url",
+                         help="send plain-HTTP requests to this Geocoding API endpoint instead of using googlemaps "
+                              "(e.g. a local stub server)")
+    geocode.add_argument("--local", help="earlier geocoder output (e.g. data_geocoded.csv) to match addresses against "
+                                          "before sending any request")
+    geocode.add_argument("--min-confidence", type=float, default=0.8,
+                         help="local matches scoring below this go to the API instead")
+    geocode.add_argument("--offline", action="store_true",
+                         help="send no requests: addresses --local can't match are left unmatched")
+    geocode.add_argument("--checkpoint-every", type=int,
+                         help="append results to OUTPUT.partial in batches of this many rows, checkpointing each, "
+                              "so a rerun after a crash resumes where it stopped")
+    geocode.add_argument("--cache", help="SQLite file of earlier answers: reused, and filled with new ones")
+    geocode.add_argument("--cache-ttl-days", type=float, help="refetch cached answers older than this (default: never)")
+    geocode.add_argument("--cache-negative-ttl-days", type=float,
+                         help="refetch cached 'no match' answers older than this (default: --cache-ttl-days)")
+    geocode.add_argument("--cache-max-entries", type=int, help="evict least recently used answers beyond this many")
+
+    flag = steps.add_parser("flag", parents=[common], help="flag geocoded addresses inside the boundary and export them")
+    flag.add_argument("input", help="geocoded CSV (e.g. data_geocoded.csv)")
+    flag.add_argument("--boundary", required=True, help="boundary layer (shapefile, GeoPackage, ...)")
+    flag.add_argument("--parishes", help="parish layer (fre_code, fre_name) to assign every address its parish")
+    flag.add_argument("--aggregates",
+                      help="folder of per-parish / per-cell point counts for maps; new or moved points are (re)counted")
+    flag.add_argument("--output-dir", default=".", help="folder the exports are written to")
+    flag.add_argument("--formats", nargs="*", choices=FORMATS, default=list(FORMATS), help="exports to write (at the same time)")
+    return cli
+
+
+def main(argv=None) -> None:
+    cli = build_parser()
+    args = cli.parse_args(argv)
+
+    if REPO not in sys.path:
+        sys.path.append(REPO)
+    from .metrics import PROFILERS, Metrics
+
+    if args.profile and args.profile not in PROFILERS:
+        cli.error(f"--profile must be one of {', '.join(PROFILERS)}")
+    hooks = [PROFILERS[args.profile](args.profile_dir)] if args.profile else []
+    metrics = Metrics("geocoding", hooks=hooks)
+
+    if args.step == "geocode":
+        # Without a cache or local results every address goes to the API; otherwise the key is only needed if
+        # some address is left to send
+        if not args.api_key and not (args.offline or args.base_url or args.cache or args.local):
+            cli.error("geocode needs --api-key or $GOOGLE_MAPS_API_KEY (or --offline, --cache or --local)")
+        from .cache import GeocodeCache
+        from .geocoder import geocode_file
+        from .local import LocalGeocoder
+        from .providers import MissingApiKeyError
+        cache = None
+        if args.cache:
+            cache = GeocodeCache(
+                args.cache,
+                ttl=days(args.cache_ttl_days),
+                negative_ttl=days(args.cache_negative_ttl_days),
+                max_entries=args.cache_max_entries,
+            )
+        try:
+            geocode_file(
+                args.input,
+                args.output,
+                args.api_key or "",
+                qps=args.qps,
+                metrics=metrics,
+                max_in_flight=args.max_in_flight,
+                retries=args.retries,
+                cache=cache,
+                checkpoint_every=args.checkpoint_every,
+                local=LocalGeocoder.from_geocoded(args.local, args.min_confidence) if args.local else None,
+                offline=args.offline,
+                base_url=args.base_url,
+            )
+        except MissingApiKeyError as e:
+            cli.error(str(e))
+        finally:
+            if cache is not None:
+                cache.close()
+    else:
+        from .flagging import flag_addresses
+        flagged = flag_addresses(
+            args.input,
+            args.boundary,
+            args.output_dir,
+            formats=args.formats,
+            metrics=metrics,
+            parishes_path=args.parishes,
+            aggregates_path=args.aggregates,
+        )
+        if not args.quiet:
+            print(flagged["within_expected_range"].value_counts())
+
+    if not args.quiet:
+        metrics.report()
+    if args.metrics:
+        metrics.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# Precomputed map layers: flagged points counted per parish and per square / hexagonal cell at several sizes
+#
+# Maps read these small tables instead of scanning every point. Points are binned with array arithmetic in metres
+# (PT-TM06, the parish layer's CRS), and the counts are running totals: every counted point is kept with a hash of
+# its primary_key, coordinates, flag and parish, and a refresh only bins the points whose hash is new — a new key, or
+# a known one that moved or changed flag, whose earlier contribution is taken back out first.
+import os            # aggregate files inside the output folder
+
+import geopandas as gpd  # cell / parish polygons of a layer, for rendering
+import numpy as np       # vectorized binning
+import pandas as pd      # main library for data frames, CSV import/export, and tabular manipulation
+import shapely           # cell polygons
+from pyproj import Transformer  # WGS84 → metres
+
+# Cells are laid out in this CRS (metres), the parish GeoPackage's own
+AGGREGATE_CRS = "EPSG:3763"
+
+# Cell sizes in metres: the side of a square cell, the centre-to-corner radius of a hexagon
+GRID_SIZES = (250, 500, 1000)
+
+# Counted per cell: every point, and those inside the boundary
+COUNT_COLUMNS = ["points", "within_expected_range"]
+
+# What is kept of every counted point: enough to take it back out of the counts when it changes
+POINT_COLUMNS = ["primary_key", "lng", "lat", "within_expected_range", "parish_code"]
+
+# Files of a saved set of aggregates, inside its folder
+AGGREGATE_FILES = {"counts": "counts.parquet", "points": "counted_points.parquet"}
+
+_to_metres = Transformer.from_crs("EPSG:4326", AGGREGATE_CRS, always_xy=True)
+
+
+def project(lng, lat) -> tuple:
+    """Coordinates in metres (``AGGREGATE_CRS``) of WGS84 *lng* / *lat* arrays."""
+    return _to_metres.transform(np.asarray(lng, dtype=float), np.asarray(lat, dtype=float))
+
+
+def square_cells(x: np.ndarray, y: np.ndarray, size: float) -> tuple:
+    """(column, row) of the *size*-metre square holding each point."""
+    return np.floor(x / size).astype(np.int64), np.floor(y / size).astype(np.int64)
+
+
+def hex_cells(x: np.ndarray, y: np.ndarray, size: float) -> tuple:
+    """(q, r) axial coordinates of the pointy-top hexagon of radius *size* holding each point."""
+    q = (np.sqrt(3) / 3 * x - y / 3) / size
+    r = (2 / 3 * y) / size
+
+    # Round the cube coordinates (q, r, -q-r) and fix the one that moved most so they still sum to zero
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def cell_polygons(layer: str, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Polygons (in ``AGGREGATE_CRS``) of the cells (*i*, *j*) of grid *layer*, e.g. "hex_500"."""
+    shape, size = layer.split("_")
+    size = float(size)
+    i, j = np.asarray(i, dtype=float), np.asarray(j, dtype=float)
+    if shape == "square":
+        return shapely.box(i * size, j * size, (i + 1) * size, (j + 1) * size)
+
+    # Hexagon centres from axial coordinates, then the six corners around each
+    cx = size * np.sqrt(3) * (i + j / 2)
+    cy = size * 1.5 * j
+    angles = np.radians(30 + 60 * np.arange(6))
+    corners = np.stack([cx[:, None] + size * np.cos(angles), cy[:, None] + size * np.sin(angles)], axis=-1)
+    return shapely.polygons(corners)
+
+
+def point_hashes(points: pd.DataFrame) -> pd.Series:
+    """Hash of each point's ``POINT_COLUMNS``: it changes whenever anything the point is counted under does."""
+    return pd.util.hash_pandas_object(points[POINT_COLUMNS], index=False)
+
+
+def grid_layers(sizes=GRID_SIZES) -> list:
+    """Names of the grid layers for *sizes*: "square_<size>" and "hex_<size>"."""
+    return [f"{shape}_{size}" for size in sizes for shape in ("square", "hex")]
+
+
+class SpatialAggregates:
+    """
+    Running point counts for map layers: per parish (when the points have
+    ``parish_code``) and per square / hexagonal cell of every size in
+    *sizes*.
+
+    ``update`` counts the flagged points that are new or changed since they
+    were counted (by ``point_hashes``); ``refreshed`` is how many the last
+    update counted. ``table`` is the whole result as one small long table
+    and ``layer`` one layer with its polygons, ready to draw. ``save`` /
+    ``load`` keep the totals, and the points behind them, between runs.
+    """
+
+    def __init__(self, sizes=GRID_SIZES):
+        self.sizes = tuple(sizes)
+        self.counts = {}                     # layer → counts indexed by cell (i, j) or parish_code
+        self.parish_names = {}
+        self.points = pd.DataFrame(columns=POINT_COLUMNS).assign(point_hash=np.array([], dtype=np.uint64))
+        self.refreshed = 0
+
+    def _add(self, layer: str, counts: pd.DataFrame) -> None:
+        if layer in self.counts:
+            counts = self.counts[layer].add(counts, fill_value=0)
+        counts = counts.astype(np.int64)
+        self.counts[layer] = counts[counts["points"] != 0]  # cells whose every point moved away
+
+    def _count(self, points: pd.DataFrame, sign: int) -> None:
+        """Add (*sign* 1) or take out (*sign* -1) the geocoded *points* in every layer."""
+        points = points.dropna(subset=["lat", "lng"])
+        if points.empty:
+            return
+
+        values = pd.DataFrame({
+            "points": np.full(len(points), sign, dtype=np.int64),
+            "within_expected_range": sign * points["within_expected_range"].to_numpy(dtype=np.int64),
+        })
+        x, y = project(points["lng"], points["lat"])
+        for layer in grid_layers(self.sizes):
+            size = int(layer.split("_")[1])
+            i, j = (square_cells if layer.startswith("square") else hex_cells)(x, y, size)
+            self._add(layer, values.groupby([i, j]).sum().rename_axis(["cell_i", "cell_j"]))
+
+        in_parish = points["parish_code"].notna().to_numpy()
+        if in_parish.any():
+            codes = points.loc[in_parish, "parish_code"].to_numpy()
+            self._add("parish", values[in_parish].groupby(codes).sum().rename_axis("cell"))
+
+    def update(self, flagged: pd.DataFrame) -> "SpatialAggregates":
+        """Count the points of *flagged* that are new, or that moved or changed flag or parish since last counted."""
+        points = flagged.drop_duplicates("primary_key", keep="last").reindex(columns=POINT_COLUMNS)
+        points["within_expected_range"] = (points["within_expected_range"] == 1).astype(np.int64)
+        codes = points["parish_code"]
+        points["parish_code"] = codes.astype(str).astype(object).where(codes.notna(), None)
+        points["point_hash"] = point_hashes(points).to_numpy()
+
+        changed = points[~points["point_hash"].isin(self.points["point_hash"])]
+        self.refreshed = len(changed)
+        if changed.empty:
+            return self
+
+        earlier = self.points["primary_key"].isin(changed["primary_key"])
+        self._count(self.points[earlier], -1)
+        self._count(changed, 1)
+        kept = self.points[~earlier]
+        self.points = pd.concat([kept, changed], ignore_index=True) if len(kept) else changed.reset_index(drop=True)
+
+        if "parish_name" in flagged.columns:
+            named = flagged[flagged["parish_code"].notna()].drop_duplicates("parish_code")
+            self.parish_names.update(zip(named["parish_code"].astype(str), named["parish_name"]))
+        return self
+
+    def table(self) -> pd.DataFrame:
+        """
+        Every layer's counts: columns layer, cell (the parish code, or
+        "i:j" for a grid cell), cell_i / cell_j (missing for parishes),
+        name (the parish's) and ``COUNT_COLUMNS``.
+        """
+        tables = []
+        for layer, counts in self.counts.items():
+            counts = counts.reset_index()
+            if layer == "parish":
+                counts["name"] = counts["cell"].map(self.parish_names)
+            else:
+                counts["cell"] = counts["cell_i"].astype(str) + ":" + counts["cell_j"].astype(str)
+            tables.append(counts.assign(layer=layer))
+        columns = ["layer", "cell", "cell_i", "cell_j", "name"] + COUNT_COLUMNS
+        if not tables:
+            return pd.DataFrame(columns=columns)
+        table = pd.concat(tables, ignore_index=True).reindex(columns=columns)
+        return table.astype({"cell_i": "Int64", "cell_j": "Int64", "name": "string", "cell": "string"})
+
+    def layer(self, name: str, parishes: gpd.GeoDataFrame = None) -> gpd.GeoDataFrame:
+        """
+        Layer *name* ("parish", or one of ``grid_layers``) with a polygon per
+        counted cell, in ``AGGREGATE_CRS``; the parish layer takes its
+        polygons from *parishes* (see ``flagging.load_parishes``).
+        """
+        counts = self.table()
+        counts = counts[counts["layer"] == name].reset_index(drop=True)
+        if name == "parish":
+            shapes = parishes.to_crs(AGGREGATE_CRS).set_index("fre_code").geometry
+            geometry = shapes.reindex(counts["cell"].astype(object)).to_numpy()
+        else:
+            geometry = cell_polygons(name, counts["cell_i"].to_numpy(), counts["cell_j"].to_numpy())
+        return gpd.GeoDataFrame(counts, geometry=geometry, crs=AGGREGATE_CRS)
+
+    @classmethod
+    def load(cls, path, sizes=GRID_SIZES) -> "SpatialAggregates":
+        """
+        Aggregates saved in the folder *path*, with the cell sizes they were
+        built with (empty ones of *sizes* if nothing was saved there yet).
+        """
+        counts_path = os.path.join(path, AGGREGATE_FILES["counts"])
+        if not os.path.exists(counts_path):
+            return cls(sizes)
+
+        table = pd.read_parquet(counts_path)
+        grids = table.loc[table["layer"] != "parish", "layer"].unique()
+        aggregates = cls(sorted({int(layer.split("_")[1]) for layer in grids}))
+        for layer, counts in table.groupby("layer", sort=False):
+            if layer == "parish":
+                counts = counts.astype({"cell": object, "name": object})
+                aggregates.parish_names.update(zip(counts["cell"], counts["name"]))
+                counts = counts.set_index("cell")
+            else:
+                counts = counts.astype({"cell_i": np.int64, "cell_j": np.int64}).set_index(["cell_i", "cell_j"])
+            aggregates.counts[layer] = counts[COUNT_COLUMNS].astype(np.int64)
+        aggregates.points = pd.read_parquet(os.path.join(path, AGGREGATE_FILES["points"]))
+        return aggregates
+
+    def save(self, path) -> None:
+        """
+        Write the counts and the counted points into the folder *path*,
+        replacing any earlier ones: both are written to temporary files
+        first, so a failed write leaves the earlier pair in place.
+        """
+        os.makedirs(path, exist_ok=True)
+        targets = {name: os.path.join(path, file) for name, file in AGGREGATE_FILES.items()}
+        self.table().to_parquet(targets["counts"] + ".tmp", index=False)
+        self.points.to_parquet(targets["points"] + ".tmp", index=False)
+        for target in targets.values():
+            os.replace(target + ".tmp", target)
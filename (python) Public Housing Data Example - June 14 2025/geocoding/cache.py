@@ -0,0 +1,131 @@
+# Persistent geocode cache: every answer the API gave, kept in a SQLite file and keyed by the normalized address,
+# so a run only pays (in quota and in latency) for addresses it has never asked about
+#
+# "No match" answers are cached too. Errors are not: a transient failure should be retried next run, and a
+# refused request (bad key, quota switched off) says nothing about the address.
+import json          # results stored as the provider returned them
+import sqlite3       # single-file on-disk store from the standard library
+import time          # timestamps for expiry and least-recently-used eviction
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+# Punctuation that doesn't change what an address means, and runs of whitespace
+_spacing_regex = r"\s*([,;])\s*"
+_spaces_regex = r"\s+"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    key        TEXT PRIMARY KEY,   -- normalized address
+    results    TEXT NOT NULL,      -- provider results as JSON ("[]" when nothing matched)
+    fetched_at REAL NOT NULL,      -- when the API answered (seconds since the epoch)
+    used_at    REAL NOT NULL       -- last time a run read or wrote it
+);
+CREATE INDEX IF NOT EXISTS geocodes_used_at ON geocodes (used_at);
+"""
+
+# SQLite caps the number of ? placeholders in one statement; lookups are split into batches this size
+_LOOKUP_BATCH = 500
+
+
+def normalize_addresses(addresses: pd.Series) -> pd.Series:
+    """
+    Cache key of every address: Unicode-normalized, case-folded, single
+    spaces, no space before commas / semicolons. Missing or blank addresses
+    have no key (missing).
+    """
+    keys = (
+        addresses.astype("string")
+                 .str.normalize("NFKC")
+                 .str.casefold()
+                 .str.replace(_spacing_regex, r"\1 ", regex=True)
+                 .str.replace(_spaces_regex, " ", regex=True)
+                 .str.strip(" ,;")
+    )
+    keys = keys.mask(keys == "")
+    return keys.astype(object).where(keys.notna(), None)
+
+
+class GeocodeCache:
+    """
+    Geocoder answers stored in the SQLite file at *path*.
+
+    Entries older than *ttl* seconds (``None`` = never) are treated as
+    misses and fetched again; "no match" answers can expire sooner with
+    *negative_ttl*. With *max_entries* the least recently used entries are
+    evicted once the file holds more. ``stats`` reports hits, misses,
+    expired and evicted entries for this session.
+    """
+
+    def __init__(self, path, ttl=None, negative_ttl=None, max_entries=None):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM geocodes").fetchone()[0]
+
+    def _fresh(self, results: list, fetched_at: float, now: float) -> bool:
+        ttl = self.ttl if results else self.negative_ttl
+        return ttl is None or now - fetched_at <= ttl
+
+    def get_many(self, keys) -> dict:
+        """``{key: results}`` for the *keys* with a live entry; the rest count as misses."""
+        keys = list(keys)
+        now = time.time()
+        found = {}
+        for start in range(0, len(keys), _LOOKUP_BATCH):
+            batch = keys[start:start + _LOOKUP_BATCH]
+            rows = self.connection.execute(
+                f"SELECT key, results, fetched_at FROM geocodes WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            for key, results, fetched_at in rows:
+                results = json.loads(results)
+                if self._fresh(results, fetched_at, now):
+                    found[key] = results
+                else:
+                    self.expired += 1
+
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE geocodes SET used_at = ? WHERE key = ?", [(now, key) for key in found]
+            )
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries) -> None:
+        """Store ``(key, results)`` pairs (an empty list records "no match"), then evict down to *max_entries*."""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO geocodes (key, results, fetched_at, used_at) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(results), now, now) for key, results in entries],
+            )
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries beyond *max_entries*."""
+        if self.max_entries is None:
+            return
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM geocodes WHERE key IN (SELECT key FROM geocodes ORDER BY used_at LIMIT ?)",
+                    (excess,),
+                )
+            self.evicted += excess
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "expired": self.expired, "evicted": self.evicted}
+
+    def close(self) -> None:
+        self.connection.close()
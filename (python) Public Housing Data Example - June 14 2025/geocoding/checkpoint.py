@@ -0,0 +1,105 @@
+# Resumable output for long geocoding runs: results are appended to a partial file in batches, each batch followed
+# by a checkpoint line, so a run that dies part-way restarts where it stopped instead of at the first address
+#
+# The checkpoint file has one line per committed batch: the partial file's size once the batch was written, a tab,
+# and the batch's primary keys as JSON. A batch only counts once its line is complete; on restart the partial file
+# is cut back to the last committed size, dropping any rows a crash left half-written. A partial file whose header
+# isn't the one the new run writes (different input columns, or a local geocoder added or left out) is started over.
+import json          # primary keys of a committed batch
+import os            # file sizes, fsync, removing the partial files once the output is complete
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+
+class CheckpointedOutput:
+    """
+    Geocoded rows bound for the CSV at *output_path*, appended batch by batch
+    to ``<output_path>.partial`` with their primary keys recorded in
+    ``<output_path>.checkpoint``.
+
+    Opening one picks up whatever an interrupted run committed:
+    ``completed`` holds the primary keys already written — none when the
+    partial file's header differs from *columns* (the header this run
+    writes, when known). ``finish`` writes the output in input order and
+    removes the partial files.
+    """
+
+    def __init__(self, output_path, key: str = "primary_key", columns=None):
+        self.output_path = output_path
+        self.partial_path = f"{output_path}.partial"
+        self.checkpoint_path = f"{output_path}.checkpoint"
+        self.key = key
+        self.columns = None if columns is None else list(columns)
+        self.completed = set()
+        self.batches = 0
+        self.size, checkpoint_size = self._recover()
+        self.resumed = len(self.completed)  # rows an earlier run had already written
+
+        # Drop anything written after the last committed batch (a torn row, or a checkpoint line cut short)
+        with open(self.partial_path, "ab") as partial:
+            partial.truncate(self.size)
+        with open(self.checkpoint_path, "ab") as checkpoint:
+            checkpoint.truncate(checkpoint_size)
+
+    def _recover(self) -> tuple:
+        """(partial file size, checkpoint file size) of the last committed batch, filling ``completed``."""
+        if not (os.path.exists(self.partial_path) and os.path.exists(self.checkpoint_path)):
+            return 0, 0
+        size = checkpoint_size = 0
+        with open(self.checkpoint_path, "rb") as checkpoint:
+            for line in checkpoint:
+                try:
+                    offset, keys = line.decode("utf-8").split("\t", 1)
+                    offset, keys = int(offset), json.loads(keys)
+                except ValueError:
+                    break  # the line a crash cut short; everything after it is discarded
+                if not line.endswith(b"\n"):
+                    break
+                size = offset
+                checkpoint_size += len(line)
+                self.completed.update(keys)
+
+        # A partial file shorter than its checkpoint says was not written by this scheme, and one with other
+        # columns can't take this run's rows: start over
+        if os.path.getsize(self.partial_path) < size or (size and self.columns not in (None, self._header())):
+            self.completed.clear()
+            return 0, 0
+        return size, checkpoint_size
+
+    def _header(self) -> list:
+        """Column names on the first line of the partial file."""
+        return pd.read_csv(self.partial_path, nrows=0).columns.tolist()
+
+    def append(self, batch: pd.DataFrame) -> None:
+        """Write *batch* to the partial file, sync it, then commit its primary keys to the checkpoint."""
+        with open(self.partial_path, "a", encoding="utf-8", newline="") as partial:
+            batch.to_csv(partial, header=self.size == 0, index=False)
+            partial.flush()
+            os.fsync(partial.fileno())
+            self.size = partial.tell()
+
+        keys = batch[self.key].tolist()
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            checkpoint.write(f"{self.size}\t{json.dumps(keys)}\n")
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        self.completed.update(keys)
+        self.batches += 1
+
+    def finish(self, order: pd.Series) -> pd.DataFrame:
+        """
+        Read every committed row back, sort it by position of its key in
+        *order* (the input's primary keys), save it to *output_path* and
+        remove the partial files.
+        """
+        if self.size == 0:
+            raise ValueError(f"nothing was written to {self.partial_path}")
+        geocoded = pd.read_csv(self.partial_path, float_precision="round_trip")  # coordinates exactly as written
+        position = {key: i for i, key in enumerate(order.tolist())}
+        geocoded = geocoded.sort_values(self.key, key=lambda keys: keys.map(position), kind="stable")
+        geocoded = geocoded.reset_index(drop=True)
+
+        geocoded.to_csv(self.output_path, index=False)
+        os.remove(self.partial_path)
+        os.remove(self.checkpoint_path)
+        return geocoded
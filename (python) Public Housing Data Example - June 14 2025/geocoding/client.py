@@ -0,0 +1,121 @@
+# Concurrent requests to the geocoder: many in flight at once, paced by a token bucket so the API quota stays
+# saturated without being exceeded, with transient failures retried after an exponential backoff
+#
+# Requests spend most of their time waiting on the network, so a small thread pool is enough to keep the
+# quota busy; results come back in the order the addresses went in.
+import random        # jitter, so retries of a burst of failures don't all land together
+import threading     # shared token bucket and counters
+import time          # monotonic clock and pauses
+from collections import deque  # bounded queue of in-flight requests
+from concurrent.futures import ThreadPoolExecutor  # worker threads that wait on the network
+
+from .providers import TransientGeocodingError
+
+# Google's default limit is 50 queries per second
+DEFAULT_QPS = 50
+
+# Requests waiting on the network at once; enough to fill the quota when a round trip takes a few hundred ms
+DEFAULT_MAX_IN_FLIGHT = 16
+
+# Transient failures are retried this many times, waiting backoff × 2^attempt seconds (plus jitter) in between
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5
+
+
+class TokenBucket:
+    """
+    Thread-safe pacing of *rate* events per second, allowing bursts of up to
+    *capacity*. ``acquire`` reserves the next slot and sleeps until it comes,
+    so callers are served in the order they ask.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class GeocodingClient:
+    """
+    Sends addresses to *provider* (see providers.py) from up to
+    *max_in_flight* threads, never faster than *qps* requests per second.
+
+    Transient errors are retried up to *retries* times with exponential
+    backoff; each retry waits for its own token, so retries count against
+    the quota too. ``requests``, ``retried`` and ``failed`` count what
+    happened across every call.
+    """
+
+    def __init__(
+        self,
+        provider,
+        qps: float = DEFAULT_QPS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        self.provider = provider
+        self.bucket = TokenBucket(qps)
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def lookup(self, address: str) -> list:
+        """The provider's results for one *address*, retrying transient errors; raises once it gives up."""
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            self._count("requests")
+            try:
+                return self.provider.geocode(address)
+            except TransientGeocodingError:
+                if attempt == self.retries:
+                    raise
+                self._count("retried")
+                time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    def _lookup_or_error(self, address: str):
+        """``lookup``, with a final failure returned instead of raised."""
+        try:
+            return self.lookup(address)
+        except Exception as e:
+            self._count("failed")
+            return e
+
+    def geocode(self, addresses):
+        """
+        Yield ``(address, results)`` for every address, in input order; results
+        is the provider's list, or the exception that ended its last attempt.
+
+        At most two requests per thread are queued at once, so memory stays
+        flat however many addresses there are.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            pending = deque()
+            for address in addresses:
+                pending.append((address, pool.submit(self._lookup_or_error, address)))
+                if len(pending) >= 2 * self.max_in_flight:
+                    address, future = pending.popleft()
+                    yield address, future.result()
+            while pending:
+                address, future = pending.popleft()
+                yield address, future.result()
@@ -0,0 +1,217 @@
+# Flag geocoded addresses that fall inside the Lisbon boundary, assign each one its parish and export them for mapping
+#
+# Points are classified straight from the lat / lng columns: a bounding-box check first, then vectorized predicates
+# against the prepared boundary and the parish polygons (found through an STRtree), with both results written onto the frame in
+# one pass. No point GeoDataFrame is built and nothing is merged back, which keeps millions of points against
+# hundreds of polygons fast.
+#
+# The exports share one point GeoDataFrame, built only if a spatial format is requested, and run side by side in a
+# thread pool: the GDAL (KML, Shapefile, FlatGeobuf) and Arrow (GeoParquet) writers release the GIL while they work.
+import os           # output paths
+from concurrent.futures import ThreadPoolExecutor  # exports written side by side
+
+import geopandas as gpd  # spatial data frames, reprojection and KML / shapefile output
+import numpy as np       # coordinate arrays and masks
+import pandas as pd      # main library for data frames, CSV import/export, and tabular manipulation
+import shapely           # vectorized predicates, prepared geometries and the STRtree index
+
+from .aggregates import SpatialAggregates
+from .metrics import flagging_counts, geocoding_counts, maybe_stage
+
+# File written for each output format, inside the output folder
+OUTPUT_FILES = {
+    "xlsx": "Addresses Geocoded and Flagged.xlsx",          # every geocoded address with its flag (no geometry)
+    "kml": "addresses_for_gmaps.kml",                       # in-range points for Google Maps
+    "shp": "001_lisbon_public_housing_june_14_2025.shp",    # in-range points as an ESRI Shapefile
+    "parquet": "addresses_geocoded_flagged.parquet",        # every geocoded address with its flag, as GeoParquet
+    "fgb": "addresses_geocoded_flagged.fgb",                # the same as FlatGeobuf (full column names, streamable)
+}
+
+# GDAL driver of each vector format, and the ones that only hold the addresses inside the boundary
+DRIVERS = {"kml": "KML", "shp": "ESRI Shapefile", "fgb": "FlatGeobuf"}
+IN_RANGE_FORMATS = {"kml", "shp"}
+
+# Parish layer fields (the R mapping project's GeoPackage) → columns added to the flagged table
+PARISH_COLUMNS = {"fre_code": "parish_code", "fre_name": "parish_name"}
+
+
+def read_geocoded(path) -> pd.DataFrame:
+    """The geocoder's output, including addresses without a match."""
+    return pd.read_csv(path)
+
+
+def geocoded_points(addresses: pd.DataFrame) -> gpd.GeoDataFrame:
+    """Addresses that were geocoded, as WGS84 points."""
+    return gpd.GeoDataFrame(
+        addresses,
+        geometry=gpd.points_from_xy(addresses["lng"], addresses["lat"]),
+        crs="EPSG:4326",
+    )
+
+
+def load_boundary(path, crs="EPSG:4326"):
+    """The boundary layer at *path* reprojected to *crs* and merged into one (multi)polygon."""
+    return gpd.read_file(path).to_crs(crs).union_all()
+
+
+def load_parishes(path, crs="EPSG:4326") -> gpd.GeoDataFrame:
+    """The parish polygons at *path* (fields ``fre_code``, ``fre_name``) reprojected to *crs*."""
+    return gpd.read_file(path, columns=list(PARISH_COLUMNS)).to_crs(crs)
+
+
+def _in_bounds(x: np.ndarray, y: np.ndarray, geometry) -> np.ndarray:
+    """Mask of the coordinates inside the bounding box of *geometry* (the cheap prefilter)."""
+    xmin, ymin, xmax, ymax = shapely.bounds(geometry)
+    return (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+
+
+def within_boundary(x: np.ndarray, y: np.ndarray, boundary) -> np.ndarray:
+    """Mask of the points (*x*, *y*) strictly inside *boundary* — the same test as ``Point.within``."""
+    inside = _in_bounds(x, y, boundary)
+    shapely.prepare(boundary)
+    inside[inside] = shapely.contains_xy(boundary, x[inside], y[inside])
+    return inside
+
+
+def parish_of(x: np.ndarray, y: np.ndarray, parishes: gpd.GeoDataFrame) -> np.ndarray:
+    """
+    Position in *parishes* of the polygon each point (*x*, *y*) lies within,
+    or -1. Only points inside the layer's extent are queried: an STRtree of
+    the polygons pairs each with the parishes whose bounding box holds it,
+    then every parish tests its candidates at once against its prepared
+    polygon.
+    """
+    found = np.full(len(x), -1, dtype=np.int64)
+    candidates = np.flatnonzero(_in_bounds(x, y, shapely.box(*parishes.total_bounds)))
+    polygons = parishes.geometry.values
+    shapely.prepare(polygons)
+    point_idx, parish_idx = shapely.STRtree(polygons).query(shapely.points(x[candidates], y[candidates]))
+
+    # Group the (point, parish) pairs by parish; parishes don't overlap, so a point is within at most one
+    order = np.argsort(parish_idx, kind="stable")
+    point_idx, parish_idx = candidates[point_idx[order]], parish_idx[order]
+    starts = np.searchsorted(parish_idx, np.arange(len(polygons) + 1))
+    for parish, polygon in enumerate(polygons):
+        points = point_idx[starts[parish]:starts[parish + 1]]
+        found[points[shapely.contains_xy(polygon, x[points], y[points])]] = parish
+    return found
+
+
+def flag_within(geocoded: pd.DataFrame, boundary, parishes: gpd.GeoDataFrame = None) -> pd.DataFrame:
+    """
+    *geocoded* with ``within_expected_range`` = 1 for addresses whose point
+    falls inside *boundary* and 0 for the rest, plus the ``PARISH_COLUMNS``
+    of the parish it falls in (missing outside every parish) when
+    *parishes* is given. Coordinates are read from the lat / lng columns, in
+    the CRS of *boundary* and *parishes* (WGS84).
+    """
+    x = geocoded["lng"].to_numpy(dtype=float)
+    y = geocoded["lat"].to_numpy(dtype=float)
+
+    flagged = geocoded.copy()
+    flagged["within_expected_range"] = within_boundary(x, y, boundary).astype(int)
+    if parishes is not None:
+        found = parish_of(x, y, parishes)
+        matched = found >= 0
+        for field, column in PARISH_COLUMNS.items():
+            values = pd.Series(pd.NA, index=flagged.index, dtype="string")
+            values[matched] = parishes[field].to_numpy()[found[matched]]
+            flagged[column] = values
+    return flagged
+
+
+def in_range_points(flagged: pd.DataFrame, points: gpd.GeoDataFrame = None) -> gpd.GeoDataFrame:
+    """Points of the addresses flagged as inside the boundary (taken from *points* when already built)."""
+    points = geocoded_points(flagged) if points is None else points
+    return points[points["within_expected_range"] == 1]
+
+
+def write_output(fmt: str, table: pd.DataFrame, path) -> int:
+    """Write *table* to *path* in format *fmt* (a key of ``OUTPUT_FILES``); returns the rows written."""
+    if fmt == "xlsx":
+        table.to_excel(path, index=False)
+    elif fmt == "parquet":
+        table.to_parquet(path, index=False)
+    else:
+        table.to_file(path, driver=DRIVERS[fmt])
+    return len(table)
+
+
+def export_outputs(flagged: pd.DataFrame, output_dir, formats=tuple(OUTPUT_FILES), max_workers=None) -> dict:
+    """
+    Write the requested *formats* of *flagged* into *output_dir*, all at
+    once on up to *max_workers* threads (one per format by default).
+    Returns the rows written per format.
+    """
+    formats = [fmt for fmt in OUTPUT_FILES if fmt in formats]
+    if not formats:
+        return {}
+
+    # The point geometry is built once, and only for the spatial formats
+    points = geocoded_points(flagged) if any(fmt != "xlsx" for fmt in formats) else None
+    in_range = in_range_points(flagged, points) if IN_RANGE_FORMATS.intersection(formats) else None
+    tables = {
+        fmt: flagged if fmt == "xlsx" else in_range if fmt in IN_RANGE_FORMATS else points
+        for fmt in formats
+    }
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(formats)) as pool:
+        written = {
+            fmt: pool.submit(write_output, fmt, table, os.path.join(output_dir, OUTPUT_FILES[fmt]))
+            for fmt, table in tables.items()
+        }
+        return {fmt: future.result() for fmt, future in written.items()}
+
+
+def flag_addresses(
+    input_path,
+    boundary_path,
+    output_dir,
+    formats=tuple(OUTPUT_FILES),
+    metrics=None,
+    parishes_path=None,
+    aggregates_path=None,
+) -> pd.DataFrame:
+    """
+    Flag the geocoded addresses in *input_path* against the boundary in
+    *boundary_path*, assign their parish from *parishes_path* when given,
+    and write the requested *formats* (keys of ``OUTPUT_FILES``) into
+    *output_dir*. With *aggregates_path*, the points that are new there, or
+    that moved or changed flag since they were counted, are (re)counted in
+    the per-parish / per-cell counts saved in that folder (see
+    aggregates.py). Returns the flagged table of geocoded addresses.
+    Nothing depends on the working directory.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    with maybe_stage(metrics, "read") as stage:
+        addresses = read_geocoded(input_path)
+        stage.rows_out += len(addresses)
+        stage.add_counts(geocoding_counts(addresses))
+
+    with maybe_stage(metrics, "points", len(addresses)) as stage:
+        geocoded = addresses.dropna(subset=["lat", "lng"])
+        stage.rows_out += len(geocoded)
+
+    with maybe_stage(metrics, "boundary") as stage:
+        boundary = load_boundary(boundary_path)
+        parishes = load_parishes(parishes_path) if parishes_path else None
+
+    with maybe_stage(metrics, "flag", len(geocoded)) as stage:
+        flagged = flag_within(geocoded, boundary, parishes)
+        stage.rows_out += len(flagged)
+        stage.add_counts(flagging_counts(flagged))
+
+    # One stage for every export: they run at the same time, so separate timings would overlap
+    with maybe_stage(metrics, "export", len(flagged)) as stage:
+        written = export_outputs(flagged, output_dir, formats)
+        stage.rows_out += len(flagged)
+        stage.add_counts({f"rows_{fmt}": rows for fmt, rows in written.items()})
+
+    if aggregates_path:
+        with maybe_stage(metrics, "aggregate", len(flagged)) as stage:
+            aggregates = SpatialAggregates.load(aggregates_path)
+            aggregates.update(flagged).save(aggregates_path)
+            stage.rows_out += aggregates.refreshed
+
+    return flagged
@@ -0,0 +1,226 @@
+# Geocode raw addresses with the Google Maps Geocoding API and build the matching request / map URLs
+#
+# Requests go out concurrently through GeocodingClient (client.py), paced to the API quota, once per distinct
+# normalized address and only for addresses that neither earlier results (local.py) nor the cache (cache.py) can
+# answer; offline, those are left unmatched instead. The provider is pluggable
+# (providers.py): the googlemaps client by default. The client (and with it the provider) is only created once some
+# address is left to send, so flagging an already geocoded file, or geocoding one the cache and local matches fully
+# answer, needs neither googlemaps installed nor an API key. Long runs can stream their results to disk in checkpointed
+# batches (checkpoint.py) and pick up where they stopped after a crash; without a cache the batches share an
+# in-memory one, so each distinct address is still sent once per run.
+import urllib.parse  # URL-encoding of addresses
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .cache import GeocodeCache, normalize_addresses
+from .checkpoint import CheckpointedOutput
+from .client import DEFAULT_MAX_IN_FLIGHT, DEFAULT_QPS, DEFAULT_RETRIES, GeocodingClient
+from .metrics import geocoding_counts, maybe_stage
+from .providers import GoogleMapsProvider, HttpProvider, MissingApiKeyError
+
+# Columns the geocoder adds to the address table, in output order
+GEOCODE_COLUMNS = ["geocoded_address", "lat", "lng", "place_id", "raw_url", "maps_url"]
+
+# Added when a local geocoder is used: its confidence in the rows it answered (missing for the rest)
+CONFIDENCE_COLUMN = "match_confidence"
+
+# New answers are written to the cache in batches of this many, so an interrupted run keeps most of its work
+CACHE_WRITE_BATCH = 200
+
+
+def result_fields(results, addr, api_key: str) -> tuple:
+    """
+    The ``GEOCODE_COLUMNS`` values for one address from the provider's
+    *results*: (formatted address, lat, lng, place_id, raw API URL, Maps
+    URL), or six Nones when nothing matched or the request failed.
+    """
+    if isinstance(results, Exception):
+        print(f"Error geocoding {addr!r}: {results}")
+        return (None,) * 6
+    if not results:
+        return (None,) * 6
+
+    top = results[0]
+    formatted = top["formatted_address"]
+    lat = top["geometry"]["location"]["lat"]
+    lng = top["geometry"]["location"]["lng"]
+    place_id = top.get("place_id")
+
+    # build the raw API request URL
+    encoded = urllib.parse.quote(addr)
+    raw_url = (
+        f"https://maps.googleapis.com/maps/api/geocode/json"
+        f"?address={encoded}&key={api_key}"
+    )
+
+    # build a Google Maps browser URL (opens a map pin)
+    maps_url = f"https://www.google.com/maps/search/?api=1&query={lat},{lng}"
+
+    return formatted, lat, lng, place_id, raw_url, maps_url
+
+
+def make_provider(api_key: str, base_url=None):
+    """The googlemaps client, or the plain-HTTP provider pointed at *base_url* (e.g. a local stub server)."""
+    if base_url:
+        return HttpProvider(api_key, base_url=base_url)
+    if not api_key:
+        raise MissingApiKeyError("Addresses are left to send to the Geocoding API, but no API key was given")
+    return GoogleMapsProvider(api_key)
+
+
+def geocode_addresses(
+    addresses: pd.DataFrame,
+    api_key: str,
+    qps: float = DEFAULT_QPS,
+    provider=None,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    retries: int = DEFAULT_RETRIES,
+    client=None,
+    cache=None,
+    local=None,
+    offline: bool = False,
+    base_url=None,
+) -> pd.DataFrame:
+    """
+    *addresses* (columns primary_key, address, neighborhood) with the
+    ``GEOCODE_COLUMNS`` added.
+
+    Addresses are normalized first and each distinct one is asked about
+    once. A *local* geocoder (``LocalGeocoder``) answers those it matches
+    with enough confidence, recorded in ``CONFIDENCE_COLUMN``; with a
+    *cache* (``GeocodeCache``) only addresses without a live entry are sent,
+    and their answers — "no match" included — are stored. *offline* sends
+    nothing: whatever is left is unmatched. Up to
+    *max_in_flight* requests run at once, at no more than *qps* per second,
+    and transient errors are retried. *provider* defaults to the googlemaps
+    client (or the HTTP provider at *base_url*); pass *client* to reuse one
+    (and read its request / retry / failure counts afterwards), or a function
+    returning one. Nothing is created when no address is left to send.
+    """
+    # One request per distinct normalized address (sent as its first spelling), none for those matched locally or cached
+    keys = normalize_addresses(addresses["address"])
+    distinct = addresses["address"].groupby(keys.to_numpy(), sort=False).first()
+    answers, confidence = {}, {}
+    if local is not None:
+        matches = local.match(distinct)
+        matches = matches[matches["confidence"] >= local.min_confidence]
+        answers.update(matches["results"].to_dict())
+        confidence.update(matches["confidence"].to_dict())
+    if cache is not None:
+        answers.update(cache.get_many([key for key in distinct.index if key not in answers]))
+    todo = distinct[[key not in answers for key in distinct.index]]
+    if offline:
+        todo = todo.iloc[:0]
+    elif len(todo):
+        client = client() if callable(client) else client or GeocodingClient(
+            provider or make_provider(api_key, base_url), qps=qps, max_in_flight=max_in_flight, retries=retries,
+        )
+
+    fetched = []
+    for key, (addr, found) in zip(todo.index, client.geocode(todo.to_numpy()) if len(todo) else ()):
+        answers[key] = found
+        if cache is not None and not isinstance(found, Exception):
+            fetched.append((key, found))
+            if len(fetched) >= CACHE_WRITE_BATCH:
+                cache.put_many(fetched)
+                fetched = []
+    if fetched:
+        cache.put_many(fetched)
+
+    results = [
+        result_fields(answers.get(key, []) if key is not None else [], addr, api_key)
+        for key, addr in zip(keys, addresses["address"])
+    ]
+
+    geocoded = addresses.copy()
+    for col, values in zip(GEOCODE_COLUMNS, zip(*results) if results else [()] * len(GEOCODE_COLUMNS)):
+        geocoded[col] = pd.Series(values, index=addresses.index, dtype=object)
+    if local is not None:
+        geocoded[CONFIDENCE_COLUMN] = keys.map(confidence).astype(float)
+    return geocoded
+
+
+def geocode_file(
+    input_path,
+    output_path,
+    api_key: str,
+    qps: float = DEFAULT_QPS,
+    metrics=None,
+    provider=None,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    retries: int = DEFAULT_RETRIES,
+    cache=None,
+    checkpoint_every: int = None,
+    local=None,
+    offline: bool = False,
+    base_url=None,
+) -> pd.DataFrame:
+    """
+    Geocode every address in the CSV at *input_path* and save the enriched
+    table to *output_path*, reusing and filling *cache* when one is given and
+    trying the *local* geocoder first (only, when *offline*).
+
+    With *checkpoint_every*, addresses are geocoded in batches of that many
+    rows, each appended to ``<output_path>.partial`` and checkpointed as soon
+    as it is done; a rerun after a crash skips every row already committed.
+    Without a *cache*, the batches share an in-memory one, so an address
+    repeated across batches is still sent only once per run.
+    The output is written from the partial file once all rows are in. The
+    client is created by the first batch with addresses left to send, and
+    reused by the rest.
+    """
+    with maybe_stage(metrics, "read") as stage:
+        addresses = pd.read_csv(input_path)
+        stage.rows_out += len(addresses)
+
+    with maybe_stage(metrics, "geocode", len(addresses)) as stage:
+        clients = []  # the one client of the run, once a batch needs it
+
+        def make_client() -> GeocodingClient:
+            if not clients:
+                clients.append(GeocodingClient(
+                    provider or make_provider(api_key, base_url), qps=qps, max_in_flight=max_in_flight, retries=retries,
+                ))
+            return clients[0]
+
+        options = dict(client=make_client, cache=cache, local=local, offline=offline)
+        if checkpoint_every and len(addresses):
+            if cache is None:
+                options["cache"] = GeocodeCache(":memory:")
+            # Only the rows no earlier run committed, one appended and checkpointed batch at a time
+            columns = list(addresses.columns) + GEOCODE_COLUMNS + ([CONFIDENCE_COLUMN] if local is not None else [])
+            output = CheckpointedOutput(output_path, columns=columns)
+            todo = addresses[~addresses["primary_key"].isin(output.completed)]
+            found = matched_locally = 0
+            for start in range(0, len(todo), checkpoint_every):
+                batch = geocode_addresses(todo.iloc[start:start + checkpoint_every], api_key, **options)
+                output.append(batch)
+                stage.rows_out += len(batch)
+                found += geocoding_counts(batch)["geocoded"]
+                matched_locally += int(batch[CONFIDENCE_COLUMN].notna().sum()) if local is not None else 0
+            stage.add_counts({"geocoded": found})
+            stage.add_counters({"resumed": output.resumed, "batches": output.batches})
+            if cache is None:
+                options["cache"].close()
+        else:
+            output = None
+            geocoded = geocode_addresses(addresses, api_key, **options)
+            stage.rows_out += len(geocoded)
+            stage.add_counts(geocoding_counts(geocoded))
+            matched_locally = int(geocoded[CONFIDENCE_COLUMN].notna().sum()) if local is not None else 0
+        if local is not None:
+            stage.add_counts({"local_matches": matched_locally})
+        for client in clients:
+            stage.add_counters({"requests": client.requests, "retried": client.retried, "failed": client.failed})
+        stage.add_counters({"distinct_addresses": int(normalize_addresses(addresses["address"]).nunique())})
+        if cache is not None:
+            stage.add_counters({f"cache_{name}": count for name, count in cache.stats().items()})
+
+    with maybe_stage(metrics, "write", len(addresses)) as stage:
+        if output is not None:
+            geocoded = output.finish(addresses["primary_key"])
+        else:
+            geocoded.to_csv(output_path, index=False)
+        stage.rows_out += len(geocoded)
+
+    return geocoded
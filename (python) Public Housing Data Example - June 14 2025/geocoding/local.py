@@ -0,0 +1,196 @@
+# Offline geocoder: addresses matched against earlier geocoder results (e.g. data_geocoded.csv) before any request
+#
+# New batches are mostly near-duplicates of addresses already resolved — other casing, "R." for "Rua", a floor and
+# side ("2º Esq") tacked on. Both sides are reduced to a canonical form (numbers, street, area tokens) and looked up
+# exactly; failing that, the entries with the same numbers (door, and street names like "Rua 5 de Outubro") and the
+# same street are scored by IDF-weighted token overlap. Only matches with a confidence of at least min_confidence
+# count; everything else goes to the provider as before.
+import difflib       # closest known spelling of a misspelled token
+import math          # inverse document frequency weights
+from collections import defaultdict  # entries of every (numbers, street) block
+
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+
+from .cache import normalize_addresses
+
+# Matches scoring below this are left to the provider
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+# A misspelled token is replaced by the closest known one at least this similar (difflib ratio)
+TOKEN_CUTOFF = 0.85
+
+# Abbreviations in Portuguese street addresses → the word they stand for
+ABBREVIATIONS = {
+    "r": "rua", "av": "avenida", "avd": "avenida", "avda": "avenida", "trav": "travessa", "tv": "travessa",
+    "tr": "travessa", "est": "estrada", "estr": "estrada", "cc": "calcada", "calc": "calcada", "lg": "largo",
+    "lgo": "largo", "pc": "praca", "pca": "praca", "pr": "praca", "al": "alameda", "bc": "beco", "bco": "beco",
+    "qta": "quinta", "bo": "bairro", "br": "bairro", "bairr": "bairro", "s": "sao", "sta": "santa",
+    "sto": "santo", "dr": "doutor", "eng": "engenheiro", "prof": "professor", "gen": "general",
+}
+
+# Connecting words that carry no information ("Rua de São Bento" = "Rua São Bento")
+STOPWORDS = {"de", "da", "do", "das", "dos", "e"}
+
+# Unit details that don't change the building: "nº", floor and side ("2º esq", "r/c dto", "3 andar"), flat numbers;
+# postcodes are dropped too, since one spelling may have it and the other not
+_postcode_regex = r"\b\d{4}\s*-\s*\d{3}\b"
+_number_sign_regex = r"\bn\.?\s*o\.?\s*(?=\d)"
+_ground_floor_regex = r"\br\s*/\s*c\b"
+_punctuation_regex = r"[^\w\s]|_"
+_floor_side_regex = (
+    r"\b(?:\d+\s*[oa]?|rc|cave|sub\s*cave)\s*(?:andar|piso)?\s*"
+    r"(?:esq|esqo|esquerdo|dto|dt|dta|dir|direito|frente|fte|tras)\b"
+)
+_floor_regex = r"\b\d+\s*[oa]?\s*(?:andar|piso)\b|\b\d+o\b|\b(?:rc|cave)\b"
+_unit_regex = r"\b(?:apartamento|apto|apt|fraccao|fracao|porta|loja)\s*\w*"
+_spaces_regex = r"\s+"
+
+
+def canonical_addresses(addresses: pd.Series) -> pd.Series:
+    """
+    Canonical form of every address: the cache key (``normalize_addresses``)
+    without accents, punctuation, postcode or unit details. Missing
+    addresses stay missing.
+    """
+    keys = normalize_addresses(addresses).astype("string")
+    canonical = (
+        keys.str.normalize("NFKD")
+            .str.encode("ascii", "ignore")
+            .str.decode("ascii")
+            .str.replace(_postcode_regex, " ", regex=True)
+            .str.replace(_number_sign_regex, " ", regex=True)
+            .str.replace(_ground_floor_regex, " rc ", regex=True)
+            .str.replace(_punctuation_regex, " ", regex=True)
+            .str.replace(_floor_side_regex, " ", regex=True)
+            .str.replace(_floor_regex, " ", regex=True)
+            .str.replace(_unit_regex, " ", regex=True)
+            .str.replace(_spaces_regex, " ", regex=True)
+            .str.strip()
+    )
+    return canonical.astype(object).where(canonical.notna() & (canonical != ""), None)
+
+
+def _parts(canonical: str) -> tuple:
+    """
+    (numbers, street / area tokens, how many of those tokens name the
+    street) of a canonical address: the street is what comes before the
+    first number, as in "Rua Augusta 12, Arroios".
+    """
+    numbers = []
+    tokens = []
+    street = None
+    for token in canonical.split():
+        if any(char.isdigit() for char in token):
+            numbers.append(token)
+            street = len(tokens) if street is None else street
+        elif token not in STOPWORDS:
+            tokens.append(ABBREVIATIONS.get(token, token))
+    return tuple(numbers), tokens, len(tokens) if street is None else street
+
+
+def _result(row) -> list:
+    """One historical row as the provider would have answered it."""
+    return [{
+        "formatted_address": row.geocoded_address,
+        "geometry": {"location": {"lat": row.lat, "lng": row.lng}},
+        "place_id": row.place_id,
+    }]
+
+
+class LocalGeocoder:
+    """
+    Historical geocoder answers, searchable by address.
+
+    ``add`` indexes rows with coordinates (columns address, geocoded_address,
+    lat, lng, place_id); ``match`` finds each address's best entry with the
+    same numbers and a confidence from 0 to 1 (1 = same canonical
+    address). Only matches of at least *min_confidence* are used by
+    ``geocode_addresses``.
+    """
+
+    def __init__(self, min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self.results = []                    # entry → provider-style results
+        self.entry_tokens = []               # entry → its street / area tokens
+        self.exact = {}                      # (numbers, tokens) → entry
+        self.blocks = defaultdict(list)      # (numbers, street tokens) → entries
+        self.document_frequency = defaultdict(int)
+        self.by_shape = defaultdict(set)     # (first letter, length) → known tokens, for spelling fixes
+        self._spellings = {}
+
+    @classmethod
+    def from_geocoded(cls, source, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> "LocalGeocoder":
+        """An index of the geocoded rows in *source* (a data_geocoded.csv path or its data frame)."""
+        geocoded = pd.read_csv(source) if not isinstance(source, pd.DataFrame) else source
+        return cls(min_confidence).add(geocoded)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def add(self, geocoded: pd.DataFrame) -> "LocalGeocoder":
+        """Index the rows of *geocoded* that have coordinates; the first answer for an address wins."""
+        found = geocoded.dropna(subset=["lat", "lng"])
+        found = found.assign(canonical=canonical_addresses(found["address"])).dropna(subset=["canonical"])
+        for row in found.drop_duplicates("canonical").itertuples(index=False):
+            numbers, tokens, street = _parts(row.canonical)
+            key = (numbers, frozenset(tokens))
+            if not tokens or key in self.exact:
+                continue
+            entry = len(self.results)
+            self.results.append(_result(row))
+            self.entry_tokens.append(key[1])
+            self.exact[key] = entry
+            self.blocks[(numbers, frozenset(tokens[:street]))].append(entry)
+            for token in key[1]:
+                if token not in self.document_frequency:
+                    self.by_shape[(token[0], len(token))].add(token)
+                self.document_frequency[token] += 1
+        self._spellings.clear()
+        return self
+
+    def _weight(self, token: str) -> float:
+        """Inverse document frequency: rare tokens (street names) count more than common ones ("rua", "lisboa")."""
+        return math.log(1 + len(self.results) / (1 + self.document_frequency.get(token, 0)))
+
+    def _spelling(self, token: str) -> str:
+        """*token*, or the most similar known token of about the same length when it is unknown."""
+        if token in self.document_frequency:
+            return token
+        if token not in self._spellings:
+            known = [
+                candidate for length in range(len(token) - 2, len(token) + 3)
+                for candidate in self.by_shape.get((token[0], length), ())
+            ]
+            close = difflib.get_close_matches(token, sorted(known), n=1, cutoff=TOKEN_CUTOFF)
+            self._spellings[token] = close[0] if close else token
+        return self._spellings[token]
+
+    def match_one(self, canonical: str) -> tuple:
+        """(results, confidence) of the best entry for one canonical address, or (None, 0.0)."""
+        numbers, tokens, street = _parts(canonical)
+        if not tokens:
+            return None, 0.0
+        tokens = [self._spelling(token) for token in tokens]
+        key = (numbers, frozenset(tokens))
+        if key in self.exact:
+            return self.results[self.exact[key]], 1.0
+
+        # Weighted overlap (Dice) with the entries on the same street with the same numbers
+        best, score = None, 0.0
+        query_weight = sum(self._weight(token) for token in key[1])
+        for entry in self.blocks.get((numbers, frozenset(tokens[:street])), ()):
+            shared = sum(self._weight(token) for token in key[1] & self.entry_tokens[entry])
+            entry_weight = sum(self._weight(token) for token in self.entry_tokens[entry])
+            confidence = 2 * shared / (query_weight + entry_weight)
+            if confidence > score:
+                best, score = entry, confidence
+        if best is None:
+            return None, 0.0
+        return self.results[best], round(min(score, 0.999), 3)
+
+    def match(self, addresses: pd.Series) -> pd.DataFrame:
+        """Columns results (``None`` without a candidate) and confidence for every address."""
+        canonical = canonical_addresses(addresses)
+        distinct = {value: self.match_one(value) for value in canonical.dropna().unique()}
+        matches = [distinct.get(value, (None, 0.0)) if value is not None else (None, 0.0) for value in canonical]
+        return pd.DataFrame(matches, index=addresses.index, columns=["results", "confidence"])
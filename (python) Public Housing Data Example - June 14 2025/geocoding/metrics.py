@@ -0,0 +1,29 @@
+# Per-stage instrumentation of the geocode / flag steps: the recorder shared with the eviction cleaner
+# (pipeline_metrics/ at the repository root — timings, memory, rows, match rates, JSON / OpenMetrics output,
+# profiler hooks) and this project's own match rates. The root has to be on sys.path; the script, the CLI, the
+# tests and the benchmarks put it there
+import pandas as pd  # main library for data frames, CSV import/export, and tabular manipulation
+from pipeline_metrics import (  # the recorder both projects share
+    PROFILERS,
+    Metrics,
+    StageMetrics,
+    cprofile_hook,
+    maybe_stage,
+    sampling_hook,
+)
+
+
+# -- match rates of the geocode / flag steps ------------------------------------------
+
+def geocoding_counts(addresses: pd.DataFrame) -> dict:
+    """How many addresses came back from the geocoder with coordinates."""
+    return {"geocoded": int(addresses[["lat", "lng"]].notna().all(axis=1).sum())}
+
+
+def flagging_counts(flagged: pd.DataFrame) -> dict:
+    """How many geocoded addresses fell inside / outside the expected area (and inside a parish, when assigned)."""
+    inside = int((flagged["within_expected_range"] == 1).sum())
+    counts = {"within_expected_range": inside, "out_of_range": len(flagged) - inside}
+    if "parish_code" in flagged:
+        counts["in_parish"] = int(flagged["parish_code"].notna().sum())
+    return counts
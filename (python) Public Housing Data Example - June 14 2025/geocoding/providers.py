@@ -0,0 +1,105 @@
+# Geocoding providers: where an address is sent and how its answer comes back
+#
+# A provider is any object with ``geocode(address) -> list of results`` in the shape of the Google Geocoding API
+# (``formatted_address``, ``geometry.location.lat/lng``, ``place_id``), an empty list when nothing matched. Errors
+# worth another try (timeouts, 5xx, OVER_QUERY_LIMIT) are raised as TransientGeocodingError; anything else is final.
+import json          # body of the Geocoding API response
+import threading     # one googlemaps client per worker thread
+import urllib.error  # HTTP status of failed requests
+import urllib.parse  # query string of the request
+import urllib.request  # plain HTTP client (no extra dependency)
+
+# Public endpoint of the Google Geocoding API; HttpProvider can point anywhere that speaks the same JSON
+GOOGLE_BASE_URL = "https://maps.googleapis.com"
+GEOCODE_PATH = "/maps/api/geocode/json"
+
+# API statuses and HTTP codes that mean "try again later" rather than "this address failed"
+TRANSIENT_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+TRANSIENT_HTTP_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class GeocodingError(Exception):
+    """The provider refused or could not answer a request."""
+
+
+class TransientGeocodingError(GeocodingError):
+    """A failure that may go away if the same request is sent again (after a pause)."""
+
+
+class MissingApiKeyError(ValueError):
+    """Addresses are left to send to the Geocoding API, but no API key was given."""
+
+
+def _results(body: dict) -> list:
+    """Results of one Geocoding API response body, raising for any status other than OK / ZERO_RESULTS."""
+    status = body.get("status")
+    if status == "OK":
+        return body["results"]
+    if status == "ZERO_RESULTS":
+        return []
+    error = TransientGeocodingError if status in TRANSIENT_STATUSES else GeocodingError
+    raise error(f"{status}: {body.get('error_message', '')}".rstrip(": "))
+
+
+class HttpProvider:
+    """
+    The Geocoding API over plain HTTP at *base_url* — Google's by default, or
+    a local stub server speaking the same JSON for tests and load runs.
+    """
+
+    def __init__(self, api_key: str, base_url: str = GOOGLE_BASE_URL, timeout: float = 10):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def geocode(self, address: str) -> list:
+        query = urllib.parse.urlencode({"address": address, "key": self.api_key})
+        try:
+            with urllib.request.urlopen(f"{self.base_url}{GEOCODE_PATH}?{query}", timeout=self.timeout) as response:
+                body = json.load(response)
+        except urllib.error.HTTPError as e:
+            error = TransientGeocodingError if e.code in TRANSIENT_HTTP_CODES else GeocodingError
+            raise error(f"HTTP {e.code}") from e
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise TransientGeocodingError(str(e)) from e
+        return _results(body)
+
+
+class GoogleMapsProvider:
+    """
+    The official googlemaps client (one per worker thread). Its own throttle
+    and retry loop are turned off: the caller's token bucket sets the pace
+    and retries transient errors itself.
+    """
+
+    def __init__(self, api_key: str, timeout: float = 10):
+        import googlemaps  # Google Maps API client
+
+        self.googlemaps = googlemaps
+        self.api_key = api_key
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = self.googlemaps.Client(
+                key=self.api_key,
+                timeout=self.timeout,
+                retry_timeout=self.timeout,
+                queries_per_second=1_000_000,
+                retry_over_query_limit=False,
+            )
+        return self._local.client
+
+    def geocode(self, address: str) -> list:
+        exceptions = self.googlemaps.exceptions
+        try:
+            return self._client().geocode(address)
+        except exceptions.ApiError as e:
+            error = TransientGeocodingError if e.status in TRANSIENT_STATUSES else GeocodingError
+            raise error(str(e)) from e
+        except exceptions.HTTPError as e:  # a TransportError with a status code, so checked first
+            error = TransientGeocodingError if e.status_code in TRANSIENT_HTTP_CODES else GeocodingError
+            raise error(str(e)) from e
+        except (exceptions.Timeout, exceptions.TransportError) as e:
+            raise TransientGeocodingError(str(e)) from e
@@ -0,0 +1,78 @@
+# Shared fixtures: a small address table and a provider that answers from memory instead of the Geocoding API
+import os
+import re
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+# The tests import the geocoding package from the project folder, and the shared metrics recorder from the repository
+# root, wherever pytest is started
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [PROJECT, os.path.dirname(PROJECT)]
+
+# Spellings of the same address differ only in case, spacing and commas; "nowhere" never matches
+ADDRESSES = [
+    "Rua Castelo Branco 1, Lisboa",
+    "rua castelo branco 1 ,  lisboa",
+    "Avenida da Liberdade 10, Lisboa",
+    "Rua Castelo Branco 1,Lisboa",
+    "Praça do Comércio 2, Lisboa",
+    "nowhere 3",
+    "Avenida da Liberdade 10, Lisboa",
+    "Rua Augusta 4, Lisboa",
+]
+
+
+class FakeProvider:
+    """
+    Answers every address with a point derived from its number (none for
+    "nowhere"), records what was sent, and can fail: *transient* addresses
+    raise a TransientGeocodingError that many times first, and the request
+    number *crash_at* raises KeyboardInterrupt (a run killed part-way).
+    """
+
+    def __init__(self, transient=None, crash_at=None):
+        self.sent = []
+        self.transient = dict(transient or {})
+        self.crash_at = crash_at
+        self.lock = threading.Lock()
+
+    def geocode(self, address: str) -> list:
+        from geocoding.providers import TransientGeocodingError
+        with self.lock:
+            self.sent.append(address)
+            if self.crash_at is not None and len(self.sent) >= self.crash_at:
+                raise KeyboardInterrupt
+            if self.transient.get(address):
+                self.transient[address] -= 1
+                raise TransientGeocodingError("OVER_QUERY_LIMIT")
+        if address.startswith("nowhere"):
+            return []
+        number = int(re.search(r"\d+", address).group())
+        return [{
+            "formatted_address": address.upper(),
+            "geometry": {"location": {"lat": 38.7 + number / 1000, "lng": -9.14}},
+            "place_id": f"place-{number}",
+        }]
+
+
+def write_addresses(path, addresses=ADDRESSES) -> str:
+    """Write *addresses* as the geocoder's input CSV (primary_key, address, neighborhood) and return its path."""
+    pd.DataFrame({
+        "primary_key": range(1, len(addresses) + 1),
+        "address": addresses,
+        "neighborhood": "Lisboa",
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def addresses_path(tmp_path):
+    return write_addresses(tmp_path / "addresses.csv")
+
+
+@pytest.fixture
+def addresses(addresses_path):
+    return pd.read_csv(addresses_path)
@@ -0,0 +1,54 @@
+# Running map counts: a refresh recounts exactly the points that are new, moved or re-flagged, and saved counts
+# reload to the same totals a fresh count of the final points gives
+import numpy as np
+import pandas as pd
+
+from geocoding.aggregates import SpatialAggregates
+
+
+def _flagged(n=300, seed=0) -> pd.DataFrame:
+    """*n* points around Lisbon, a third of them outside the boundary, in two parishes, and one without coordinates."""
+    rng = np.random.default_rng(seed)
+    flagged = pd.DataFrame({
+        "primary_key": np.arange(n),
+        "lat": rng.uniform(38.69, 38.80, n),
+        "lng": rng.uniform(-9.23, -9.09, n),
+        "within_expected_range": (np.arange(n) % 3 != 0).astype(int),
+        "parish_code": pd.array(np.where(np.arange(n) % 2, "110601", "110602"), dtype="string"),
+        "parish_name": np.where(np.arange(n) % 2, "Ajuda", "Alcântara"),
+    })
+    flagged.loc[n - 1, ["lat", "lng"]] = np.nan
+    return flagged
+
+
+def _table(aggregates: SpatialAggregates) -> pd.DataFrame:
+    return aggregates.table().sort_values(["layer", "cell"], ignore_index=True)
+
+
+def test_refresh_recounts_only_changed_points():
+    flagged = _flagged()
+    aggregates = SpatialAggregates().update(flagged)
+    assert aggregates.refreshed == len(flagged)
+    assert aggregates.update(flagged).refreshed == 0
+
+    # One point moves across town, another is re-flagged, and a new one arrives
+    changed = pd.concat([flagged, _flagged(2, seed=1).iloc[:1].assign(primary_key=len(flagged))], ignore_index=True)
+    changed.loc[0, ["lat", "lng"]] = [38.78, -9.10]
+    changed.loc[1, "within_expected_range"] = 1 - changed.loc[1, "within_expected_range"]
+    assert aggregates.update(changed).refreshed == 3
+
+    pd.testing.assert_frame_equal(_table(aggregates), _table(SpatialAggregates().update(changed)))
+    parish = aggregates.table().query("layer == 'parish'")
+    assert parish["points"].sum() == changed["lat"].notna().sum()
+
+
+def test_saved_counts_reload(tmp_path):
+    flagged = _flagged()
+    SpatialAggregates().update(flagged).save(tmp_path)
+    assert not list(tmp_path.glob("*.tmp"))
+
+    aggregates = SpatialAggregates.load(tmp_path)
+    assert aggregates.update(flagged).refreshed == 0
+    flagged.loc[5, "lat"] += 0.01
+    aggregates.update(flagged).save(tmp_path)
+    pd.testing.assert_frame_equal(_table(SpatialAggregates.load(tmp_path)), _table(SpatialAggregates().update(flagged)))
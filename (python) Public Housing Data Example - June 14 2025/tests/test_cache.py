@@ -0,0 +1,81 @@
+# The geocode cache: keyed by normalized address, entries expire after their TTL, the least recently used go first
+import pandas as pd
+import pytest
+from conftest import FakeProvider
+
+from geocoding import cache as cache_module
+from geocoding.cache import GeocodeCache, normalize_addresses
+from geocoding.geocoder import geocode_addresses
+
+FOUND = [{"formatted_address": "A", "geometry": {"location": {"lat": 1.0, "lng": 2.0}}}]
+
+
+class Clock:
+    """Stand-in for time.time in cache.py, moved forward by hand."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_normalize_addresses():
+    keys = normalize_addresses(pd.Series(["Rua A 1 ,Lisboa", "RUA  A 1, lisboa;", "  ", None]))
+    assert keys.tolist() == ["rua a 1, lisboa", "rua a 1, lisboa", None, None]
+
+
+def test_ttl(tmp_path, clock):
+    cache = GeocodeCache(tmp_path / "cache.sqlite", ttl=100, negative_ttl=10)
+    cache.put_many([("found", FOUND), ("none", [])])
+    clock.now += 50
+    assert cache.get_many(["found", "none", "never"]) == {"found": FOUND}
+    clock.now += 51
+    assert cache.get_many(["found"]) == {}
+    assert cache.stats() == {"hits": 1, "misses": 3, "expired": 2, "evicted": 0}
+    cache.close()
+
+
+def test_least_recently_used_are_evicted(tmp_path, clock):
+    cache = GeocodeCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.put_many([("a", FOUND)])
+    clock.now += 1
+    cache.put_many([("b", FOUND)])
+    clock.now += 1
+    cache.get_many(["a"])          # "a" is now more recently used than "b"
+    clock.now += 1
+    cache.put_many([("c", [])])
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    assert len(cache) == 2 and cache.stats()["evicted"] == 1
+    cache.close()
+
+
+def test_kept_between_sessions(tmp_path, addresses):
+    path = tmp_path / "cache.sqlite"
+    first = FakeProvider()
+    cache = GeocodeCache(path)
+    geocode_addresses(addresses, "key", provider=first, cache=cache, qps=1_000)
+    cache.close()
+
+    # Every answer, "no match" included, comes from the file the second time
+    second = FakeProvider()
+    cache = GeocodeCache(path)
+    geocoded = geocode_addresses(addresses, "key", provider=second, cache=cache, qps=1_000)
+    assert second.sent == [] and geocoded["lat"].notna().sum() == len(addresses) - 1
+    cache.close()
+
+
+def test_errors_are_not_cached(tmp_path, addresses):
+    cache = GeocodeCache(tmp_path / "cache.sqlite")
+    failing = FakeProvider(transient={"nowhere 3": 99})
+    geocode_addresses(addresses, "key", provider=failing, cache=cache, qps=1_000, retries=0)
+    assert "nowhere 3" not in cache.get_many(["nowhere 3"])
+    assert len(cache) == 4
+    cache.close()
@@ -0,0 +1,72 @@
+# Flags and parishes from the vectorized predicates against GeoPandas' spatial join of the same points
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from geocoding.flagging import PARISH_COLUMNS, flag_within, geocoded_points, load_boundary, load_parishes
+
+PARISH_GPKG = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "(R) Mapping Lisbon Parish Data - April 22 2025", "parish_tm06_apr_19_2025.gpkg",
+)
+
+
+def _points(xmin, ymin, xmax, ymax, n=2_000, seed=0) -> pd.DataFrame:
+    """*n* random points around the box (some outside it), a few missing coordinates, and the box's corners."""
+    rng = np.random.default_rng(seed)
+    pad_x, pad_y = (xmax - xmin) / 10, (ymax - ymin) / 10
+    lng = np.r_[rng.uniform(xmin - pad_x, xmax + pad_x, n), [xmin, xmax, np.nan]]
+    lat = np.r_[rng.uniform(ymin - pad_y, ymax + pad_y, n), [ymin, ymax, 38.7]]
+    return pd.DataFrame({"primary_key": np.arange(len(lng)), "lat": lat, "lng": lng})
+
+
+def _expected(points: pd.DataFrame, boundary, parishes: gpd.GeoDataFrame) -> pd.DataFrame:
+    """The same flags the slow way: ``Point.within`` for the boundary, ``sjoin(predicate="within")`` for parishes."""
+    geometry = geocoded_points(points)
+    within = geometry.within(boundary).astype(int)
+    joined = gpd.sjoin(geometry, parishes, how="left", predicate="within")
+    joined = joined[~joined.index.duplicated()]  # a point on a shared edge is within neither
+    expected = points.assign(within_expected_range=within.to_numpy())
+    for field, column in PARISH_COLUMNS.items():
+        expected[column] = joined[field].astype("string").to_numpy()
+    return expected
+
+
+def _check(points, boundary, parishes):
+    flagged = flag_within(points, boundary, parishes)
+    expected = _expected(points, boundary, parishes)
+    pd.testing.assert_frame_equal(flagged, expected, check_dtype=False)
+    return flagged
+
+
+def test_synthetic_parishes():
+    parishes = gpd.GeoDataFrame(
+        {"fre_code": ["A", "B", "C"], "fre_name": ["West", "East", "Island"]},
+        geometry=[shapely.box(0, 0, 1, 1), shapely.box(1, 0, 2, 1), shapely.box(3, 3, 3.5, 3.5)],
+        crs="EPSG:4326",
+    )
+    boundary = parishes.iloc[:2].union_all()
+    on_edges = pd.DataFrame({"primary_key": [-1, -2], "lat": [0.5, 0], "lng": [1, 0.5]})
+    points = pd.concat([_points(-0.5, -0.5, 4, 4), on_edges], ignore_index=True)
+    flagged = _check(points, boundary, parishes)
+    assert flagged["within_expected_range"].sum() > 0 and flagged["parish_code"].eq("C").any()
+    assert flagged.iloc[-1][["within_expected_range", "parish_code"]].isna().tolist() == [False, True]  # on the edge
+
+
+@pytest.mark.skipif(not os.path.exists(PARISH_GPKG), reason="needs the R project's parish GeoPackage")
+def test_lisbon_parishes():
+    parishes = load_parishes(PARISH_GPKG)
+    boundary = load_boundary(PARISH_GPKG)
+    flagged = _check(_points(*parishes.total_bounds, n=3_000), boundary, parishes)
+    assert flagged["parish_code"].notna().sum() > 1_000
+
+
+def test_without_parishes():
+    points, boundary = _points(0, 0, 1, 1, n=200), shapely.box(0, 0, 1, 1)
+    flagged = flag_within(points, boundary)
+    assert not set(PARISH_COLUMNS.values()) & set(flagged.columns)
+    assert flagged["within_expected_range"].tolist() == geocoded_points(points).within(boundary).astype(int).tolist()
@@ -0,0 +1,141 @@
+# The geocoder sends one request per distinct address, answers what it can from earlier results first, paces and
+# retries its requests, builds the client only when something is left to send, and resumes a checkpointed run
+# after a crash with the same output as an uninterrupted one
+import os
+import time
+
+import pandas as pd
+import pytest
+from conftest import ADDRESSES, FakeProvider
+
+from geocoding.cache import GeocodeCache
+from geocoding.checkpoint import CheckpointedOutput
+from geocoding.client import GeocodingClient, TokenBucket
+from geocoding.geocoder import CONFIDENCE_COLUMN, GEOCODE_COLUMNS, geocode_addresses, geocode_file, make_provider
+from geocoding.local import LocalGeocoder
+from geocoding.metrics import Metrics
+from geocoding.providers import MissingApiKeyError
+
+DISTINCT = 5  # the spellings in ADDRESSES normalize to five addresses
+
+
+def _geocode_file(addresses_path, output, provider, **options):
+    return geocode_file(addresses_path, output, "key", provider=provider, qps=1_000, **options)
+
+
+def test_one_request_per_distinct_address(addresses):
+    provider = FakeProvider()
+    geocoded = geocode_addresses(addresses, "key", provider=provider, qps=1_000)
+    assert len(provider.sent) == DISTINCT
+    assert list(geocoded.columns) == list(addresses.columns) + GEOCODE_COLUMNS
+    assert geocoded.loc[[0, 1, 3], "place_id"].tolist() == ["place-1"] * 3
+    assert geocoded["lat"].isna().tolist() == [address.startswith("nowhere") for address in ADDRESSES]
+
+
+def test_client_only_built_when_needed(tmp_path, addresses):
+    cache = GeocodeCache(tmp_path / "cache.sqlite")
+    geocode_addresses(addresses, "key", provider=FakeProvider(), cache=cache, qps=1_000)
+
+    # Everything is cached now: no provider, no API key, nothing sent
+    built = []
+    geocoded = geocode_addresses(addresses, "", cache=cache, client=lambda: built.append(1))
+    assert not built and geocoded["place_id"].notna().sum() == len(ADDRESSES) - 1
+    with pytest.raises(MissingApiKeyError):
+        make_provider("")
+    cache.close()
+
+
+def test_offline_sends_nothing(addresses):
+    geocoded = geocode_addresses(addresses, "", offline=True, client=lambda: pytest.fail("client built offline"))
+    assert geocoded["lat"].isna().all()
+
+
+def test_local_results_answer_first(addresses):
+    previous = geocode_addresses(addresses, "key", provider=FakeProvider(), qps=1_000)
+    local = LocalGeocoder.from_geocoded(previous)
+    geocoded = geocode_addresses(addresses, "", local=local, offline=True)
+    matched = geocoded["lat"].notna()
+    assert matched.tolist() == previous["lat"].notna().tolist()
+    assert (geocoded.loc[matched, CONFIDENCE_COLUMN] == 1.0).all()
+    pd.testing.assert_series_equal(geocoded["place_id"], previous["place_id"])
+
+
+def test_transient_errors_are_retried(addresses):
+    provider = FakeProvider(transient={"Rua Augusta 4, Lisboa": 2, "Praça do Comércio 2, Lisboa": 9})
+    client = GeocodingClient(provider, qps=1_000, retries=3, backoff=0)
+    geocoded = geocode_addresses(addresses, "key", client=client)
+    assert (client.requests, client.retried, client.failed) == (DISTINCT + 2 + 3, 2 + 3, 1)
+    assert geocoded.loc[7, "place_id"] == "place-4"
+    assert pd.isna(geocoded.loc[4, "place_id"])  # gave up, so left unmatched (and not cached)
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=200)
+    started = time.monotonic()
+    for _ in range(21):
+        bucket.acquire()
+    assert time.monotonic() - started >= 20 / 200 * 0.9
+
+
+def test_geocode_file(tmp_path, addresses_path, addresses):
+    metrics = Metrics("test")
+    geocode_file(addresses_path, tmp_path / "geocoded.csv", "key", provider=FakeProvider(), qps=1_000, metrics=metrics)
+    geocode_addresses(addresses, "key", provider=FakeProvider(), qps=1_000).to_csv(tmp_path / "expected.csv", index=False)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "geocoded.csv"), pd.read_csv(tmp_path / "expected.csv"))
+    assert metrics.stages["geocode"].counters["requests"] == DISTINCT
+
+
+def test_checkpointed_run_matches_whole_run(tmp_path, addresses_path):
+    _geocode_file(addresses_path, tmp_path / "whole.csv", FakeProvider())
+    provider = FakeProvider()
+    metrics = Metrics("test")
+    _geocode_file(addresses_path, tmp_path / "batched.csv", provider, checkpoint_every=3, metrics=metrics)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "batched.csv"), pd.read_csv(tmp_path / "whole.csv"))
+    assert len(provider.sent) == DISTINCT  # deduplicated across batches, not just within each
+    stage = metrics.stages["geocode"]
+    assert stage.counters["batches"] == 3 and stage.counters["requests"] == DISTINCT
+    assert set(stage.rates()) == {"geocoded"}  # run totals are counters, not shares of the rows
+
+
+def test_resume_after_crash(tmp_path, addresses_path):
+    output = tmp_path / "geocoded.csv"
+    _geocode_file(addresses_path, tmp_path / "whole.csv", FakeProvider())
+    cache = GeocodeCache(tmp_path / "cache.sqlite")
+
+    # Killed during the second batch of three rows: only the first is committed (and its answers cached)
+    with pytest.raises(KeyboardInterrupt):
+        _geocode_file(
+            addresses_path, output, FakeProvider(crash_at=3), checkpoint_every=3, max_in_flight=1, cache=cache,
+        )
+    assert CheckpointedOutput(output).completed == {1, 2, 3}
+
+    # A torn row and half a checkpoint line, as a crash mid-write would leave them
+    with open(f"{output}.partial", "a") as partial:
+        partial.write("4,Avenida da Liber")
+    with open(f"{output}.checkpoint", "a") as checkpoint:
+        checkpoint.write("999\t[4, 5")
+
+    provider, metrics = FakeProvider(), Metrics("test")
+    _geocode_file(addresses_path, output, provider, checkpoint_every=3, metrics=metrics, cache=cache)
+    pd.testing.assert_frame_equal(pd.read_csv(output), pd.read_csv(tmp_path / "whole.csv"))
+    assert metrics.stages["geocode"].counters["resumed"] == 3
+    assert provider.sent == ["Praça do Comércio 2, Lisboa", "nowhere 3", "Rua Augusta 4, Lisboa"]
+    cache.close()
+    assert not os.path.exists(f"{output}.partial") and not os.path.exists(f"{output}.checkpoint")
+
+
+def test_finish_without_rows(tmp_path):
+    with pytest.raises(ValueError, match="nothing was written"):
+        CheckpointedOutput(tmp_path / "geocoded.csv").finish(pd.Series([1, 2]))
+
+
+def test_resume_with_other_columns_starts_over(tmp_path):
+    path = tmp_path / "geocoded.csv"
+    CheckpointedOutput(path).append(pd.DataFrame({"primary_key": [1, 2], "lat": [38.7, 38.8]}))
+    assert CheckpointedOutput(path, columns=["primary_key", "lat"]).completed == {1, 2}
+
+    # e.g. an earlier run without --local: its rows lack match_confidence, so none of them are kept
+    output = CheckpointedOutput(path, columns=["primary_key", "lat", CONFIDENCE_COLUMN])
+    assert output.completed == set() and output.resumed == 0
+    output.append(pd.DataFrame({"primary_key": [2], "lat": [38.8], CONFIDENCE_COLUMN: [0.9]}))
+    assert output.finish(pd.Series([1, 2]))["primary_key"].tolist() == [2]
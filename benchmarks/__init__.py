@@ -0,0 +1,16 @@
+# Benchmark suite for the eviction cleaner and the geocode / flag pipeline
+#
+# The project folders are not packages (their names have spaces), so they are put on sys.path here
+# and every benchmark imports the project code the same way the project scripts do.
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+CLEANING_DIR = REPO / "(python) Cleaning eviction data - May 31 2025"
+GEOCODING_DIR = REPO / "(python) Public Housing Data Example - June 14 2025"
+PARISH_GPKG = REPO / "(R) Mapping Lisbon Parish Data - April 22 2025" / "parish_tm06_apr_19_2025.gpkg"
+
+# The repository root too, for the metrics recorder the projects share (pipeline_metrics/), when run from elsewhere
+for path in (REPO, CLEANING_DIR, GEOCODING_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
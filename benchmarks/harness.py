@@ -0,0 +1,157 @@
+# Timing harness: every stage runs in a fresh process so its peak memory is its own, and results are
+# written as JSON together with what's needed to tell whether two runs are comparable
+import json          # results files
+import multiprocessing  # one spawned process per measured stage
+import os            # scratch directories, CPU count
+import platform      # machine / interpreter description
+import resource      # peak resident memory of the measuring process
+import subprocess    # git commit of the tree being measured
+import sys           # platform check for ru_maxrss units
+import tempfile      # scratch directory for stage outputs
+import time          # wall-clock and CPU timers
+import warnings      # format warnings (e.g. shapefile field names) would only clutter the report
+from datetime import datetime, timezone
+
+from . import REPO
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# A stage is flagged as a regression when it is this much slower (or bigger) than the baseline
+DEFAULT_TOLERANCE = 0.10
+
+# ... and by at least this many seconds, so timer noise on millisecond stages is not reported
+MIN_WALL_DELTA_S = 0.05
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far, in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT / 2**20
+
+
+def _measure(stage_name: str, input_path: str, repeat: int, conn) -> None:
+    """Child-process body: set the stage up once, run it *repeat* times, send back the measurements."""
+    from .stages import STAGES
+
+    warnings.simplefilter("ignore")
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+            run = STAGES[stage_name].setup(input_path, workdir)
+            setup_rss = peak_rss_mb()
+
+            timings = []
+            for _ in range(repeat):
+                wall, cpu = time.perf_counter(), time.process_time()
+                rows_out = run()
+                timings.append((time.perf_counter() - wall, time.process_time() - cpu))
+
+        wall_s, cpu_s = min(timings)
+        conn.send({
+            "wall_s": round(wall_s, 4),
+            "cpu_s": round(cpu_s, 4),
+            "rows_out": int(rows_out),
+            "setup_rss_mb": round(setup_rss, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        })
+    except Exception as e:  # reported in the results rather than aborting the whole suite
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def measure(stage_name: str, input_path: str, repeat: int = 1) -> dict:
+    """
+    Time one stage on one input in a freshly spawned process.
+
+    Returns the fastest wall / CPU time of *repeat* runs, the rows the stage
+    produced, and peak resident memory both after setup and at the end, so
+    the stage's own footprint is roughly ``peak_rss_mb - setup_rss_mb``.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    child = context.Process(target=_measure, args=(stage_name, input_path, repeat, sender))
+    child.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:  # killed before it could report (usually the OOM killer)
+        result = {"error": "stage process exited without a result"}
+    child.join()
+    if child.exitcode not in (0, None) and "error" not in result:
+        result["error"] = f"exit code {child.exitcode}"
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _versions() -> dict:
+    versions = {"python": platform.python_version()}
+    for name in ["numpy", "pandas", "pyarrow", "geopandas", "shapely"]:
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    return versions
+
+
+def run_metadata(seed: int, repeat: int) -> dict:
+    """What a results file needs to say about where it came from."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": _versions(),
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+
+def save_results(path, meta: dict, results: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+
+
+def load_results(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, results: list[dict], tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """
+    Each (stage, rows) measured in both runs, with current / baseline ratios
+    for wall time and peak memory and whether either is past *tolerance*.
+
+    Inputs are regenerated from the same seed and generator version, so rows
+    of the same size saw identical data; a different seed or a different
+    machine in the baseline's metadata makes the ratios less meaningful.
+    """
+    previous = {
+        (r["stage"], r["rows"]): r for r in baseline["results"] if "error" not in r and "skipped" not in r
+    }
+    rows = []
+    for current in results:
+        old = previous.get((current["stage"], current["rows"]))
+        if old is None or "error" in current or "skipped" in current:
+            continue
+        wall_ratio = current["wall_s"] / old["wall_s"] if old["wall_s"] else float("inf")
+        rss_ratio = current["peak_rss_mb"] / old["peak_rss_mb"] if old["peak_rss_mb"] else float("inf")
+        rows.append({
+            "stage": current["stage"],
+            "rows": current["rows"],
+            "wall_ratio": round(wall_ratio, 3),
+            "rss_ratio": round(rss_ratio, 3),
+            "regression": (
+                (wall_ratio > 1 + tolerance and current["wall_s"] - old["wall_s"] > MIN_WALL_DELTA_S)
+                or rss_ratio > 1 + tolerance
+            ),
+        })
+    return rows
@@ -0,0 +1,66 @@
+# Speedup curve of the process-pool cleaner: the same export cleaned with 1, 2, 4, ... workers
+#
+# Usage (from the repository root):
+#   python -m benchmarks.parallel_speedup path/to/export.csv --max-workers 16
+#   python -m benchmarks.parallel_speedup --rows 1m --max-workers 16   (synthetic export)
+import argparse     # command-line options
+import io           # in-memory Parquet buffers for the byte-for-byte check
+import time         # wall-clock timing
+
+from evictions.ingest import read_raw_records
+from evictions.parallel import clean_parallel, default_workers
+
+from .synthetic import DEFAULT_DATA_DIR, dataset_path, parse_rows
+
+
+def worker_counts(max_workers: int) -> list[int]:
+    """1, 2, 4, ... up to and including *max_workers*."""
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def parquet_bytes(evictions) -> bytes:
+    """The exact bytes evictions.to_parquet would write."""
+    buffer = io.BytesIO()
+    evictions.to_parquet(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    cli = argparse.ArgumentParser(description="Time the eviction cleaner at increasing worker counts.")
+    cli.add_argument("input", nargs="?", help="raw export to clean (default: a synthetic one, see --rows)")
+    cli.add_argument("--rows", default="1m", help="size of the synthetic export used when no input is given")
+    cli.add_argument("--max-workers", type=int, default=default_workers())
+    cli.add_argument("--parser", default="single_pass")
+    cli.add_argument("--repeat", type=int, default=3, help="runs per worker count; the fastest is kept")
+    args = cli.parse_args()
+
+    input_path = args.input or dataset_path(DEFAULT_DATA_DIR, "evictions", parse_rows(args.rows))
+    raw_data = read_raw_records(input_path)
+    print(f"{len(raw_data):,} records, parser={args.parser}")
+
+    baseline = None
+    reference = None
+    print(f"{'workers':>7} {'seconds':>9} {'speedup':>8} {'efficiency':>10}  identical")
+    for workers in worker_counts(args.max_workers):
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            evictions = clean_parallel(raw_data, workers=workers, parser=args.parser)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+
+        output = parquet_bytes(evictions)
+        if reference is None:
+            baseline, reference = best, output
+
+        speedup = baseline / best
+        print(f"{workers:>7} {best:>9.3f} {speedup:>8.2f} {speedup / workers:>10.0%}  {output == reference}")
+
+
+if __name__ == "__main__":
+    main()
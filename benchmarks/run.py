@@ -0,0 +1,92 @@
+# Benchmark suite: time every cleaning and geocoding stage on synthetic inputs of several sizes
+#
+# Usage (from the repository root):
+#   python -m benchmarks.run                                   # every stage at 10k, 1m and 10m rows
+#   python -m benchmarks.run --sizes 10k 1m --stages clean.    # only the cleaner's stages
+#   python -m benchmarks.run --output new.json --compare old.json
+#
+# Generated inputs are cached (by size, seed and generator version) under --data-dir, so only the
+# first run at a given size pays for generating them.
+import argparse     # command-line options
+import os           # CPU count of this machine
+import sys          # exit status when regressions are found
+
+from .harness import DEFAULT_TOLERANCE, compare, load_results, measure, run_metadata, save_results
+from .stages import STAGES
+from .synthetic import DEFAULT_DATA_DIR, dataset_path, format_rows, parse_rows
+
+DEFAULT_SIZES = ["10k", "1m", "10m"]
+
+
+def selected_stages(prefixes: list[str]) -> list[str]:
+    """Registered stages whose name starts with any of *prefixes* (all of them when none are given)."""
+    if not prefixes:
+        return list(STAGES)
+    chosen = [name for name in STAGES if any(name.startswith(p) for p in prefixes)]
+    if not chosen:
+        raise SystemExit(f"No stage matches {prefixes}; stages are: {', '.join(STAGES)}")
+    return chosen
+
+
+def main():
+    cli = argparse.ArgumentParser(description="Time each cleaning and geocoding stage on synthetic data.")
+    cli.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="row counts, e.g. 10k 1m 10m")
+    cli.add_argument("--stages", nargs="*", default=[], help="stage names or name prefixes (default: all)")
+    cli.add_argument("--repeat", type=int, default=1, help="runs per stage; the fastest is kept")
+    cli.add_argument("--seed", type=int, default=0, help="seed of the synthetic inputs")
+    cli.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated inputs are cached")
+    cli.add_argument("--output", default="benchmark_results.json", help="results file to write")
+    cli.add_argument("--compare", help="earlier results file to compare against")
+    cli.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                     help="slowdown / growth ratio above 1 that counts as a regression")
+    args = cli.parse_args()
+
+    sizes = sorted(parse_rows(size) for size in args.sizes)
+    stages = selected_stages(args.stages)
+
+    results = []
+    print(f"{'stage':<26} {'rows':>6} {'wall s':>9} {'cpu s':>9} {'rows/s':>12} {'peak MiB':>9}")
+    for rows in sizes:
+        for name in stages:
+            stage = STAGES[name]
+            result = {"stage": name, "rows": rows}
+
+            if stage.max_rows is not None and rows > stage.max_rows:
+                result["skipped"] = f"over max_rows={stage.max_rows:,}"
+                results.append(result)
+                continue
+
+            input_path = dataset_path(args.data_dir, stage.dataset, rows, seed=args.seed)
+            result.update(measure(name, input_path, repeat=args.repeat))
+            results.append(result)
+
+            if "error" in result:
+                print(f"{name:<26} {format_rows(rows):>6}  failed: {result['error']}")
+                continue
+            result["rows_per_s"] = round(rows / result["wall_s"]) if result["wall_s"] else None
+            print(f"{name:<26} {format_rows(rows):>6} {result['wall_s']:>9.3f} {result['cpu_s']:>9.3f} "
+                  f"{result['rows_per_s'] or 0:>12,} {result['peak_rss_mb']:>9.1f}")
+
+    save_results(args.output, run_metadata(args.seed, args.repeat), results)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline["meta"].get("seed") != args.seed:
+            print(f"Note: baseline was generated with seed {baseline['meta'].get('seed')}, not {args.seed}")
+        if baseline["meta"].get("cpu_count") != os.cpu_count():
+            print(f"Note: baseline ran on {baseline['meta'].get('cpu_count')} CPUs, this run on {os.cpu_count()}")
+
+        print(f"\nCompared with {args.compare} (commit {baseline['meta'].get('commit')}):")
+        print(f"{'stage':<26} {'rows':>6} {'wall x':>8} {'memory x':>9}")
+        comparison = compare(baseline, results, tolerance=args.tolerance)
+        for row in comparison:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['stage']:<26} {format_rows(row['rows']):>6} "
+                  f"{row['wall_ratio']:>8.2f} {row['rss_ratio']:>9.2f}{flag}")
+        if any(row["regression"] for row in comparison):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# The stages being timed: each step of the eviction cleaner and of the geocode / flag script
+#
+# A stage is a setup function that takes the input path and a scratch directory, does whatever work
+# the stage depends on (untimed), and returns a callable that performs the stage itself and returns the
+# number of rows it produced. Imports happen inside the setup functions so every stage only pays for
+# the libraries it uses.
+import os           # output paths inside the scratch directory
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from . import PARISH_GPKG
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    dataset: str                      # which synthetic input it reads (see synthetic.DATASETS)
+    setup: Callable                   # (input_path, workdir) -> run(), run() -> rows produced
+    max_rows: Optional[int] = None    # larger sizes are skipped (too slow, or past a format limit)
+
+
+STAGES: dict[str, Stage] = {}
+
+
+def stage(name: str, dataset: str, max_rows: Optional[int] = None):
+    """Register the decorated setup function as a benchmark stage."""
+    def register(setup):
+        STAGES[name] = Stage(name, dataset, setup, max_rows)
+        return setup
+    return register
+
+
+# -- eviction cleaner ---------------------------------------------------------------
+
+def _raw_records(path):
+    from evictions.ingest import read_raw_records
+    return read_raw_records(path)
+
+
+def _cleaned(path):
+    from evictions.pipeline import clean_records
+    return clean_records(_raw_records(path))
+
+
+@stage("clean.ingest_lines", "evictions")
+def _ingest_lines(path, workdir):
+    from evictions.ingest import read_raw_records
+    return lambda: len(read_raw_records(path, mode="lines"))
+
+
+@stage("clean.ingest_csv", "evictions", max_rows=1_000_000)
+def _ingest_csv(path, workdir):
+    from evictions.ingest import read_raw_records
+    return lambda: len(read_raw_records(path, mode="csv"))
+
+
+@stage("clean.parse_single_pass", "evictions")
+def _parse_single_pass(path, workdir):
+    from evictions.pipeline import clean_records
+    raw_data = _raw_records(path)
+    return lambda: len(clean_records(raw_data, parser="single_pass"))
+
+
+@stage("clean.parse_stepwise", "evictions", max_rows=1_000_000)
+def _parse_stepwise(path, workdir):
+    from evictions.pipeline import clean_records
+    raw_data = _raw_records(path)
+    return lambda: len(clean_records(raw_data, parser="stepwise"))
+
+
+@stage("clean.parse_lazy", "evictions")
+def _parse_lazy(path, workdir):
+    from evictions.pipeline import clean_records
+    raw_data = _raw_records(path)
+    return lambda: len(clean_records(raw_data, parser="lazy"))
+
+
+@stage("clean.summary", "evictions")
+def _summary(path, workdir):
+    from evictions.summary import EvictionSummary
+    evictions = _cleaned(path)
+
+    def run():
+        summary = EvictionSummary().update(evictions)
+        summary.case_type_counts(), summary.unique_filing(), summary.unique_execution()
+        return summary.rows
+    return run
+
+
+@stage("clean.entities", "evictions")
+def _entities(path, workdir):
+    from evictions.entities import EntityIndex, add_entity_ids
+    evictions = _cleaned(path)
+
+    # A fresh index each run: every distinct name is normalized, blocked and matched
+    return lambda: len(add_entity_ids(evictions, EntityIndex()))
+
+
+@stage("clean.export_parquet", "evictions")
+def _export_parquet(path, workdir):
+    from evictions.dataset import export_evictions
+    evictions = _cleaned(path)
+
+    def run():
+        export_evictions(evictions, os.path.join(workdir, "evictions.parquet"))
+        return len(evictions)
+    return run
+
+
+@stage("clean.export_partitioned", "evictions")
+def _export_partitioned(path, workdir):
+    from evictions.dataset import export_evictions
+    evictions = _cleaned(path)
+
+    def run():
+        export_evictions(evictions, os.path.join(workdir, "evictions_dataset"), compact=True, partitioned=True)
+        return len(evictions)
+    return run
+
+
+@stage("clean.analytics_build", "evictions")
+def _analytics_build(path, workdir):
+    from evictions.analytics import refresh_analytics
+    from evictions.dataset import export_evictions
+    dataset = os.path.join(workdir, "evictions_dataset")
+    export_evictions(_cleaned(path), dataset, partitioned=True)
+    database = os.path.join(workdir, "analytics.duckdb")
+
+    # A fresh database each run: every partition is summarized
+    def run():
+        if os.path.exists(database):
+            os.remove(database)
+        return refresh_analytics(database, dataset)["rows_summarized"]
+    return run
+
+
+@stage("clean.analytics_query", "evictions")
+def _analytics_query(path, workdir):
+    from evictions.analytics import EvictionAnalytics, refresh_analytics
+    from evictions.dataset import export_evictions
+    export_evictions(_cleaned(path), os.path.join(workdir, "evictions.parquet"))
+    database = os.path.join(workdir, "analytics.duckdb")
+    refresh_analytics(database, os.path.join(workdir, "evictions.parquet"))
+    analytics = EvictionAnalytics(database, read_only=True)
+
+    # A dashboard tile: executed cases per month since 2021, served from the summary table
+    return lambda: len(analytics.query(
+        "SELECT filing_month, sum(executed) AS executed FROM monthly_counts "
+        "WHERE filing_month >= DATE '2021-01-01' GROUP BY ALL ORDER BY ALL"
+    ))
+
+
+@stage("clean.end_to_end", "evictions")
+def _end_to_end(path, workdir):
+    from evictions.dataset import export_evictions
+    from evictions.ingest import read_raw_records
+    from evictions.pipeline import clean_records
+
+    def run():
+        evictions = clean_records(read_raw_records(path))
+        export_evictions(evictions, os.path.join(workdir, "evictions.parquet"))
+        return len(evictions)
+    return run
+
+
+@stage("clean.streaming", "evictions")
+def _streaming(path, workdir):
+    from evictions.streaming import clean_to_parquet
+
+    def run():
+        return clean_to_parquet(path, os.path.join(workdir, "evictions.parquet")).rows
+    return run
+
+
+# -- geocoding client (geocoding/client.py) -----------------------------------------
+#
+# No request leaves the machine: a stub provider answers every address at once from the synthetic file's own
+# results, so the stage times what the client adds per request — the thread pool, the token bucket and the
+# in-order hand-back — plus a retry for one address in a hundred.
+
+class _StubProvider:
+    """Answers from *answers* (address → results); each address in *flaky* fails transiently once first."""
+
+    def __init__(self, answers: dict, flaky):
+        self.answers = answers
+        self.flaky = set(flaky)
+
+    def geocode(self, address: str) -> list:
+        from geocoding.providers import TransientGeocodingError
+        if address in self.flaky:
+            self.flaky.discard(address)
+            raise TransientGeocodingError("OVER_QUERY_LIMIT")
+        return self.answers.get(address, [])
+
+
+@stage("geo.client", "geocoded", max_rows=1_000_000)
+def _client(path, workdir):
+    import pandas as pd
+    from geocoding.client import GeocodingClient
+    addresses = pd.read_csv(path, usecols=["address", "geocoded_address", "lat", "lng", "place_id"])
+    matched = addresses.dropna(subset=["lat", "lng"])
+    answers = {
+        address: [{"formatted_address": name, "geometry": {"location": {"lat": lat, "lng": lng}}, "place_id": place}]
+        for address, name, lat, lng, place in matched.itertuples(index=False)
+    }
+    flaky = addresses["address"].iloc[::100].tolist()
+
+    def run():
+        # A quota far above what the stub can serve: every request still takes a token, none waits for one
+        client = GeocodingClient(_StubProvider(answers, flaky), qps=1e9, backoff=0)
+        return sum(1 for _ in client.geocode(addresses["address"]))
+    return run
+
+
+# -- geocode / flag pipeline (geocoding/flagging.py) ---------------------------------
+#
+# The script reads lisbon_boundary.shp, which is not in the repository; the union of the Lisbon
+# parishes (the R project's GeoPackage) is the same boundary.
+
+def _geocoded(path):
+    from geocoding.flagging import read_geocoded
+    return read_geocoded(path).dropna(subset=["lat", "lng"])
+
+
+def _flagged(path):
+    from geocoding.flagging import flag_within, load_boundary
+    return flag_within(_geocoded(path), load_boundary(PARISH_GPKG))
+
+
+@stage("geo.read_csv", "geocoded")
+def _read_csv(path, workdir):
+    from geocoding.flagging import read_geocoded  # imported here so GeoPandas' import isn't timed
+    return lambda: len(read_geocoded(path).dropna(subset=["lat", "lng"]))
+
+
+@stage("geo.points", "geocoded")
+def _build_points(path, workdir):
+    from geocoding.flagging import geocoded_points
+    geocoded = _geocoded(path)
+    return lambda: len(geocoded_points(geocoded))
+
+
+@stage("geo.flag_within", "geocoded")
+def _flag_within(path, workdir):
+    from geocoding.flagging import flag_within, load_boundary
+    geocoded = _geocoded(path)
+    boundary = load_boundary(PARISH_GPKG)
+    return lambda: len(flag_within(geocoded, boundary))
+
+
+@stage("geo.flag_parishes", "geocoded")
+def _flag_parishes(path, workdir):
+    from geocoding.flagging import flag_within, load_boundary, load_parishes
+    geocoded = _geocoded(path)
+    boundary = load_boundary(PARISH_GPKG)
+    parishes = load_parishes(PARISH_GPKG)
+    return lambda: len(flag_within(geocoded, boundary, parishes))
+
+
+# Excel sheets stop at 1,048,576 rows
+@stage("geo.export_xlsx", "geocoded", max_rows=1_000_000)
+def _export_xlsx(path, workdir):
+    from geocoding.flagging import OUTPUT_FILES
+    flagged = _flagged(path)
+
+    def run():
+        flagged.to_excel(os.path.join(workdir, OUTPUT_FILES["xlsx"]), index=False)
+        return len(flagged)
+    return run
+
+
+@stage("geo.export_kml", "geocoded", max_rows=1_000_000)
+def _export_kml(path, workdir):
+    from geocoding.flagging import OUTPUT_FILES, in_range_points
+    points = in_range_points(_flagged(path))
+
+    def run():
+        points.to_file(os.path.join(workdir, OUTPUT_FILES["kml"]), driver="KML")
+        return len(points)
+    return run
+
+
+# A shapefile's .dbf stops at 2 GB, which the text columns pass a little after 1M rows
+@stage("geo.export_shp", "geocoded", max_rows=1_000_000)
+def _export_shp(path, workdir):
+    from geocoding.flagging import OUTPUT_FILES, in_range_points
+    points = in_range_points(_flagged(path))
+
+    def run():
+        points.to_file(os.path.join(workdir, OUTPUT_FILES["shp"]), driver="ESRI Shapefile")
+        return len(points)
+    return run
+
+
+@stage("geo.export_parquet", "geocoded")
+def _export_parquet_points(path, workdir):
+    from geocoding.flagging import OUTPUT_FILES, geocoded_points, write_output
+    points = geocoded_points(_flagged(path))
+    return lambda: write_output("parquet", points, os.path.join(workdir, OUTPUT_FILES["parquet"]))
+
+
+@stage("geo.export_fgb", "geocoded")
+def _export_fgb(path, workdir):
+    from geocoding.flagging import OUTPUT_FILES, geocoded_points, write_output
+    points = geocoded_points(_flagged(path))
+    return lambda: write_output("fgb", points, os.path.join(workdir, OUTPUT_FILES["fgb"]))
+
+
+# Every format at once, the way flag_addresses writes them (geometry built once, formats side by side)
+@stage("geo.export_all", "geocoded", max_rows=1_000_000)
+def _export_all(path, workdir):
+    from geocoding.flagging import export_outputs
+    flagged = _flagged(path)
+
+    def run():
+        export_outputs(flagged, workdir)
+        return len(flagged)
+    return run
+
+
+@stage("geo.aggregate", "geocoded")
+def _aggregate(path, workdir):
+    from geocoding.aggregates import SpatialAggregates
+    from geocoding.flagging import flag_within, load_boundary, load_parishes
+    flagged = flag_within(_geocoded(path), load_boundary(PARISH_GPKG), load_parishes(PARISH_GPKG))
+
+    # A fresh set of counts each run: every point is projected and binned at every cell size
+    return lambda: SpatialAggregates().update(flagged).refreshed
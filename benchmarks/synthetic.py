@@ -0,0 +1,255 @@
+# Synthetic inputs for the benchmarks: a raw eviction court export and a scaled-up data_geocoded.csv
+#
+# The real inputs can't be shared, so these generators write files in the same shapes the cleaner's
+# regexes and the geocode / flag script expect. Output depends only on (rows, seed, GENERATOR_VERSION),
+# which is what makes timings comparable from one run to the next.
+import os           # atomic replacement of finished files
+import tempfile     # default cache directory of generated files
+import urllib.parse  # URL-encoding of addresses, as the geocoding script does
+
+import numpy as np   # seeded random draws, one block at a time
+import pandas as pd  # vectorized column building and CSV output
+
+# Bump whenever the generated content changes, so cached files from an older generator are not reused
+GENERATOR_VERSION = 1
+
+# Generated files are cached here unless a caller picks another directory
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "portfolio-benchmarks")
+
+# Rows generated and written per block; bounds the generator's memory at any size
+BLOCK_ROWS = 100_000
+
+# -- eviction export vocabulary --------------------------------------------------
+CASE_TYPES = ["WERJ", "CVEV", "LTEV", "SCEV", "RPEV"]
+PLAINTIFFS = [
+    "4 Bogard Street LLC", "Main St Holdings", "Riverside Realty Inc.", "Oak Park Apartments",
+    "Cedar Grove Housing Authority", "Metro Property Management", "John Smith", "Maria Garcia",
+    "Lakeview Partners", "Northside Rentals LLC", "Greenway Estates", "Harbor Point Homes",
+]
+DEFENDANTS = [
+    "Franklin Signorelli", "Jane Roe", "Bob Tenant", "All Occupants", "Carlos Mendes",
+    "Ana Silva", "Michael Brown", "Linda Johnson", "James Lee", "Patricia Davis",
+    "Robert Wilson", "Unknown Occupants",
+]
+STREETS = [
+    "Main St", "Elm St", "Oak Rd", "Maple Ave", "Cedar Ln", "Pine St", "Lake Dr",
+    "Hill Rd", "Park Ave", "River Rd", "Sunset Blvd", "Church St",
+]
+STATUSES = [
+    (1, "Filed"), (2, "Pending"), (3, "Dismissed"), (4, "Judgment for Plaintiff"),
+    (5, "Executed"), (6, "Settled"), (7, "Writ Issued"),
+]
+
+# -- data_geocoded.csv vocabulary --------------------------------------------------
+NEIGHBORHOODS = [
+    "Alvalade", "Areeiro", "Arroios", "Avenidas Novas", "Belém", "Benfica", "Campo de Ourique",
+    "Campolide", "Carnide", "Estrela", "Lumiar", "Marvila", "Misericórdia", "Olivais",
+    "Parque das Nações", "Penha de França", "Santa Clara", "Santa Maria Maior", "Santo António",
+    "São Domingos de Benfica", "São Vicente", "Ajuda", "Alcântara", "Beato",
+]
+RUAS = [
+    "Rua Augusta", "Avenida da Liberdade", "Rua do Ouro", "Rua da Prata", "Avenida de Roma",
+    "Rua Morais Soares", "Estrada de Benfica", "Avenida Almirante Reis", "Rua de São Bento",
+    "Calçada da Ajuda", "Rua Castilho", "Avenida dos Estados Unidos da América",
+]
+
+# Rough Lisbon bounding box (lng, lat); most geocoded points land inside it, the rest scatter across
+# Portugal the way bad matches do in the real file
+LISBON_BBOX = (-9.23, 38.69, -9.09, 38.80)
+PORTUGAL_BBOX = (-9.50, 37.00, -7.00, 42.00)
+
+# Share of addresses the geocoder could not match (1,085 of 4,162 in the real file)
+UNMATCHED_SHARE = 0.26
+OUT_OF_RANGE_SHARE = 0.20
+
+
+def parse_rows(text: str) -> int:
+    """Row counts written the short way: ``10k`` → 10_000, ``1m`` → 1_000_000, ``2500`` → 2500."""
+    text = text.strip().lower().replace("_", "")
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def format_rows(rows: int) -> str:
+    """Inverse of ``parse_rows`` for round numbers (used in file names and reports)."""
+    for suffix, factor in (("m", 1_000_000), ("k", 1_000)):
+        if rows >= factor and rows % factor == 0:
+            return f"{rows // factor}{suffix}"
+    return str(rows)
+
+
+def _blocks(rows: int):
+    """(start, length) of every generation block."""
+    for start in range(0, rows, BLOCK_ROWS):
+        yield start, min(BLOCK_ROWS, rows - start)
+
+
+def _dates(rng, n: int, years: np.ndarray) -> np.ndarray:
+    """ISO dates in the given years (days capped at 28 so every one is a real date)."""
+    months = rng.integers(1, 13, n)
+    days = rng.integers(1, 29, n)
+    return np.array([f"{y:04d}-{m:02d}-{d:02d}" for y, m, d in zip(years, months, days)], dtype=object)
+
+
+def eviction_lines(rng, n: int) -> list[str]:
+    """
+    *n* physical lines of the raw court export.
+
+    Tab-separated fields inside the first CSV cell, like the real export:
+    ``<case_id> <case_number> CV <type> <plaintiff> VS <defendant> <filing> <execution>
+    <address> <case_number> <case_id> <defendant> <code> <status>``, with the
+    variants the cleaner has rules for mixed in at fixed rates: stray first
+    names in the case-type slot, names without VS or with an empty side,
+    slash dates, 1753 placeholder and 2102 typo years, missing addresses,
+    ``NULL NULL`` status tails, and quoted cells containing commas.
+    """
+    case_ids = [f"2021CV{v:010d}" for v in rng.integers(0, 10**10, n)]
+    case_numbers = [f"{v:05d}" for v in rng.integers(0, 100_000, n)]
+    case_types = np.array(CASE_TYPES, dtype=object)[rng.integers(0, len(CASE_TYPES), n)]
+    case_types[rng.random(n) < 0.01] = "Kathryn"
+    plaintiffs = np.array(PLAINTIFFS, dtype=object)[rng.integers(0, len(PLAINTIFFS), n)]
+    defendants = np.array(DEFENDANTS, dtype=object)[rng.integers(0, len(DEFENDANTS), n)]
+
+    # " VS " mostly; also lower-case "vs.", no VS at all (plaintiff only), and VS with nothing after it
+    separators = np.array([" VS ", " vs. ", "", " VS"], dtype=object)[
+        np.searchsorted([0.90, 0.95, 0.98], rng.random(n), side="right")
+    ]
+    names = [
+        f"{p}{s}{d}" if s.endswith(" ") else f"{p}{s}"
+        for p, s, d in zip(plaintiffs, separators, defendants)
+    ]
+
+    filing_years = rng.integers(2018, 2025, n)
+    filing = _dates(rng, n, filing_years)
+    execution_years = filing_years + rng.integers(0, 2, n)
+    draw = rng.random(n)
+    execution_years[draw < 0.03] = 1753                       # "no date" placeholder
+    execution_years[(draw >= 0.03) & (draw < 0.04)] = 2102    # typo for 2021
+    execution = _dates(rng, n, execution_years)
+    slash = rng.random(n) < 0.02
+    filing_text = np.where(
+        slash,
+        [f"{d[5:7]}/{d[8:10]}/{d[:4]}" for d in filing],
+        filing + " 00:00:00.000",
+    )
+
+    house_numbers = rng.integers(1, 9999, n)
+    streets = np.array(STREETS, dtype=object)[rng.integers(0, len(STREETS), n)]
+    units = rng.integers(0, 40, n)
+    addresses = [
+        f"{h} {s} Apt {u}" if u else f"{h} {s}" for h, s, u in zip(house_numbers, streets, units)
+    ]
+    no_address = rng.random(n) < 0.05
+
+    statuses = rng.integers(0, len(STATUSES), n)
+    null_tail = rng.random(n) < 0.05
+    quoted = rng.random(n) < 0.02
+
+    lines = []
+    for i in range(n):
+        address = "" if no_address[i] else addresses[i]
+        if null_tail[i]:
+            tail = f"{case_numbers[i]}\t{case_ids[i]}\t{defendants[i]}\tNULL NULL"
+        else:
+            code, status = STATUSES[statuses[i]]
+            tail = f"{case_numbers[i]}\t{case_ids[i]}\t{defendants[i]}\t{code}\t{status}"
+        name = names[i]
+        if quoted[i]:
+            name = name.replace(plaintiffs[i], plaintiffs[i] + ", Inc.", 1)   # comma inside a quoted cell
+        record = (
+            f"{case_ids[i]}\t{case_numbers[i]}\tCV\t{case_types[i]} {name}\t"
+            f"{filing_text[i]}\t{execution[i]} 00:00:00.000\t{address}\t{tail}"
+        )
+        if quoted[i]:
+            record = f'"{record}"'
+        lines.append(record + ",,,,")
+    return lines
+
+
+def write_eviction_export(path, rows: int, seed: int = 0) -> str:
+    """Write a synthetic raw export with *rows* records (plus the header line) to *path*."""
+    rng = np.random.default_rng(seed)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write("Case Data" + "," * 4 + "\n")
+        for _, n in _blocks(rows):
+            f.write("\n".join(eviction_lines(rng, n)) + "\n")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def geocoded_block(rng, start: int, n: int) -> pd.DataFrame:
+    """
+    *n* rows of ``data_geocoded.csv`` with primary_keys from *start* + 1.
+
+    About a quarter of the rows have no match (empty geocoded columns); of the
+    rest, most points fall inside Lisbon and the others scatter across Portugal.
+    """
+    primary_key = np.arange(start + 1, start + n + 1)
+    ruas = np.array(RUAS, dtype=object)[rng.integers(0, len(RUAS), n)]
+    numbers = rng.integers(1, 300, n).astype(str)
+    neighborhood = np.array(NEIGHBORHOODS, dtype=object)[rng.integers(0, len(NEIGHBORHOODS), n)]
+    address = pd.Series(ruas + " " + numbers + ", " + neighborhood + ", Lisboa")
+
+    inside = rng.random(n) >= OUT_OF_RANGE_SHARE
+    lng = np.where(
+        inside, rng.uniform(LISBON_BBOX[0], LISBON_BBOX[2], n), rng.uniform(PORTUGAL_BBOX[0], PORTUGAL_BBOX[2], n)
+    ).round(7)
+    lat = np.where(
+        inside, rng.uniform(LISBON_BBOX[1], LISBON_BBOX[3], n), rng.uniform(PORTUGAL_BBOX[1], PORTUGAL_BBOX[3], n)
+    ).round(7)
+    matched = rng.random(n) >= UNMATCHED_SHARE
+
+    postcodes = pd.Series(rng.integers(1000, 1999, n).astype(str)) + "-" + pd.Series(
+        rng.integers(0, 999, n)).astype(str).str.zfill(3)
+    place_id = "ChIJ" + pd.Series(rng.integers(0, 2**62, n, dtype=np.int64)).map("{:016x}".format)
+    lat_text, lng_text = pd.Series(lat).astype(str), pd.Series(lng).astype(str)
+
+    block = pd.DataFrame({
+        "primary_key": primary_key,
+        "address": address,
+        "neighborhood": neighborhood,
+        "geocoded_address": ruas + " " + numbers + ", " + postcodes + " Lisboa, Portugal",
+        "lat": lat,
+        "lng": lng,
+        "place_id": place_id,
+        "raw_url": "https://maps.googleapis.com/maps/api/geocode/json?address="
+                   + address.map(urllib.parse.quote) + "&key=",
+        "maps_url": "https://www.google.com/maps/search/?api=1&query=" + lat_text + "," + lng_text,
+    })
+    geocoded = ["geocoded_address", "lat", "lng", "place_id", "raw_url", "maps_url"]
+    block.loc[~matched, geocoded] = None
+    return block
+
+
+def write_geocoded(path, rows: int, seed: int = 0) -> str:
+    """Write a synthetic ``data_geocoded.csv`` with *rows* addresses to *path*."""
+    rng = np.random.default_rng(seed)
+    for start, n in _blocks(rows):
+        geocoded_block(rng, start, n).to_csv(path + ".tmp", mode="w" if start == 0 else "a",
+                                             header=start == 0, index=False)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# Every dataset the benchmarks can ask for: name → (writer, file name stem)
+DATASETS = {
+    "evictions": (write_eviction_export, "eviction_export"),
+    "geocoded": (write_geocoded, "data_geocoded"),
+}
+
+
+def dataset_path(data_dir, dataset: str, rows: int, seed: int = 0) -> str:
+    """
+    Path of a generated dataset under *data_dir*, generating it first if it isn't there yet.
+
+    File names carry the size, seed and generator version, so a cached file
+    is only reused when it would be regenerated byte for byte.
+    """
+    writer, stem = DATASETS[dataset]
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"{stem}_{format_rows(rows)}_seed{seed}_v{GENERATOR_VERSION}.csv")
+    if not os.path.exists(path):
+        writer(path, rows, seed=seed)
+    return path
@@ -0,0 +1,14 @@
+# Per-stage instrumentation shared by the eviction cleaner and the geocode / flag pipeline
+#
+# The project folders are not packages (their names have spaces), so each project's metrics module puts the
+# repository root on sys.path and imports the recorder from here, adding only its own match rates.
+from .recorder import (
+    PROFILERS,
+    Metrics,
+    StageMetrics,
+    cprofile_hook,
+    maybe_stage,
+    sampling_hook,
+)
+
+__all__ = ["PROFILERS", "Metrics", "StageMetrics", "cprofile_hook", "maybe_stage", "sampling_hook"]
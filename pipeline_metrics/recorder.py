@@ -0,0 +1,321 @@
+# The per-stage recorder: wall / CPU time, peak memory, rows in and out and match rates for every stage of a
+# run, written out as JSON or OpenMetrics text, with optional profiler hooks around each stage
+import cProfile      # deterministic profiler behind cprofile_hook
+import json          # JSON output
+import os            # profile output paths
+import resource      # peak resident memory of the process
+import sys           # frames of the profiled thread for sampling_hook
+import threading     # background sampler thread
+import time          # wall-clock and CPU timers
+from collections import Counter  # sampled stack tallies
+from contextlib import ExitStack, contextmanager, nullcontext
+from datetime import datetime, timezone
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _peak_rss_bytes() -> int:
+    """Peak resident memory of this process since it started."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+class StageMetrics:
+    """
+    Measurements of one named stage, summed over every time it ran.
+
+    ``wall_s`` and ``cpu_s`` exclude time spent in stages nested inside this
+    one, and CPU time is this process's only (worker processes are not
+    counted). ``peak_rss_growth_bytes`` is the most any one run raised the
+    process's peak resident memory above where it stood when the run began —
+    a stage that stays under an earlier peak shows no growth, and the
+    process-wide peak itself is never reset. ``counts`` holds how many
+    output rows met each named condition;
+    ``rates`` divides them by ``rows_out``. ``counters`` are totals of
+    anything else (requests sent, batches, cache hits), reported as they are.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_rss_growth_bytes = 0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.counts = Counter()
+        self.counters = Counter()
+
+    def add_counts(self, counts: dict) -> "StageMetrics":
+        """Add per-condition row counts (e.g. the cleaner's ``cleaning_counts``)."""
+        self.counts.update(counts)
+        return self
+
+    def add_counters(self, counters: dict) -> "StageMetrics":
+        """Add totals that aren't conditions on output rows, so have no rate (e.g. requests sent)."""
+        self.counters.update(counters)
+        return self
+
+    def rates(self) -> dict:
+        return {name: count / self.rows_out for name, count in self.counts.items()} if self.rows_out else {}
+
+    def as_dict(self) -> dict:
+        return {
+            "stage": self.name,
+            "calls": self.calls,
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "peak_rss_growth_mb": round(self.peak_rss_growth_bytes / 2**20, 1),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rows_per_s": round(self.rows_out / self.wall_s) if self.wall_s else None,
+            "counts": dict(self.counts),
+            "rates": {name: round(rate, 6) for name, rate in self.rates().items()},
+            "counters": dict(self.counters),
+        }
+
+
+class _Timer:
+    """One timed run of a stage; nested timers subtract their time from the enclosing one."""
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.stage = metrics[name]
+        self.child_wall = self.child_cpu = 0.0
+
+    def start(self) -> None:
+        self.metrics._running.append(self)
+        self.peak = _peak_rss_bytes()  # baseline; a nested stage's growth also counts toward this one
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+
+    def stop(self, count: bool = True) -> StageMetrics:
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        growth = _peak_rss_bytes() - self.peak
+
+        stack = self.metrics._running
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+
+        self.stage.calls += count
+        self.stage.wall_s += wall - self.child_wall
+        self.stage.cpu_s += cpu - self.child_cpu
+        self.stage.peak_rss_growth_bytes = max(self.stage.peak_rss_growth_bytes, growth)
+        return self.stage
+
+
+class Metrics:
+    """
+    Instrumentation for one run of a pipeline (*job*).
+
+    Wrap each stage in ``with metrics.stage("name", rows_in=...) as stage:``
+    and set ``stage.rows_out`` / ``stage.add_counts(...)`` /
+    ``stage.add_counters(...)`` inside; a stage that runs many times (one
+    chunk at a time) accumulates. *hooks* are called as
+    ``hook(job, stage_name)`` around every stage and must return a context
+    manager — see ``cprofile_hook`` and ``sampling_hook``.
+    """
+
+    def __init__(self, job: str, hooks=()):
+        self.job = job
+        self.hooks = list(hooks)
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.stages: dict[str, StageMetrics] = {}
+        self._running: list[_Timer] = []
+
+    def __getitem__(self, name: str) -> StageMetrics:
+        """The record of stage *name*, created empty the first time it is asked for."""
+        if name not in self.stages:
+            self.stages[name] = StageMetrics(name)
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str, rows_in=None):
+        """Measure the enclosed block as one run of stage *name*."""
+        record = self[name]
+        record.rows_in += rows_in or 0
+        with ExitStack() as hooks:
+            for hook in self.hooks:
+                hooks.enter_context(hook(self.job, name))
+            timer = _Timer(self, name)
+            timer.start()
+            try:
+                yield record
+            finally:
+                timer.stop()
+
+    def timed(self, name: str, iterable):
+        """
+        Yield from *iterable*, timing each step as one run of stage *name*
+        and adding the length of every item to its ``rows_out``.
+
+        For generators that do their work lazily (chunked readers, pools),
+        where there is no single block to wrap in ``stage``.
+        """
+        iterator = iter(iterable)
+        while True:
+            with ExitStack() as hooks:
+                for hook in self.hooks:
+                    hooks.enter_context(hook(self.job, name))
+                timer = _Timer(self, name)
+                timer.start()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    timer.stop(count=False)
+                    return
+                except BaseException:
+                    timer.stop()
+                    raise
+                timer.stop().rows_out += len(item)
+            yield item
+
+    # -- output -------------------------------------------------------------------
+
+    def as_dict(self) -> dict:
+        return {
+            "job": self.job,
+            "started_at": self.started_at,
+            "stages": [stage.as_dict() for stage in self.stages.values()],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_openmetrics(self) -> str:
+        """The measurements in OpenMetrics text format (one gauge family per measurement)."""
+        families = [
+            ("stage_calls", "Times the stage ran", lambda s: s.calls),
+            ("stage_wall_seconds", "Wall-clock time spent in the stage", lambda s: s.wall_s),
+            ("stage_cpu_seconds", "CPU time spent in the stage by this process", lambda s: s.cpu_s),
+            ("stage_peak_rss_growth_bytes", "Rise in the process's peak resident memory while the stage ran",
+             lambda s: s.peak_rss_growth_bytes),
+            ("stage_rows_in", "Rows the stage received", lambda s: s.rows_in),
+            ("stage_rows_out", "Rows the stage produced", lambda s: s.rows_out),
+        ]
+        lines = []
+        for metric, help_text, value in families:
+            lines += [f"# TYPE pipeline_{metric} gauge", f"# HELP pipeline_{metric} {help_text}."]
+            lines += [
+                f'pipeline_{metric}{{job="{self.job}",stage="{stage.name}"}} {value(stage)}'
+                for stage in self.stages.values()
+            ]
+        lines += ["# TYPE pipeline_stage_match_ratio gauge",
+                  "# HELP pipeline_stage_match_ratio Share of the stage's output rows meeting a condition."]
+        for stage in self.stages.values():
+            lines += [
+                f'pipeline_stage_match_ratio{{job="{self.job}",stage="{stage.name}",check="{check}"}} {rate:.6g}'
+                for check, rate in stage.rates().items()
+            ]
+        lines += ["# TYPE pipeline_stage_count gauge",
+                  "# HELP pipeline_stage_count Totals the stage kept besides rows (requests, batches, cache hits)."]
+        for stage in self.stages.values():
+            lines += [
+                f'pipeline_stage_count{{job="{self.job}",stage="{stage.name}",counter="{name}"}} {count}'
+                for name, count in stage.counters.items()
+            ]
+        return "\n".join(lines + ["# EOF"]) + "\n"
+
+    def write(self, path) -> None:
+        """Save to *path*: JSON for a ``.json`` file, OpenMetrics text otherwise (e.g. ``.prom``)."""
+        text = self.to_json() if str(path).endswith(".json") else self.to_openmetrics()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def report(self) -> None:
+        """Print one line per stage."""
+        print(f"{'stage':<16} {'calls':>5} {'wall s':>9} {'cpu s':>9} {'+peak MiB':>9} "
+              f"{'rows in':>11} {'rows out':>11}")
+        for stage in self.stages.values():
+            print(f"{stage.name:<16} {stage.calls:>5} {stage.wall_s:>9.3f} {stage.cpu_s:>9.3f} "
+                  f"{stage.peak_rss_growth_bytes / 2**20:>9.1f} {stage.rows_in:>11,} {stage.rows_out:>11,}")
+            for check, rate in stage.rates().items():
+                print(f"{'':<16} {check}: {rate:.2%}")
+            for name, count in stage.counters.items():
+                print(f"{'':<16} {name}: {count:,}")
+
+
+def maybe_stage(metrics, name: str, rows_in=None):
+    """``metrics.stage(name, rows_in)``, or a stand-in record nobody reads when *metrics* is None."""
+    if metrics is None:
+        return nullcontext(StageMetrics(name))
+    return metrics.stage(name, rows_in=rows_in)
+
+
+# -- profiler hooks -------------------------------------------------------------------
+
+def cprofile_hook(directory, stages=None):
+    """
+    Hook that runs cProfile around every stage (or only those named in
+    *stages*) and saves ``<job>.<stage>.prof`` under *directory*, cumulative
+    over repeated runs of the stage. A stage nested in one already being
+    profiled is covered by the outer profile.
+    """
+    os.makedirs(directory, exist_ok=True)
+    profilers = {}
+    active = []
+
+    @contextmanager
+    def hook(job, name):
+        if active or (stages is not None and name not in stages):
+            yield
+            return
+        profiler = profilers.setdefault(name, cProfile.Profile())
+        active.append(profiler)
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            active.pop()
+            profiler.dump_stats(os.path.join(directory, f"{job}.{name}.prof"))
+
+    return hook
+
+
+def sampling_hook(directory, interval: float = 0.005, stages=None):
+    """
+    Hook that samples the stage's call stack every *interval* seconds from a
+    background thread and saves the tallies as ``<job>.<stage>.folded`` under
+    *directory* (collapsed-stack format, readable by flamegraph.pl and
+    speedscope). Much lighter than cProfile on long stages.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tallies = {}
+
+    @contextmanager
+    def hook(job, name):
+        if stages is not None and name not in stages:
+            yield
+            return
+        target = threading.get_ident()
+        stacks = tallies.setdefault(name, Counter())
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(interval):
+                frame = sys._current_frames().get(target)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    stacks[";".join(reversed(stack))] += 1
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+            with open(os.path.join(directory, f"{job}.{name}.folded"), "w", encoding="utf-8") as f:
+                f.writelines(f"{stack} {n}\n" for stack, n in stacks.most_common())
+
+    return hook
+
+
+PROFILERS = {"cprofile": cprofile_hook, "sampling": sampling_hook}